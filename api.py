@@ -0,0 +1,312 @@
+"""
+Headless Python API and JSON command line for the resume pipeline.
+
+The same steps as the interactive menu (scrape -> clean -> tailor -> cover letter,
+plus listing, showing and importing resumes) as plain functions that take and
+return dicts and strings, never prompt, and raise on failure:
+
+    import api
+    api.quiet()
+    result = api.tailor("https://example.com/jobs/123", baseline="baseline", name="acme", cover_letter=True)
+    print(result["resume"]["job_target"])
+
+The subcommands of main.py wrap these functions, read files or stdin and print
+one JSON document on stdout (progress and warnings go to stderr):
+
+    python main.py tailor posting.txt --name acme --cover-letter
+    python main.py cover-letter acme
+    python main.py list --status complete
+    python main.py show acme
+    cat my_resume.json | python main.py import-baseline - --name baseline
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+import main as app
+from compact_storage import content_hash
+from dedup import load_package
+from resume_models import check_schema, validate_resume
+
+_structured_output = None
+
+
+class NullConsole:
+    """Console stand-in that drops everything, so headless runs skip Rich rendering entirely."""
+
+    def print(self, *args, **kwargs):
+        pass
+
+    def print_json(self, *args, **kwargs):
+        pass
+
+    def log(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_interactive_console = app.console
+
+
+def quiet(enabled: bool = True):
+    """Silence (or restore) the console output of the pipeline functions in main.py."""
+    app.console = NullConsole() if enabled else _interactive_console
+
+
+def _stderr_console():
+    from rich.console import Console
+    return Console(stderr=True)
+
+
+def log_to_stderr():
+    """Send the pipeline's console output to stderr, keeping stdout free for JSON."""
+    app.console = app.LazyObject(_stderr_console)
+
+
+def _tailor():
+    global _structured_output
+    if _structured_output is None:
+        from structured_output import ResumeTailorStructuredOutput
+        _structured_output = ResumeTailorStructuredOutput()
+    return _structured_output
+
+
+def _require_resume(name: str) -> Dict:
+    if not app.store.exists(name, "resume.json"):
+        raise Exception(f"Resume '{name}' not found in '{app.RESUMES_DIR}'.")
+    return app.store.read_json(name, "resume.json")
+
+
+def fetch_posting(source: str) -> Dict:
+    """
+    Turn a posting URL or posting text into {"text", "job_posting_ld", "url"}.
+    URLs are scraped like menu option 2 does; anything else is taken as the posting itself.
+    """
+    if source.startswith(("http://", "https://")):
+        scraped = app.scrape_job_posting(source)
+        try:
+            data = json.loads(scraped)
+        except ValueError:
+            raise Exception(scraped)
+        return {"text": data.get("ai_description", ""), "job_posting_ld": data.get("job_posting_ld"), "url": source}
+    return {"text": source, "job_posting_ld": None, "url": None}
+
+
+def clean_posting(text: str, job_posting_ld: Dict = None, llm_clean: bool = False) -> str:
+    """Clean a posting locally when it is well structured, otherwise with the LLM (errors are raised)."""
+    return app.clean_job_posting_text(text, job_posting_ld=job_posting_ld, local_first=not llm_clean, fallback=False)
+
+
+def tailor(posting: str, baseline: str = "baseline", name: Optional[str] = None, cover_letter: bool = False,
+           tailor_mode: str = "full", top_k: int = None, llm_clean: bool = False, dedup: bool = True,
+           baseline_resume: Dict = None, fused: bool = False) -> Dict:
+    """
+    Tailor a baseline resume to a posting (URL or text).
+
+    With a name, the cleaned posting, baseline, resume and cover letter are saved to
+    resumes/<name>/ like menu option 2 and 5 would. With dedup, a posting already
+    tailored from the same baseline is answered from that earlier result instead.
+    fused=True cleans, tailors (patch-style) and writes the cover letter in one request.
+    Returns {"name", "duplicate_of", "job_posting", "resume", "cover_letter"}.
+    """
+    if baseline_resume is None:
+        baseline_resume = _require_resume(baseline)
+    fetched = fetch_posting(posting)
+    baseline_hash = content_hash(baseline_resume)
+    result = {"name": name, "duplicate_of": None, "job_posting": None, "resume": None, "cover_letter": None}
+
+    match = app.posting_index.lookup(fetched["text"], baseline_hash) if dedup else None
+    reused = load_package(app.store, match.name) if match and match.name != name else None
+    if reused is not None:
+        result.update(duplicate_of=match.name, job_posting=reused.get("job_posting_ai.txt") or fetched["text"],
+                      resume=reused["resume.json"], cover_letter=reused.get("cover_letter.json"))
+    elif fused:
+        package = _tailor().tailor_package(baseline_resume, fetched["text"], top_k=top_k)
+        result.update(job_posting=package["job_posting"], resume=package["resume"])
+        if cover_letter:
+            result["cover_letter"] = app.normalize_text(package["cover_letter"])
+    else:
+        result["job_posting"] = clean_posting(fetched["text"], fetched["job_posting_ld"], llm_clean)
+        resume = _tailor().tailor_resume(baseline_resume, result["job_posting"], mode=tailor_mode, top_k=top_k)
+        resume["status"] = "complete"
+        result["resume"] = resume
+    if cover_letter and result["cover_letter"] is None:
+        result["cover_letter"] = app.create_cover_letter(result["resume"], result["job_posting"])
+        if result["cover_letter"] is None:
+            raise Exception("Cover letter generation failed.")
+
+    if name:
+        files = {
+            "job_posting_ai.txt": result["job_posting"],
+            "baseline_resume.json": baseline_resume,
+            "resume.json": result["resume"],
+        }
+        if result["cover_letter"] is not None:
+            files["cover_letter.json"] = result["cover_letter"]
+        app.save_package(name, files)
+        app.resume_index.update(name)
+        if result["duplicate_of"] is None:
+            app.posting_index.add(name, fetched["text"], baseline_hash)
+    return result
+
+
+def cover_letter(name: str) -> Dict:
+    """Write (or rewrite) the cover letter of a saved tailored resume and return it."""
+    resume = _require_resume(name)
+    job_posting_path = os.path.join(app.get_resume_path(name), "job_posting_ai.txt")
+    if not os.path.exists(job_posting_path):
+        raise Exception(f"Resume '{name}' has no job posting; tailor it first.")
+    with open(job_posting_path, "r", encoding="utf-8", errors="replace") as f:
+        job_posting = f.read()
+    letter = app.create_cover_letter(resume, job_posting)
+    if letter is None:
+        raise Exception("Cover letter generation failed.")
+    app.store.write_json(name, "cover_letter.json", letter)
+    app.resume_index.update(name)
+    return letter
+
+
+def list_resumes(status: str = None, has_job_posting: bool = None) -> Dict[str, Dict]:
+    """{name: metadata} from the resume index, like menu option 3."""
+    app.ensure_resumes_dir()
+    return app.resume_index.list(status=status, has_job_posting=has_job_posting)
+
+
+def show(name: str) -> Dict:
+    """Everything saved for one resume: {"name", "resume", "job_posting", "cover_letter"}."""
+    result = {"name": name, "resume": _require_resume(name), "job_posting": None, "cover_letter": None}
+    job_posting_path = os.path.join(app.get_resume_path(name), "job_posting_ai.txt")
+    if os.path.exists(job_posting_path):
+        with open(job_posting_path, "r", encoding="utf-8", errors="replace") as f:
+            result["job_posting"] = f.read()
+    if app.store.exists(name, "cover_letter.json"):
+        result["cover_letter"] = app.store.read_json(name, "cover_letter.json")
+    return result
+
+
+def import_baseline(document: Dict, name: str = "baseline") -> Dict:
+    """
+    Check a resume document against the resume schema and save it as resumes/<name>/resume.json.
+    A bare resume (without the {"resume": ...} wrapper) is wrapped, and a missing status
+    and last_modified are filled in.
+    """
+    if "resume" not in document:
+        document = {"resume": document}
+    document = dict(document)
+    document.setdefault("status", "complete")
+    document.setdefault("last_modified", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    check_schema(document, validate_resume, source="Imported file")
+    app.ensure_resumes_dir()
+    app.store.write_json(name, "resume.json", document)
+    app.resume_index.update(name)
+    return {"name": name, "path": app.store.path(name, "resume.json")}
+
+
+# Command line ---------------------------------------------------------------
+
+def _read_input(source: str, allow_url: bool = False) -> str:
+    """'-' reads stdin and a file path is read; with allow_url an http(s) URL is returned as is."""
+    if source == "-":
+        return sys.stdin.read()
+    if os.path.isfile(source):
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    if allow_url and source.lower().startswith(("http://", "https://")):
+        return source
+    expected = "a file, an http(s) URL or '-' for stdin" if allow_url else "a file or '-' for stdin"
+    raise Exception(f"'{source}' is not {expected}.")
+
+
+def _run_tailor(args):
+    baseline_resume = None
+    if args.baseline_file:
+        baseline_resume = json.loads(_read_input(args.baseline_file))
+    posting = args.text if args.text is not None else _read_input(args.posting, allow_url=True)
+    return tailor(posting, baseline=args.baseline, name=args.name,
+                  cover_letter=args.cover_letter, tailor_mode=args.tailor_mode, top_k=args.top_k,
+                  llm_clean=args.llm_clean, dedup=not args.no_dedup, baseline_resume=baseline_resume,
+                  fused=args.fused)
+
+
+def _run_list(args):
+    return list_resumes(status=args.status, has_job_posting=True if args.has_job_posting else None)
+
+
+def _run_import(args):
+    return import_baseline(json.loads(_read_input(args.resume)), name=args.name)
+
+
+COMMANDS = {
+    "tailor": _run_tailor,
+    "cover-letter": lambda args: cover_letter(args.name),
+    "list": _run_list,
+    "show": lambda args: show(args.name),
+    "import-baseline": _run_import,
+}
+
+
+def add_subcommands(parser: argparse.ArgumentParser):
+    """Register the headless subcommands on main.py's argument parser."""
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND",
+                                       help="Run one step headlessly and print JSON (no command starts the menu).")
+
+    tailor_parser = subparsers.add_parser("tailor", help="Tailor a baseline resume to one posting.")
+    posting_source = tailor_parser.add_mutually_exclusive_group()
+    posting_source.add_argument("posting", nargs="?", default="-", help="Posting URL, text file, or '-' for stdin.")
+    posting_source.add_argument("--text", help="The posting text itself, instead of a URL or file.")
+    tailor_parser.add_argument("--baseline", default="baseline", help="Baseline resume name under resumes/.")
+    tailor_parser.add_argument("--baseline-file", help="Use this resume JSON file (or '-') as the baseline instead.")
+    tailor_parser.add_argument("--name", help="Save the result to resumes/NAME/ (otherwise it is only printed).")
+    tailor_parser.add_argument("--cover-letter", action="store_true", help="Also write a cover letter.")
+    tailor_parser.add_argument("--tailor-mode", choices=["full", "patch", "fanout"], default="full")
+    tailor_parser.add_argument("--top-k", type=int, metavar="K")
+    tailor_parser.add_argument("--llm-clean", action="store_true")
+    tailor_parser.add_argument("--fused", action="store_true",
+                               help="Clean, tailor and write the cover letter in a single request.")
+    tailor_parser.add_argument("--no-dedup", action="store_true", help="Tailor even if this posting was seen before.")
+
+    letter_parser = subparsers.add_parser("cover-letter", help="Write the cover letter for a saved tailored resume.")
+    letter_parser.add_argument("name")
+
+    list_parser = subparsers.add_parser("list", help="List saved resumes with their status.")
+    list_parser.add_argument("--status", help="Only resumes with this status, e.g. 'complete'.")
+    list_parser.add_argument("--has-job-posting", action="store_true", help="Only tailored resumes.")
+
+    show_parser = subparsers.add_parser("show", help="Print a saved resume with its job posting and cover letter.")
+    show_parser.add_argument("name")
+
+    import_parser = subparsers.add_parser("import-baseline", help="Validate a resume JSON file and save it.")
+    import_parser.add_argument("resume", help="Resume JSON file, or '-' for stdin.")
+    import_parser.add_argument("--name", default="baseline")
+
+    for subparser in subparsers.choices.values():
+        subparser.add_argument("--verbose", action="store_true", help="Show progress messages on stderr.")
+        # Also accepted after the subcommand; SUPPRESS keeps a value given before it.
+        subparser.add_argument("--trace", action="store_true", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+        subparser.add_argument("--profile", nargs="?", const="", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+
+
+def run_command(args) -> int:
+    """Run a parsed subcommand, print its JSON result (or {"error": ...}) and return the exit code."""
+    if args.verbose:
+        log_to_stderr()
+    else:
+        quiet()
+    app.store.recover()
+    try:
+        # Stray prints from deeper layers must not corrupt the JSON on stdout.
+        with contextlib.redirect_stdout(sys.stderr):
+            result, code = COMMANDS[args.command](args), 0
+    except Exception as e:
+        result, code = {"error": str(e)}, 1
+    sys.stdout.write(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+    return code
@@ -0,0 +1,223 @@
+"""
+Background MIDI playback for the interactive menu.
+
+BackgroundPlayer starts a daemon thread that loads the MIDI catalog, initialises
+the pygame mixer and works through a shuffled playlist, so none of that happens
+before the first prompt. The catalog (file names, sizes and durations) is cached
+on disk and only rebuilt when the midi/ directory changes. Problems such as a
+missing directory or no audio device are recorded on the player instead of being
+printed over the menu.
+"""
+import json
+import os
+import queue
+import random
+import struct
+import threading
+from typing import Dict, List, Optional
+
+from llm_cache import CACHE_DIR
+
+MIDI_DIR = "midi"
+MIDI_CATALOG_PATH = os.path.join(CACHE_DIR, "midi_catalog.json")
+MIDI_EXTENSIONS = (".mid", ".midi")
+CATALOG_VERSION = 1
+DEFAULT_TEMPO = 500000  # microseconds per quarter note (120 bpm)
+
+
+def _read_varlen(data: bytes, pos: int):
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def midi_duration(path: str) -> float:
+    """Length of a Standard MIDI File in seconds, following its tempo changes."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != b"MThd":
+        raise ValueError(f"{path} is not a Standard MIDI File")
+    header_length, _, track_count, division = struct.unpack(">IHHH", data[4:14])
+    pos = 8 + header_length
+
+    tempo_changes = []  # (tick, microseconds per quarter note)
+    end_tick = 0
+    for _ in range(track_count):
+        if data[pos:pos + 4] != b"MTrk":
+            break
+        (track_length,) = struct.unpack(">I", data[pos + 4:pos + 8])
+        pos += 8
+        track_end = min(pos + track_length, len(data))
+        tick, status = 0, 0
+        while pos < track_end:
+            delta, pos = _read_varlen(data, pos)
+            tick += delta
+            if data[pos] & 0x80:
+                status = data[pos]
+                pos += 1
+            if status == 0xFF:
+                meta_type = data[pos]
+                length, pos = _read_varlen(data, pos + 1)
+                if meta_type == 0x51 and length == 3:
+                    tempo_changes.append((tick, int.from_bytes(data[pos:pos + 3], "big")))
+                pos += length
+                if meta_type == 0x2F:
+                    break
+            elif status in (0xF0, 0xF7):
+                length, pos = _read_varlen(data, pos)
+                pos += length
+            else:
+                pos += 1 if status & 0xF0 in (0xC0, 0xD0) else 2
+        end_tick = max(end_tick, tick)
+        pos = track_end
+
+    if division & 0x8000:  # SMPTE: frames per second x ticks per frame
+        frames = 256 - (division >> 8)
+        return end_tick / (frames * (division & 0xFF))
+
+    seconds, last_tick, tempo = 0.0, 0, DEFAULT_TEMPO
+    for change_tick, new_tempo in sorted(tempo_changes):
+        if change_tick >= end_tick:
+            break
+        seconds += (change_tick - last_tick) * tempo / division / 1e6
+        last_tick, tempo = change_tick, new_tempo
+    return seconds + (end_tick - last_tick) * tempo / division / 1e6
+
+
+class MidiCatalog:
+    """MIDI files in midi_dir with their sizes and durations, cached in a JSON file."""
+
+    def __init__(self, midi_dir: str = MIDI_DIR, cache_path: str = MIDI_CATALOG_PATH):
+        self.midi_dir = midi_dir
+        self.cache_path = cache_path
+
+    def _read_cache(self) -> Dict:
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cached.get("version") != CATALOG_VERSION or cached.get("midi_dir") != os.path.abspath(self.midi_dir):
+            return {}
+        return cached
+
+    def load(self) -> List[Dict]:
+        """Return the catalog, rescanning midi_dir only if it changed since the cache was written."""
+        dir_mtime_ns = os.stat(self.midi_dir).st_mtime_ns
+        cached = self._read_cache()
+        if cached.get("dir_mtime_ns") == dir_mtime_ns:
+            return cached["tracks"]
+
+        known = {(t["file"], t["size"], t["mtime_ns"]): t for t in cached.get("tracks", [])}
+        tracks = []
+        for entry in sorted(os.scandir(self.midi_dir), key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.lower().endswith(MIDI_EXTENSIONS):
+                continue
+            stat = entry.stat()
+            track = known.get((entry.name, stat.st_size, stat.st_mtime_ns))
+            if track is None:
+                try:
+                    duration = round(midi_duration(entry.path), 2)
+                except (OSError, ValueError, IndexError, struct.error):
+                    duration = None
+                track = {"file": entry.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                         "duration": duration}
+            tracks.append(track)
+
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CATALOG_VERSION, "midi_dir": os.path.abspath(self.midi_dir),
+                       "dir_mtime_ns": dir_mtime_ns, "tracks": tracks}, f)
+        os.replace(tmp_path, self.cache_path)
+        return tracks
+
+
+class BackgroundPlayer:
+    """Plays the MIDI catalog as a shuffled, repeating playlist on a daemon thread."""
+
+    def __init__(self, midi_dir: str = MIDI_DIR, catalog: MidiCatalog = None, shuffle: bool = True,
+                 poll_interval: float = 0.5):
+        self.midi_dir = midi_dir
+        self.catalog = catalog or MidiCatalog(midi_dir)
+        self.shuffle = shuffle
+        self.poll_interval = poll_interval
+        self.playlist: List[Dict] = []
+        self.now_playing: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self._commands = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Start playback in the background and return immediately."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="midi-player", daemon=True)
+            self._thread.start()
+        return self
+
+    def next_track(self):
+        self._commands.put("next")
+
+    def stop(self, timeout: float = 2.0):
+        if self._thread is not None:
+            self._commands.put("stop")
+            self._thread.join(timeout)
+
+    @property
+    def playing(self) -> bool:
+        return self.now_playing is not None
+
+    def _run(self):
+        try:
+            if not os.path.isdir(self.midi_dir):
+                self.error = f"'{self.midi_dir}' directory not found."
+                return
+            self.playlist = list(self.catalog.load())
+            if not self.playlist:
+                self.error = f"No MIDI files found in the '{self.midi_dir}' directory."
+                return
+            if self.shuffle:
+                random.shuffle(self.playlist)
+
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            import pygame  # loaded here so the menu never waits on it
+
+            pygame.mixer.init()
+        except Exception as e:
+            self.error = f"Error starting MIDI playback: {e}"
+            return
+
+        position, failures = -1, 0
+        try:
+            while True:
+                # Each track plays once; the mixer stays initialised between tracks.
+                position = (position + 1) % len(self.playlist)
+                track = self.playlist[position]
+                try:
+                    pygame.mixer.music.load(os.path.join(self.midi_dir, track["file"]))
+                    pygame.mixer.music.play()
+                    self.now_playing = track
+                    self.error = None  # an earlier track's failure no longer applies
+                except Exception as e:
+                    self.error = f"Error playing {track['file']}: {e}"
+                    failures += 1
+                    if failures >= len(self.playlist):
+                        break  # nothing in the playlist can be played
+                    continue
+                failures = 0
+                command = None
+                while command is None and pygame.mixer.music.get_busy():
+                    try:
+                        command = self._commands.get(timeout=self.poll_interval)
+                    except queue.Empty:
+                        pass
+                if command == "stop":
+                    break
+        finally:
+            self.now_playing = None
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
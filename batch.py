@@ -0,0 +1,428 @@
+"""
+Non-interactive batch tailoring.
+
+Runs every job posting listed in an input file through the same pipeline as menu
+option 2 and 5 (scrape -> clean -> tailor -> cover letter) with bounded concurrency
+and per-stage rate limiting, writing each result into its own resumes/<name>/ folder.
+With --fused the pipeline is scrape -> tailor, where tailor cleans the posting and
+writes the cover letter in the same request.
+
+With --top-k, the baseline is cut down to the bullets relevant to each posting before
+tailoring. Every posting queued for the tailor stage is scored in one
+relevance.focus_many() call, not one matrix product per posting.
+
+Each non-empty line of the input file is either a posting URL or the path to a text
+file containing the posting. Lines starting with '#' are ignored.
+
+    python batch.py postings.txt --baseline baseline --workers 8 --rate clean=60
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import main as app
+import tracing
+from compact_storage import content_hash
+from dedup import DEFAULT_THRESHOLD, PostingIndex, load_package
+from llm_cache import default_cache
+from relevance import focus_many
+from resilience import TokenBucket, default_resilience
+from structured_output import ResumeTailorStructuredOutput
+
+STAGES = ["scrape", "clean", "tailor", "cover_letter"]
+
+
+@dataclass
+class BatchJob:
+    index: int
+    source: str
+    name: str
+    job_posting: Optional[str] = None
+    ai_job_posting: Optional[str] = None
+    job_posting_ld: Optional[Dict] = None
+    cleaned_job_posting: Optional[str] = None
+    focused_baseline: Optional[Dict] = None
+    tailored_resume: Optional[Dict] = None
+    cover_letter: Optional[Dict] = None
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    span: Optional[tracing.Span] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class Stage:
+    """One pipeline stage: a bounded worker pool, an optional rate limiter and stats."""
+
+    def __init__(self, name: str, func: Callable[[BatchJob], None], workers: int, per_minute: float = None):
+        self.name = name
+        self.func = func
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"batch-{name}")
+        self.limiter = TokenBucket(per_minute) if per_minute else None
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+
+    def run(self, job: BatchJob) -> bool:
+        if self.limiter:
+            self.limiter.acquire()
+        start = time.monotonic()
+        with self.lock:
+            if self.first_start is None:
+                self.first_start = start
+        try:
+            with tracing.default_tracer.activate(job.span):
+                self.func(job)
+            ok = True
+        except Exception as e:
+            job.error = str(e)
+            job.failed_stage = self.name
+            ok = False
+        end = time.monotonic()
+        job.stage_seconds[self.name] = end - start
+        with self.lock:
+            self.busy_seconds += end - start
+            self.last_end = end
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        return ok
+
+    def throughput(self) -> float:
+        """Completed items per minute over the stage's active window."""
+        if not self.completed or self.first_start is None:
+            return 0.0
+        window = max(self.last_end - self.first_start, 1e-9)
+        return self.completed / window * 60.0
+
+
+class BatchPipeline:
+    def __init__(self, baseline_resume: Dict, workers: Dict[str, int], rates: Dict[str, float],
+                 cover_letters: bool = True, tailor_mode: str = "full", llm_clean: bool = False,
+                 top_k: int = None, dedup_threshold: Optional[float] = DEFAULT_THRESHOLD, fused: bool = False):
+        self.baseline_resume = baseline_resume
+        self.baseline_hash = content_hash(baseline_resume)
+        self.postings = PostingIndex(app.RESUMES_DIR, dedup_threshold) if dedup_threshold is not None else None
+        self.claim_lock = threading.Lock()
+        self.finished: Dict[str, threading.Event] = {}
+        self.tailor_mode = tailor_mode
+        self.top_k = top_k
+        self.unfocused: List[BatchJob] = []
+        self.focus_lock = threading.Lock()
+        self.llm_clean = llm_clean
+        self.cover_letters = cover_letters
+        self.fused = fused
+        self.tailor = ResumeTailorStructuredOutput()
+        stage_funcs = {
+            "scrape": self.scrape,
+            "clean": self.clean,
+            "tailor": self.tailor_job,
+            "cover_letter": self.write_cover_letter,
+        }
+        if fused:
+            names = ["scrape", "tailor"]
+        else:
+            names = STAGES if cover_letters else STAGES[:-1]
+        self.stages = [Stage(n, stage_funcs[n], workers.get(n, 4), rates.get(n)) for n in names]
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.done = threading.Event()
+
+    # Stage implementations -------------------------------------------------
+
+    def scrape(self, job: BatchJob):
+        if job.source.startswith(("http://", "https://")):
+            job.job_posting = app.scrape_job_posting(job.source)
+            try:
+                scraped = json.loads(job.job_posting)
+                job.ai_job_posting = scraped.get("ai_description", job.job_posting)
+                job.job_posting_ld = scraped.get("job_posting_ld")
+            except Exception:
+                raise Exception(job.job_posting)
+        else:
+            with tracing.span("scrape"), open(job.source, "r") as f:
+                job.job_posting = f.read()
+            job.ai_job_posting = job.job_posting
+        if self.postings is not None:
+            self.reuse_duplicate(job)
+
+    def reuse_duplicate(self, job: BatchJob):
+        """
+        Skip the remaining stages when an earlier resume was tailored from the same (or a
+        near-identical) posting. Otherwise claim the posting, so duplicates later in this
+        batch wait for this job instead of tailoring it again.
+        """
+        with self.claim_lock:
+            match = self.postings.lookup(job.ai_job_posting, self.baseline_hash)
+            if match is None or match.name == job.name:
+                self.postings.add(job.name, job.ai_job_posting, self.baseline_hash)
+                return
+        in_flight = self.finished.get(match.name)
+        if in_flight is not None:
+            in_flight.wait()
+        files = load_package(app.store, match.name)
+        if files is None:
+            with self.claim_lock:
+                if in_flight is None:
+                    self.postings.remove(match.name)  # deleted or never finished
+                self.postings.add(job.name, job.ai_job_posting, self.baseline_hash)
+            return
+        job.duplicate_of = match.name
+        tracing.annotate("duplicate_of", match.name)
+        job.cleaned_job_posting = files.get("job_posting_ai.txt") or job.ai_job_posting
+        job.tailored_resume = files["resume.json"]
+        job.cover_letter = files.get("cover_letter.json")
+
+    def clean(self, job: BatchJob):
+        job.cleaned_job_posting = app.clean_job_posting_text(job.ai_job_posting, job_posting_ld=job.job_posting_ld,
+                                                          local_first=not self.llm_clean, fallback=False)
+
+    def tailor_posting(self, job: BatchJob) -> str:
+        return job.ai_job_posting if self.fused else job.cleaned_job_posting
+
+    def focused_baseline(self, job: BatchJob) -> Dict:
+        """
+        The baseline cut down to the top_k most relevant bullets for this job's posting. The
+        first tailor worker to get here scores every job queued for the tailor stage so far
+        in a single focus_many() call; the others find their baseline already focused.
+        """
+        if not self.top_k:
+            return self.baseline_resume
+        with self.focus_lock:
+            if job.focused_baseline is None:
+                waiting, self.unfocused = self.unfocused, []
+                if not any(queued is job for queued in waiting):
+                    waiting.append(job)
+                with tracing.span("focus", postings=len(waiting)):
+                    focused = focus_many(self.baseline_resume, [self.tailor_posting(j) for j in waiting], self.top_k)
+                for queued, baseline in zip(waiting, focused):
+                    queued.focused_baseline = baseline
+        baseline, job.focused_baseline = job.focused_baseline, None
+        return baseline
+
+    def tailor_job(self, job: BatchJob):
+        baseline_resume = self.focused_baseline(job)
+        if self.fused:
+            package = self.tailor.tailor_package(baseline_resume, job.ai_job_posting)
+            job.cleaned_job_posting = package["job_posting"]
+            job.tailored_resume = package["resume"]
+            if self.cover_letters:
+                job.cover_letter = app.normalize_text(package["cover_letter"])
+            return
+        job.tailored_resume = self.tailor.tailor_resume(baseline_resume, job.cleaned_job_posting, mode=self.tailor_mode)
+        job.tailored_resume["status"] = "complete"
+
+    def write_cover_letter(self, job: BatchJob):
+        job.cover_letter = app.create_cover_letter(job.tailored_resume, job.cleaned_job_posting)
+        if job.cover_letter is None:
+            raise Exception("Cover letter generation failed.")
+
+    def commit(self, job: BatchJob):
+        """Write everything a job produced to its resume directory as one all-or-nothing commit."""
+        files = {
+            "job_posting_ai.txt": job.cleaned_job_posting,
+            "baseline_resume.json": self.baseline_resume,
+            "resume.json": job.tailored_resume,
+        }
+        if job.cover_letter is not None:
+            files["cover_letter.json"] = job.cover_letter
+        app.save_package(job.name, files)
+        app.resume_index.update(job.name)
+
+    # Scheduling -------------------------------------------------------------
+
+    def _advance(self, job: BatchJob, stage_index: int):
+        stage = self.stages[stage_index]
+        if stage.run(job):
+            if job.duplicate_of is None and stage_index + 1 < len(self.stages):
+                if self.top_k and self.stages[stage_index + 1].name == "tailor":
+                    with self.focus_lock:
+                        self.unfocused.append(job)
+                self.stages[stage_index + 1].pool.submit(self._advance, job, stage_index + 1)
+                return
+            try:
+                self.commit(job)
+            except Exception as e:
+                job.error = str(e)
+                job.failed_stage = "save"
+        if job.error and job.duplicate_of is None and self.postings is not None:
+            self.postings.remove(job.name)
+        if job.name in self.finished:
+            self.finished[job.name].set()
+        tracing.default_tracer.finish(job.span, job.error)
+        with self.pending_lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.done.set()
+
+    def run(self, jobs: List[BatchJob]) -> float:
+        """Push every job through all stages and return the elapsed wall time."""
+        start = time.monotonic()
+        if not jobs:
+            return 0.0
+        self.pending = len(jobs)
+        self.done.clear()
+        self.finished = {job.name: threading.Event() for job in jobs}
+        for job in jobs:
+            job.span = tracing.default_tracer.open("posting", resume=job.name, source=job.source)
+        for job in jobs:
+            self.stages[0].pool.submit(self._advance, job, 0)
+        self.done.wait()
+        for stage in self.stages:
+            stage.pool.shutdown()
+        return time.monotonic() - start
+
+
+def slugify(text: str, max_length: int = 40) -> str:
+    text = re.sub(r"\.[a-z0-9]+$", "", text.rstrip("/").rsplit("/", 1)[-1].lower())
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-")[:max_length] or "posting"
+
+
+def read_sources(path: str) -> List[str]:
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def build_jobs(sources: List[str], prefix: str) -> List[BatchJob]:
+    return [BatchJob(index=i, source=src, name=f"{prefix}-{i:04d}-{slugify(src)}")
+            for i, src in enumerate(sources, start=1)]
+
+
+def parse_stage_options(values: List[str], default, cast) -> Dict:
+    """Parse repeated 'stage=value' options; a bare value applies to every stage."""
+    options = {stage: default for stage in STAGES}
+    for value in values or []:
+        if "=" in value:
+            stage, _, amount = value.partition("=")
+            if stage not in STAGES:
+                raise SystemExit(f"Unknown stage '{stage}'. Choose from: {', '.join(STAGES)}")
+            options[stage] = cast(amount)
+        else:
+            options = {stage: cast(value) for stage in STAGES}
+    return options
+
+
+def print_report(pipeline: BatchPipeline, jobs: List[BatchJob], elapsed: float):
+    from rich.table import Table
+
+    table = Table(title="Batch Pipeline Throughput")
+    table.add_column("Stage")
+    table.add_column("Done", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Avg s/item", justify="right")
+    table.add_column("Items/min", justify="right")
+    for stage in pipeline.stages:
+        handled = stage.completed + stage.failed
+        avg = stage.busy_seconds / handled if handled else 0.0
+        table.add_row(stage.name, str(stage.completed), str(stage.failed), f"{avg:.2f}", f"{stage.throughput():.1f}")
+    app.console.print(table)
+
+    cache = default_cache.stats()
+    app.console.print(f"LLM cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions.")
+    api = default_resilience.stats()
+    circuit = api["circuit"] + (f", opened {api['circuit_opens']}x" if api["circuit_opens"] else "")
+    app.console.print(f"OpenAI calls: {api['succeeded']}/{api['calls']} succeeded, {api['retries']} retries "
+                      f"({api['rate_limited']} rate limited, {api['server_errors']} server errors, "
+                      f"{api['timeouts']} timeouts), {api['backoff_seconds']:.1f}s backing off, "
+                      f"{api['throttle_seconds']:.1f}s throttled, circuit {circuit}.")
+
+    duplicates = [job for job in jobs if job.duplicate_of and job.error is None]
+    if duplicates:
+        app.console.print(f"Reused {len(duplicates)} earlier results for duplicate postings:")
+        for job in duplicates:
+            app.console.print(f"  {job.name} -> {job.duplicate_of}")
+
+    succeeded = sum(1 for job in jobs if job.error is None)
+    app.console.print(f"[bold]{succeeded}/{len(jobs)} postings completed in {elapsed:.1f}s "
+                      f"({succeeded / elapsed * 60 if elapsed else 0:.1f} postings/min).[/bold]")
+    for job in jobs:
+        if job.error:
+            app.console.print(f"[red]{job.name} failed at {job.failed_stage}: {job.error}[/red]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tailor a baseline resume against many job postings.")
+    parser.add_argument("postings", help="File listing one posting URL or posting text file per line.")
+    parser.add_argument("--baseline", default="baseline", help="Name of the baseline resume under resumes/.")
+    parser.add_argument("--prefix", default="batch", help="Prefix for the generated resume directories.")
+    parser.add_argument("--workers", action="append", metavar="[STAGE=]N",
+                        help="Concurrent workers per stage (default 4). Repeat for per-stage values.")
+    parser.add_argument("--rate", action="append", metavar="[STAGE=]PER_MIN",
+                        help="Maximum calls per minute for a stage. Repeat for per-stage values.")
+    parser.add_argument("--rpm", type=float, help="Shared limit on OpenAI requests per minute across all stages.")
+    parser.add_argument("--tpm", type=float, help="Shared limit on OpenAI tokens per minute across all stages.")
+    parser.add_argument("--tailor-mode", choices=["full", "patch", "fanout"], default="full",
+                        help="'patch' sends only the editable resume fields and merges the result locally; "
+                             "'fanout' tailors them in parallel requests, one per work_experience entry.")
+    parser.add_argument("--llm-clean", action="store_true", help="Always clean postings with the LLM.")
+    parser.add_argument("--top-k", type=int, metavar="K",
+                        help="Send only the K most relevant responsibilities/achievements/technologies per job.")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD, metavar="SIMILARITY",
+                        help=f"Reuse the result of an earlier posting at least this similar (default {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--no-dedup", action="store_true", help="Tailor every posting, even duplicates.")
+    parser.add_argument("--no-cover-letter", action="store_true", help="Stop after tailoring.")
+    parser.add_argument("--fused", action="store_true",
+                        help="Clean, tailor and write the cover letter in one request per posting (patch-style).")
+    parser.add_argument("--render", metavar="FORMATS",
+                        help="Render finished resumes afterwards, e.g. 'pdf,docx' (see render.py).")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache.")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-stage spans to cache/traces/ and add a timing/token table to the report.")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="Run under cProfile and write the stats to PATH (default cache/profiles/).")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint to use instead of api.openai.com.")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    if args.no_cache:
+        default_cache.enabled = False
+    if args.rpm or args.tpm:
+        default_resilience.set_limits(args.rpm, args.tpm)
+    if app.api_key and not os.getenv("OPENAI_API_KEY"):
+        os.environ["OPENAI_API_KEY"] = app.api_key
+
+    app.store.recover()
+    baseline_resume = app.load_resume(args.baseline)
+    if not baseline_resume:
+        raise SystemExit(f"Could not load baseline resume '{args.baseline}'.")
+
+    jobs = build_jobs(read_sources(args.postings), args.prefix)
+    pipeline = BatchPipeline(
+        baseline_resume,
+        workers=parse_stage_options(args.workers, 4, int),
+        rates=parse_stage_options(args.rate, None, float),
+        cover_letters=not args.no_cover_letter,
+        tailor_mode=args.tailor_mode,
+        llm_clean=args.llm_clean,
+        top_k=args.top_k,
+        dedup_threshold=None if args.no_dedup else args.dedup_threshold,
+        fused=args.fused,
+    )
+    app.console.print(f"[bold cyan]Running {len(jobs)} postings through the batch pipeline...[/bold cyan]")
+    with tracing.run_session(app.console, trace=args.trace, profile=args.profile):
+        elapsed = pipeline.run(jobs)
+        print_report(pipeline, jobs, elapsed)
+    if args.render:
+        from render import render_tree
+
+        finished = [job.name for job in jobs if job.error is None]
+        results = render_tree(app.RESUMES_DIR, finished, [fmt.strip() for fmt in args.render.split(",")])
+        for result in results:
+            if result["error"]:
+                app.console.print(f"[red]{result['name']} failed to render: {result['error']}[/red]")
+        app.console.print(f"Rendered {sum(len(r['rendered']) for r in results)} files for {len(finished)} postings.")
+
+
+if __name__ == "__main__":
+    main()
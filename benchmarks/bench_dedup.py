@@ -0,0 +1,105 @@
+"""
+Benchmark duplicate job-posting detection (dedup.py).
+
+Indexes --postings synthetic postings (random mixes of the sample posting's
+sentences plus filler from a shared vocabulary, so unrelated postings still share
+plenty of words), then looks up three kinds of query:
+
+  - exact: an indexed posting with different case and whitespace
+  - near: an indexed posting with 1% of its words changed and a board footer added
+  - unrelated: freshly generated postings that were never indexed
+
+and reports index build and lookup times plus precision and recall of the
+near-duplicate matches at --threshold.
+
+    python benchmarks/bench_dedup.py --postings 10000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dedup  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POSTING = os.path.join(ROOT, "resumes", "anthropic", "job_posting_ai.txt")
+BASELINE_HASH = "bench-baseline"
+FOOTER = "\nPosted via JobBoard. Apply today! Reference {ref}."
+
+
+def make_posting(sentences, vocabulary, rng):
+    picked = rng.sample(sentences, min(len(sentences), 12))
+    filler = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(80, 200)))
+    return "\n".join(picked) + "\n" + filler
+
+
+def near_duplicate(text, vocabulary, rng, edits=0.01):
+    words = text.split(" ")
+    for _ in range(max(1, int(len(words) * edits))):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return " ".join(words) + FOOTER.format(ref=rng.randint(1000, 9999))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH duplicate posting detection.")
+    parser.add_argument("--postings", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=1000, help="Queries of each kind.")
+    parser.add_argument("--threshold", type=float, default=dedup.DEFAULT_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(POSTING, "r", encoding="utf-8", errors="replace") as f:
+        sample = f.read()
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", sample) if len(s.split()) > 3]
+    vocabulary = sorted(set(re.findall(r"[A-Za-z]+", sample))) + [f"term{i}" for i in range(3000)]
+    postings = [make_posting(sentences, vocabulary, rng) for _ in range(args.postings)]
+    print(f"numpy: {'yes' if dedup._numpy() is not None else 'no (pure Python MinHash)'}")
+
+    with tempfile.TemporaryDirectory() as resumes_dir:
+        index = dedup.PostingIndex(resumes_dir, args.threshold)
+        start = time.perf_counter()
+        for i, text in enumerate(postings):
+            index.add(f"posting-{i:05d}", text, BASELINE_HASH)
+        build = time.perf_counter() - start
+        size = sum(os.path.getsize(path) for path in (index.path, index.path + "-wal") if os.path.exists(path))
+        print(f"index {args.postings} postings: {build:.2f}s ({build / args.postings * 1000:.2f} ms/posting), "
+              f"{size / 1024 / 1024:.1f} MB on disk")
+
+        picks = rng.sample(range(args.postings), min(args.queries, args.postings))
+        kinds = {
+            "exact": [(i, "  " + postings[i].upper().replace("\n", "\n\n")) for i in picks],
+            "near": [(i, near_duplicate(postings[i], vocabulary, rng)) for i in picks],
+            "unrelated": [(None, make_posting(sentences, vocabulary, rng)) for _ in picks],
+        }
+        print(f"{'query':>10}{'ms/lookup':>12}{'matched':>10}{'correct':>10}")
+        outcomes = {}
+        for kind, queries in kinds.items():
+            start = time.perf_counter()
+            results = [(expected, index.lookup(text, BASELINE_HASH)) for expected, text in queries]
+            elapsed = time.perf_counter() - start
+            matched = sum(1 for _, match in results if match)
+            correct = sum(1 for expected, match in results
+                          if (match and expected is not None and match.name == f"posting-{expected:05d}")
+                          or (match is None and expected is None))
+            outcomes[kind] = (matched, correct)
+            print(f"{kind:>10}{elapsed / len(queries) * 1000:>12.2f}{matched:>10}{correct:>10}")
+
+        true_positive = outcomes["exact"][1] + outcomes["near"][1]
+        false_positive = (outcomes["exact"][0] - outcomes["exact"][1]) + (outcomes["near"][0] - outcomes["near"][1]) \
+            + outcomes["unrelated"][0]
+        duplicates = len(kinds["exact"]) + len(kinds["near"])
+        precision = true_positive / (true_positive + false_positive) if true_positive + false_positive else 1.0
+        print(f"threshold {args.threshold}: precision {precision:.3f}, recall {true_positive / duplicates:.3f}")
+
+        other = index.lookup(kinds["exact"][0][1], "another-baseline")
+        assert other is None, "matches must be limited to the same baseline"
+
+
+if __name__ == "__main__":
+    main()
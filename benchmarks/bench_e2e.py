@@ -0,0 +1,140 @@
+"""
+End-to-end benchmark of the batch pipeline against local stand-ins.
+
+Starts benchmarks/fake_openai.py (canned cleaned postings, the baseline echoed back
+as the tailored resume, stub cover letters; configurable latency, token rate and
+injected failures) and benchmarks/fixture_server.py (saved job-board HTML), then
+runs the real batch.py - scrape -> clean -> tailor -> cover letter - as a child
+process in a scratch directory at 1, 10, 100 and 1000 postings. For each size it
+reports throughput, p50/p95 per-posting latency (from the --trace spans), peak RSS
+of the batch process and bytes written to resumes/.
+
+    python benchmarks/bench_e2e.py --sizes 1,10,100 --latency 0.05 --tokens-per-second 2000
+    python benchmarks/bench_e2e.py --json before.json   # keep results to compare against later
+
+Postings are spread over the fixture pages with distinct query strings, and
+duplicate detection and the LLM cache are off by default so every posting does the
+full amount of work (--dedup turns duplicate detection back on).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openai  # noqa: E402
+import fixture_server  # noqa: E402
+from tracing import load_spans  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT, "resumes", "baseline")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))] if values else 0.0
+
+
+def tree_bytes(path, skip=()):
+    total = 0
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names[:] = [name for name in dir_names if name not in skip]
+        total += sum(os.path.getsize(os.path.join(dir_path, name)) for name in file_names)
+    return total
+
+
+def run_size(size, urls, args, openai_url):
+    """Run batch.py over `size` postings in a scratch directory; returns the measurements."""
+    with tempfile.TemporaryDirectory(prefix="bench-e2e-") as work_dir:
+        shutil.copytree(BASELINE_DIR, os.path.join(work_dir, "resumes", "baseline"))
+        postings_file = os.path.join(work_dir, "postings.txt")
+        with open(postings_file, "w") as f:
+            for i in range(size):
+                f.write(f"{urls[i % len(urls)]}?posting={i}\n")
+
+        command = [sys.executable, os.path.join(ROOT, "batch.py"), postings_file, "--prefix", "bench",
+                   "--base-url", openai_url, "--no-cache", "--trace", "--tailor-mode", args.tailor_mode]
+        for stage_workers in args.workers:
+            command += ["--workers", stage_workers]
+        if not args.dedup:
+            command.append("--no-dedup")
+        if args.top_k:
+            command += ["--top-k", str(args.top_k)]
+        env = dict(os.environ, OPENAI_API_KEY="sk-bench", RESUME_CACHE_DIR=os.path.join(work_dir, "cache"),
+                   PYTHONPATH=ROOT, COLUMNS="120")
+        with open(os.path.join(work_dir, "batch.log"), "w") as log:
+            start = time.perf_counter()
+            process = subprocess.Popen(command, cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+            _, status, usage = os.wait4(process.pid, 0)  # wait4 also gives this child's own peak RSS
+            wall = time.perf_counter() - start
+        if os.waitstatus_to_exitcode(status) != 0:
+            with open(os.path.join(work_dir, "batch.log")) as log:
+                raise SystemExit(f"batch.py failed at {size} postings:\n{log.read()[-2000:]}")
+
+        traces = os.listdir(os.path.join(work_dir, "cache", "traces"))
+        spans = load_spans(os.path.join(work_dir, "cache", "traces", traces[0]))
+        postings = [span for span in spans if span.name == "posting"]
+        failed = sum(1 for span in postings if span.error)
+        window = (max(span.end_ns for span in postings) - min(span.start_ns for span in postings)) / 1e9
+        latencies = [span.seconds for span in postings]
+        peak_rss_kb = usage.ru_maxrss if sys.platform != "darwin" else usage.ru_maxrss // 1024
+        return {
+            "postings": size,
+            "failed": failed,
+            "wall_seconds": wall,
+            "pipeline_seconds": window,
+            "postings_per_min": (size - failed) / window * 60 if window else 0.0,
+            "p50_seconds": percentile(latencies, 0.50),
+            "p95_seconds": percentile(latencies, 0.95),
+            "peak_rss_mb": peak_rss_kb / 1024,
+            "bytes_written": tree_bytes(os.path.join(work_dir, "resumes"), skip=("baseline",)),
+            "llm_calls": sum(span.attributes.get("llm_calls", 0) for span in spans),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end batch pipeline benchmark against local stubs.")
+    parser.add_argument("--sizes", default="1,10,100,1000", help="Comma-separated posting counts.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake OpenAI seconds per request.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Fake OpenAI generation speed.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of OpenAI requests failing with 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with 429.")
+    parser.add_argument("--workers", action="append", default=[], metavar="[STAGE=]N",
+                        help="Passed through to batch.py --workers.")
+    parser.add_argument("--tailor-mode", choices=["full", "patch", "fanout"], default="full")
+    parser.add_argument("--top-k", type=int, metavar="K", help="Passed through to batch.py --top-k.")
+    parser.add_argument("--dedup", action="store_true", help="Leave duplicate posting detection on.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to this JSON file.")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    openai_server = fake_openai.start_server(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                                             error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                                             retry_after=0.1, seed=args.seed)
+    pages = fixture_server.start_server()
+    urls = pages.urls()
+    print(f"fake OpenAI {openai_server.base_url} (latency {args.latency}s, "
+          f"{args.tokens_per_second or 'instant'} tok/s), {len(urls)} fixture pages")
+    print(f"{'postings':>9}{'failed':>8}{'wall s':>9}{'per min':>10}{'p50 s':>8}{'p95 s':>8}"
+          f"{'peak RSS':>11}{'written':>11}{'LLM calls':>11}")
+    results = []
+    for size in [int(value) for value in args.sizes.split(",")]:
+        result = run_size(size, urls, args, openai_server.base_url)
+        results.append(result)
+        print(f"{size:>9}{result['failed']:>8}{result['wall_seconds']:>9.1f}{result['postings_per_min']:>10.1f}"
+              f"{result['p50_seconds']:>8.2f}{result['p95_seconds']:>8.2f}{result['peak_rss_mb']:>9.0f}MB"
+              f"{result['bytes_written'] / 1024:>9.0f}KB{result['llm_calls']:>11}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
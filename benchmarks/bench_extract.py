@@ -0,0 +1,69 @@
+"""
+Benchmark HTML-to-text extraction over the saved job-board fixtures.
+
+Compares the original approach (BeautifulSoup html.parser + get_text() of the
+whole page) with html_extract.extract() on every installed backend, reporting
+median parse time and the size of the text that would be sent to the LLM.
+
+    python benchmarks/bench_extract.py [--runs 20] [--fixtures DIR]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extract  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def original_get_text(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser").get_text(separator="\n", strip=True)
+
+
+def time_runs(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    backends = []
+    for name in html_extract.BACKENDS:
+        try:
+            html_extract.get_backend(name)
+            backends.append(name)
+        except ImportError:
+            print(f"(skipping {name}: not installed)")
+
+    print(f"{'fixture':<32}{'method':<14}{'html KB':>9}{'ms':>9}{'chars':>9}{'vs orig':>9}")
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.basename(path)
+        size_kb = len(html.encode("utf-8")) / 1024
+        seconds, text = time_runs(lambda: original_get_text(html), args.runs)
+        original_chars = len(text)
+        print(f"{name:<32}{'original':<14}{size_kb:>9.1f}{seconds * 1000:>9.2f}{original_chars:>9}{'100%':>9}")
+        for backend in backends:
+            seconds, extraction = time_runs(lambda: html_extract.extract(html, backend), args.runs)
+            chars = len(extraction.text)
+            print(f"{'':<32}{backend:<14}{size_kb:>9.1f}{seconds * 1000:>9.2f}{chars:>9}"
+                  f"{chars / original_chars * 100:>8.0f}%")
+
+
+if __name__ == "__main__":
+    main()
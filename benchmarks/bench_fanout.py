@@ -0,0 +1,91 @@
+"""
+Compare full, patch and fan-out tailoring as resumes get longer.
+
+Builds resumes with 2, 5, 10 and 20 work_experience entries (the baseline's entries
+repeated) and tailors each with every --tailor-mode against benchmarks/fake_openai.py
+started in-process. The fake server sleeps --latency per request and paces answers at
+--tokens-per-second, so a single big structured answer takes time in proportion to
+its length, like a real model generating it. Reports wall time, requests and tokens
+per tailoring.
+
+    python benchmarks/bench_fanout.py --entries 2,5,10,20 --tokens-per-second 100
+    python benchmarks/bench_fanout.py --base-url https://api.openai.com/v1 --entries 10 --runs 1
+"""
+import argparse
+import copy
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openai  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("full", "patch", "fanout")
+POSTING = (
+    "**Title:** Senior Platform Engineer\n**Company:** Acme Robotics\n**Location(s):** Remote\n\n"
+    "### Key Responsibilities\n- Build and run Kubernetes services in Python and Go.\n"
+    "- Lead incident reviews and mentor engineers.\n\n"
+    "### Qualifications\n- 5+ years of backend engineering.\n- Experience with Terraform, AWS and observability tooling.\n"
+)
+
+
+def long_resume(baseline, entries):
+    resume = copy.deepcopy(baseline)
+    jobs = resume["resume"]["work_experience"]
+    resume["resume"]["work_experience"] = [copy.deepcopy(jobs[i % len(jobs)]) for i in range(entries)]
+    return resume
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs patch vs fan-out tailoring by resume length.")
+    parser.add_argument("--entries", default="2,5,10,20", help="Comma-separated work_experience counts.")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake OpenAI seconds per request.")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Fake OpenAI generation speed.")
+    parser.add_argument("--workers", type=int, help="Concurrent unit requests (default RESUME_FANOUT_WORKERS or 8).")
+    parser.add_argument("--base-url", help="Real OpenAI-compatible endpoint instead of the in-process fake.")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = fake_openai.start_server(latency=args.latency, tokens_per_second=args.tokens_per_second)
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+        print(f"fake OpenAI {server.base_url} (latency {args.latency}s, {args.tokens_per_second or 'instant'} tok/s)")
+    if args.workers:
+        os.environ["RESUME_FANOUT_WORKERS"] = str(args.workers)
+
+    import tracing
+    from storage import read_document
+    from structured_output import ResumeTailorStructuredOutput
+
+    baseline = read_document(os.path.join(ROOT, "resumes", "baseline"), "resume.json")
+    tailor = ResumeTailorStructuredOutput(use_cache=False)
+
+    print(f"{'entries':>8}{'mode':>8}{'wall s':>9}{'requests':>10}{'prompt tok':>12}{'compl. tok':>12}")
+    with tempfile.TemporaryDirectory(prefix="bench-fanout-") as work_dir:
+        tracing.default_tracer.start(os.path.join(work_dir, "trace.jsonl"))
+        for entries in [int(value) for value in args.entries.split(",")]:
+            resume = long_resume(baseline, entries)
+            for mode in MODES:
+                timings = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    tailored = tailor.tailor_resume(resume, POSTING, mode=mode)
+                    timings.append(time.perf_counter() - start)
+                    assert len(tailored["resume"]["work_experience"]) == entries
+                span = tracing.default_tracer.spans[-1]  # the "tailor" span of the last run
+                print(f"{entries:>8}{mode:>8}{statistics.median(timings):>9.2f}"
+                      f"{span.attributes.get('llm_calls', 0):>10}{span.attributes.get('prompt_tokens', 0):>12}"
+                      f"{span.attributes.get('completion_tokens', 0):>12}")
+        tracing.default_tracer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Exercise PageFetcher against the local fixture server.
+
+Runs four scenarios over every fixture and checks the expected network behaviour:
+  cold        - empty cache, every page downloaded
+  fresh       - cache within max_age, no requests at all
+  revalidate  - cache expired, conditional GETs answered with 304
+  retry       - server fails the first two requests per page with 503
+
+    python benchmarks/bench_fetch.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import start_server  # noqa: E402
+from http_fetch import PageFetcher  # noqa: E402
+
+
+def run(name, fetcher, server, expect_requests, expect_from_cache):
+    before = sum(server.requests.values())
+    start = time.perf_counter()
+    results = [fetcher.fetch(url) for url in server.urls()]
+    elapsed = time.perf_counter() - start
+    made = sum(server.requests.values()) - before
+    cached = sum(1 for r in results if r.from_cache)
+    ok = made == expect_requests and cached == expect_from_cache and all(r.text for r in results)
+    print(f"{name:<12}{elapsed * 1000:>10.1f} ms{made:>10} requests{cached:>8} cached"
+          f"{sum(r.bytes_downloaded for r in results):>12} bytes  {'ok' if ok else 'UNEXPECTED'}")
+    return ok
+
+
+def main():
+    server = start_server()
+    pages = len(server.urls())
+    ok = True
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = PageFetcher(cache_dir=cache_dir, max_age=3600)
+        ok &= run("cold", fetcher, server, pages, 0)
+        ok &= run("fresh", fetcher, server, 0, pages)
+        fetcher.max_age = 0
+        ok &= run("revalidate", fetcher, server, pages, pages)
+
+    retry_server = start_server(fail_first=2)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = PageFetcher(cache_dir=cache_dir, backoff=0.01)
+        ok &= run("retry", fetcher, retry_server, pages * 3, 0)
+    print(f"connections reused: {sum(server.requests.values())} requests over {len(server.connections)} connections")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare the three-call path against fused single-call tailoring.
+
+The three-call path is what menu options 2 and 5 do today: clean_job_posting_text
+(gpt-4o), tailor_resume, then create_cover_letter, so the posting travels three times
+and the resume twice. The fused path is ResumeTailorStructuredOutput.tailor_package(),
+which sends the raw posting and the editable resume fields once and gets the cleaned
+sections, the resume patch and the cover letter back together.
+
+Each saved fixture posting goes through both paths --runs times with the response
+cache off. Prompt/completion tokens come from the usage the endpoint reports (via
+the tracing counters) and wall time is measured per posting. By default the requests
+go to benchmarks/fake_openai.py started in-process, whose token counts are estimates
+and whose answers are stubs; point --base-url at a real endpoint for real numbers.
+
+    python benchmarks/bench_fused.py --latency 0.3 --tokens-per-second 100 --runs 3
+    python benchmarks/bench_fused.py --base-url https://api.openai.com/v1 --runs 1
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_openai  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+THREE_CALL_SPANS = ("clean", "tailor", "cover_letter")
+
+
+def load_postings(fixtures_dir):
+    """The text menu option 2 would send for each fixture page."""
+    from html_extract import extract
+
+    postings = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            extraction = extract(f.read())
+        postings.append((os.path.basename(path), f"{extraction.title}\n{extraction.text}"))
+    return postings
+
+
+def three_calls(app, tailor, baseline, posting, tailor_mode, local_clean):
+    cleaned = app.clean_job_posting_text(posting, local_first=local_clean, fallback=False)
+    resume = tailor.tailor_resume(baseline, cleaned, mode=tailor_mode)
+    if app.create_cover_letter(resume, cleaned) is None:
+        raise Exception("Cover letter generation failed.")
+
+
+def totals(spans, names):
+    chosen = [span for span in spans if span.name in names]
+    return {key: sum(span.attributes.get(key, 0) for span in chosen)
+            for key in ("llm_calls", "prompt_tokens", "completion_tokens")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Three-call vs fused single-call tailoring.")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the fixture postings.")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake OpenAI seconds per request.")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Fake OpenAI generation speed.")
+    parser.add_argument("--tailor-mode", choices=["full", "patch", "fanout"], default="full",
+                        help="Tailoring mode of the three-call path (fused is always patch-style).")
+    parser.add_argument("--local-clean", action="store_true",
+                        help="Let the three-call path clean well-structured postings locally first.")
+    parser.add_argument("--base-url", help="Real OpenAI-compatible endpoint instead of the in-process fake.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = fake_openai.start_server(latency=args.latency, tokens_per_second=args.tokens_per_second)
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+        print(f"fake OpenAI {server.base_url} (latency {args.latency}s, {args.tokens_per_second or 'instant'} tok/s)")
+
+    import api
+    import main as app
+    import tracing
+    from llm_cache import default_cache
+    from storage import read_document
+    from structured_output import ResumeTailorStructuredOutput
+
+    api.quiet()
+    default_cache.enabled = False
+    baseline = read_document(os.path.join(ROOT, "resumes", "baseline"), "resume.json")
+    tailor = ResumeTailorStructuredOutput(use_cache=False)
+    postings = load_postings(args.fixtures)
+
+    wall = {"three-call": [], "fused": []}
+    with tempfile.TemporaryDirectory(prefix="bench-fused-") as work_dir:
+        tracing.default_tracer.start(os.path.join(work_dir, "trace.jsonl"))
+        for _ in range(args.runs):
+            for _, posting in postings:
+                start = time.perf_counter()
+                three_calls(app, tailor, baseline, posting, args.tailor_mode, args.local_clean)
+                wall["three-call"].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                tailor.tailor_package(baseline, posting)
+                wall["fused"].append(time.perf_counter() - start)
+        tracing.default_tracer.stop()
+        spans = tracing.default_tracer.spans
+
+    count = len(wall["fused"])
+    print(f"{len(postings)} postings x {args.runs} runs, three-call tailoring in '{args.tailor_mode}' mode")
+    print(f"{'path':<12}{'calls':>8}{'prompt tok':>12}{'compl. tok':>12}{'total tok':>11}"
+          f"{'p50 s':>8}{'mean s':>8}")
+    results = {"three-call": totals(spans, THREE_CALL_SPANS), "fused": totals(spans, ("fused",))}
+    for path, result in results.items():
+        total = result["prompt_tokens"] + result["completion_tokens"]
+        print(f"{path:<12}{result['llm_calls'] / count:>8.1f}{result['prompt_tokens'] / count:>12.0f}"
+              f"{result['completion_tokens'] / count:>12.0f}{total / count:>11.0f}"
+              f"{statistics.median(wall[path]):>8.2f}{statistics.mean(wall[path]):>8.2f}")
+    before, after = results["three-call"], results["fused"]
+    saved_tokens = 1 - (after["prompt_tokens"] + after["completion_tokens"]) / max(
+        1, before["prompt_tokens"] + before["completion_tokens"])
+    saved_time = 1 - statistics.mean(wall["fused"]) / statistics.mean(wall["three-call"])
+    print(f"Fused uses {saved_tokens:.0%} fewer tokens and {saved_time:.0%} less wall time per posting.")
+
+
+if __name__ == "__main__":
+    main()
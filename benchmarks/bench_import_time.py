@@ -0,0 +1,67 @@
+"""
+Measure how long `import main` takes using `python -X importtime`.
+
+Runs the import several times in fresh interpreters, reports the median total and
+the slowest modules, and fails when the total exceeds the budget or when a heavy
+dependency (openai, pygame, rich, requests, bs4, lxml, selectolax) is imported at
+startup instead of on first use.
+
+    python benchmarks/bench_import_time.py --budget-ms 150
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["openai", "pygame", "rich", "requests", "bs4", "lxml", "selectolax"]
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_times(module: str):
+    """Return {module: (self_us, cumulative_us)} for one fresh `import module`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr}")
+    times = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            times[name] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI import time.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest modules by cumulative time.")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    total_ms = statistics.median(totals_ms)
+    last = runs[-1]
+
+    print(f"import {args.module}: median {total_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals_ms):.1f}, max {max(totals_ms):.1f}), budget {args.budget_ms:.0f} ms")
+    print(f"{'module':<40}{'self ms':>10}{'cumul ms':>10}")
+    slowest = sorted(last.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    eager = sorted({name.split(".")[0] for name in last} & set(HEAVY_MODULES))
+    ok = total_ms <= args.budget_ms and not eager
+    if eager:
+        print(f"heavy modules imported at startup: {', '.join(eager)}")
+    print("ok" if ok else "OVER BUDGET")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
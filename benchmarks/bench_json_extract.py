@@ -0,0 +1,97 @@
+"""
+Fuzz and time json_stream.extract_json on malformed cover-letter replies.
+
+Builds --cases mutations of a real cover letter (markdown fences, prose before and
+after, CRLF line endings, raw newlines and literal backslash-u sequences inside
+strings, stray braces in the prose, replies cut off at a random point) and checks
+that every complete reply comes back equal to the original, every truncated one
+still yields an object for stream rendering, and with allow_partial=False (how
+final replies are parsed) every truncated one is rejected. Then times extraction on replies from 1 KB to 1 MB to
+show the cost grows linearly with the size.
+
+    python benchmarks/bench_json_extract.py --cases 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_stream import extract_json  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "resumes", "anthropic", "cover_letter.json")
+
+PREFIXES = ["", "Here is your cover letter:\n", "Sure! Use {curly} braces sparingly.\n", "```json\n", "```\n"]
+SUFFIXES = ["", "\n```", "\n```\nLet me know if you'd like any changes!", "\n\nNote: {adjust} as needed.", "   \n"]
+
+
+def mutate(letter, rng):
+    """Return (reply text, expected value or None when the reply is truncated)."""
+    value = json.loads(json.dumps(letter))
+    if rng.random() < 0.3:
+        value["Body"]["Conclusion"] += " Literal \\u2019 and a path C:\\users\\dude."
+    indent = rng.choice([None, 2, 4])
+    body = json.dumps(value, indent=indent, ensure_ascii=rng.random() < 0.5)
+    if rng.random() < 0.2:
+        body = body.replace("\n", "\r\n")
+    if rng.random() < 0.3:
+        # Raw newline inside a string value, as some models emit.
+        body = body.replace("Best regards,\\n", "Best regards,\n")
+    prefix = rng.choice(PREFIXES)
+    text = prefix + body + rng.choice(SUFFIXES)
+    if rng.random() < 0.25:
+        return text[:rng.randint(len(prefix) + 1, len(prefix) + len(body) - 1)], None
+    return text, value
+
+
+def fuzz(letter, cases, seed):
+    rng = random.Random(seed)
+    complete = truncated = 0
+    for _ in range(cases):
+        text, expected = mutate(letter, rng)
+        result = extract_json(text)
+        if expected is None:
+            assert isinstance(result, dict), f"truncated reply did not yield an object: {text[:80]!r}"
+            try:
+                extract_json(text, allow_partial=False)
+            except ValueError:
+                truncated += 1
+            else:
+                raise AssertionError(f"truncated reply accepted as final: {text[:80]!r}")
+        else:
+            assert result == expected, f"mismatch for {text[:80]!r}"
+            assert extract_json(text, allow_partial=False) == expected, f"final mismatch for {text[:80]!r}"
+            complete += 1
+    print(f"fuzz: {complete} complete and {truncated} truncated replies parsed correctly")
+
+
+def scaling(letter):
+    print(f"{'reply size':>12}{'extract ms':>14}{'us/KB':>10}")
+    for target_kb in (1, 10, 100, 1000):
+        value = dict(letter, Padding=["x" * 100] * max(1, target_kb * 1024 // 104))
+        text = "Here you go:\n```json\n" + json.dumps(value, indent=2) + "\n```\nCheers!"
+        repeats = max(1, 200 // target_kb)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            extract_json(text)
+        per_call = (time.perf_counter() - start) / repeats
+        print(f"{len(text) / 1024:>10.0f}KB{per_call * 1000:>14.2f}{per_call * 1e6 / (len(text) / 1024):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz and benchmark tolerant JSON extraction.")
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    with open(SAMPLE, "r", encoding="utf-8") as f:
+        letter = json.load(f)
+    fuzz(letter, args.cases, args.seed)
+    scaling(letter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compare full-echo tailoring against patch tailoring.
+
+Offline (default) it reports the prompt size and the size of the output each mode
+asks the model to produce. With --live it also sends both requests --runs times to
+the configured endpoint (OPENAI_BASE_URL / --base-url, e.g. the fake server) and
+reports measured wall-clock time and token usage. Both modes are planned with
+token_budget.plan() and sent through llm.chat_completion(), exactly as
+tailor_resume() does, with the response cache off.
+
+    python benchmarks/bench_patch_tailoring.py
+    python benchmarks/bench_patch_tailoring.py --live --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing  # noqa: E402
+from llm import chat_completion  # noqa: E402
+from structured_output import EDITABLE_WORK_FIELDS, ResumeTailorStructuredOutput, editable_fields  # noqa: E402
+from token_budget import count_tokens, expected_json_tokens, plan  # noqa: E402
+
+
+def expected_outputs(baseline):
+    """The documents each mode asks the model to generate."""
+    patch = editable_fields(baseline)
+    patch["work_experience"] = [{field: job[field] for field in EDITABLE_WORK_FIELDS}
+                                for job in patch["work_experience"]]
+    return {"full": json.dumps(baseline), "patch": json.dumps(patch)}
+
+
+def plan_requests(tailor, baseline, posting):
+    """The (messages, budget) tailor_resume() would send in each mode."""
+    patch_fields = editable_fields(baseline)
+    for job in patch_fields["work_experience"]:
+        del job["job_title"], job["company"]
+    return {
+        "full": plan("tailor_resume", tailor.model, lambda text: tailor.full_messages(baseline, text),
+                     posting, expected_json_tokens(baseline)),
+        "patch": plan("tailor_resume_patch", tailor.model, lambda text: tailor.patch_messages(baseline, text),
+                      posting, expected_json_tokens(patch_fields)),
+    }
+
+
+def run_live(tailor, mode, messages, budget, runs):
+    schema = tailor.schema if mode == "full" else tailor.patch_schema
+    timings, prompt_tokens, completion_tokens = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        # Usage comes back through the tracing counters chat_completion() adds to the current span.
+        with tracing.span(f"bench_{mode}") as span:
+            chat_completion(
+                client=tailor.client,
+                model=tailor.model,
+                messages=messages,
+                response_format={"type": "json_schema", "json_schema": schema},
+                temperature=1,
+                max_tokens=budget.max_tokens,
+                use_cache=False,
+            )
+        timings.append(time.perf_counter() - start)
+        if span.attributes.get("prompt_tokens"):
+            prompt_tokens.append(span.attributes["prompt_tokens"])
+            completion_tokens.append(span.attributes.get("completion_tokens", 0))
+    return {
+        "wall_s": statistics.median(timings),
+        "prompt_tokens": statistics.median(prompt_tokens) if prompt_tokens else None,
+        "completion_tokens": statistics.median(completion_tokens) if completion_tokens else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="resumes/baseline/resume.json")
+    parser.add_argument("--posting", default="resumes/anthropic/job_posting_ai.txt")
+    parser.add_argument("--live", action="store_true", help="Call the endpoint and measure wall time/usage.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint for --live.")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.posting, "r", encoding="utf-8", errors="replace") as f:
+        posting = f.read()
+
+    tailor = ResumeTailorStructuredOutput(api_key=os.getenv("OPENAI_API_KEY") or "offline", use_cache=False)
+    requests = plan_requests(tailor, baseline, posting)
+    outputs = expected_outputs(baseline)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-patch-") as work_dir:
+        if args.live:
+            tracing.default_tracer.start(os.path.join(work_dir, "trace.jsonl"))
+        for mode, (messages, budget) in requests.items():
+            prompt_text = "".join(m["content"] for m in messages)
+            results[mode] = {
+                "prompt_chars": len(prompt_text),
+                "prompt_tokens_est": count_tokens(prompt_text),
+                "output_tokens_est": count_tokens(outputs[mode]),
+                "max_tokens": budget.max_tokens,
+            }
+            if args.live:
+                results[mode].update(run_live(tailor, mode, messages, budget, args.runs))
+        if args.live:
+            tracing.default_tracer.stop()
+
+    print(f"{'metric':<20}{'full':>14}{'patch':>14}{'saving':>10}")
+    for metric in results["full"]:
+        full, patch = results["full"][metric], results["patch"][metric]
+        if full is None or patch is None:
+            continue
+        saving = f"{(1 - patch / full) * 100:.0f}%" if full else "-"
+        fmt = "{:>14.2f}" if isinstance(full, float) else "{:>14}"
+        print(f"{metric:<20}" + fmt.format(full) + fmt.format(patch) + f"{saving:>10}")
+
+
+if __name__ == "__main__":
+    main()
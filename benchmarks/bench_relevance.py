@@ -0,0 +1,82 @@
+"""
+Benchmark local bullet relevance scoring (relevance.py).
+
+Times building the BM25 index for the baseline (cold, then from the in-process and
+on-disk caches), scoring --postings postings one at a time versus in a single
+batched matrix product, and reports how many prompt tokens focus_resume() saves
+per tailoring call at each top-k.
+
+    python benchmarks/bench_relevance.py --postings 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import relevance  # noqa: E402
+from storage import read_document  # noqa: E402
+from token_budget import count_tokens  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT, "resumes", "baseline")
+POSTING = os.path.join(ROOT, "resumes", "anthropic", "job_posting_ai.txt")
+
+
+def make_postings(posting, baseline, count, seed):
+    """Variants of the sample posting that each borrow a few words from random baseline bullets."""
+    rng = random.Random(seed)
+    _, texts = relevance.baseline_units(baseline)
+    words = [word for text in texts for word in text.split()]
+    return [posting + "\n" + " ".join(rng.sample(words, min(40, len(words)))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 bullet relevance scoring.")
+    parser.add_argument("--postings", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    baseline = read_document(BASELINE_DIR, "resume.json")
+    with open(POSTING, "r", encoding="utf-8", errors="replace") as f:
+        postings = make_postings(f.read(), baseline, args.postings, args.seed)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        relevance.RELEVANCE_CACHE_DIR = cache_dir
+        start = time.perf_counter()
+        relevance.index_for(baseline)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        relevance.index_for(baseline)
+        warm = time.perf_counter() - start
+        relevance._index_for_hash.cache_clear()
+        start = time.perf_counter()
+        index = relevance.index_for(baseline)
+        disk = time.perf_counter() - start
+    print(f"{len(index.units)} bullets, {len(index.vocabulary)} terms")
+    print(f"index build: {cold * 1000:.2f} ms cold, {disk * 1000:.2f} ms from disk, {warm * 1000:.3f} ms in memory")
+
+    start = time.perf_counter()
+    one_by_one = [relevance.focus_resume(baseline, posting, 3) for posting in postings]
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = relevance.focus_many(baseline, postings, 3)
+    batch = time.perf_counter() - start
+    assert one_by_one == batched
+    print(f"focus {args.postings} postings: {single:.2f}s one at a time, {batch:.2f}s batched "
+          f"({batch / args.postings * 1000:.3f} ms/posting)")
+
+    full = count_tokens(json.dumps(baseline, indent=4))
+    print(f"{'top-k':>6}{'baseline tokens':>18}{'saved':>8}")
+    print(f"{'all':>6}{full:>18}{'-':>8}")
+    for top_k in (1, 2, 3, 5):
+        focused = count_tokens(json.dumps(relevance.focus_resume(baseline, postings[0], top_k), indent=4))
+        print(f"{top_k:>6}{focused:>18}{1 - focused / full:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Exercise the retry, rate-limit and circuit-breaker policy against the fake endpoint.
+
+Starts benchmarks/fake_openai.py in-process with injected 429s, 500s and stalled
+responses, sends --requests chat completions from --workers threads with and
+without retries, and reports how many succeeded, how many retries and waits it
+took, and the wall time. A final phase fails every request to show the circuit
+breaker opening and rejecting calls without touching the server.
+
+    python benchmarks/bench_resilience.py --requests 200 --rate-limit-rate 0.2 --error-rate 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import start_server  # noqa: E402
+
+
+def run_phase(label, server, caller, requests, workers):
+    from llm import chat_completion
+
+    def one(i):
+        try:
+            chat_completion([{"role": "user", "content": f"Clean posting {i}"}], use_cache=False,
+                            resilience=caller)
+            return True
+        except Exception:
+            return False
+
+    sent_before = server.request_count
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    stats = caller.stats()
+    print(f"{label:<18}{sum(results):>6}/{requests:<6}{stats['retries']:>8}{stats['rate_limited']:>6}"
+          f"{stats['server_errors']:>6}{stats['timeouts']:>6}{stats['circuit_rejections']:>10}"
+          f"{server.request_count - sent_before:>8}{elapsed:>9.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OpenAI retry and circuit-breaker behaviour.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--timeout-rate", type=float, default=0.02)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rpm", type=float, help="Also apply a requests/min limit to the retrying caller.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate,
+                          timeout_rate=args.timeout_rate, timeout_delay=2.0, retry_after=args.retry_after,
+                          seed=args.seed)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "sk-bench"
+    os.environ["RESUME_OPENAI_TIMEOUT"] = "1"  # below timeout_delay, so stalled responses time out
+
+    from resilience import CircuitBreaker, ResilientCaller
+
+    print(f"Injected: {args.rate_limit_rate:.0%} 429 (Retry-After {args.retry_after}s), "
+          f"{args.error_rate:.0%} 500, {args.timeout_rate:.0%} stalled; {args.workers} workers")
+    print(f"{'phase':<18}{'ok':>6}{'':<7}{'retries':>8}{'429':>6}{'5xx':>6}{'t/o':>6}{'rejected':>10}"
+          f"{'sent':>8}{'wall':>10}")
+    no_breaker = CircuitBreaker(threshold=10 ** 9)
+    run_phase("no retries", server, ResilientCaller(max_retries=0, breaker=no_breaker),
+              args.requests, args.workers)
+    run_phase("with retries", server,
+              ResilientCaller(max_retries=5, base_delay=0.1, max_delay=2.0, requests_per_minute=args.rpm,
+                              breaker=CircuitBreaker(threshold=10 ** 9)),
+              args.requests, args.workers)
+
+    server.rate_limit_rate, server.error_rate, server.timeout_rate = 0.0, 1.0, 0.0
+    run_phase("outage + breaker", server,
+              ResilientCaller(max_retries=2, base_delay=0.05, max_delay=0.2,
+                              breaker=CircuitBreaker(threshold=5, reset_seconds=60)),
+              args.requests, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of tailor construction and local schema validation.
+
+Reports the cost of generating the resume schema from the typed models, compiling
+the validator, constructing ResumeTailorStructuredOutput (first instance vs later
+ones that reuse the pooled client) and validating a tailored resume. If the
+jsonschema package is installed its validator is timed for comparison.
+
+    python benchmarks/bench_schema.py --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_models import RESUME_SCHEMA, ResumeDocument, compile_validator, schema_for, validate_resume  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "resumes", "anthropic", "resume.json")
+
+
+def timed(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{label:<44}{per_call * 1e6:>12.1f} us")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema generation, tailor construction and validation.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+    with open(SAMPLE, "r") as f:
+        document = json.load(f)
+    assert validate_resume(document) == [], "sample resume does not match the schema"
+
+    from structured_output import ResumeTailorStructuredOutput
+
+    start = time.perf_counter()
+    ResumeTailorStructuredOutput()
+    print(f"{'first tailor (imports openai, builds client)':<44}{(time.perf_counter() - start) * 1e6:>12.1f} us")
+    timed("later tailor (pooled client, shared schema)", ResumeTailorStructuredOutput, args.iterations)
+    timed("generate schema from models", lambda: schema_for(ResumeDocument), args.iterations)
+    timed("compile validator", lambda: compile_validator(RESUME_SCHEMA["schema"]), args.iterations)
+    timed("validate tailored resume (compiled)", lambda: validate_resume(document), args.iterations)
+    try:
+        import jsonschema
+    except ImportError:
+        print("jsonschema not installed; skipping comparison")
+        return
+    validator = jsonschema.Draft202012Validator(RESUME_SCHEMA["schema"])
+    timed("validate tailored resume (jsonschema)", lambda: list(validator.iter_errors(document)), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
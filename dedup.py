@@ -0,0 +1,211 @@
+"""
+Exact and near-duplicate detection for scraped job postings.
+
+The same role gets reposted on several boards under different URLs. Before a
+posting is cleaned and tailored, PostingIndex.lookup() checks it against every
+posting already tailored from the same baseline:
+
+  - exact: SHA-256 of the normalised text (case, whitespace and punctuation folded)
+  - near: MinHash signatures (128 permutations over word 3-shingles) bucketed with
+    LSH (32 bands of 4 rows), so only postings sharing a band are compared; a
+    candidate matches when its estimated Jaccard similarity reaches the threshold
+    (RESUME_DEDUP_THRESHOLD, default 0.85)
+
+The index lives in resumes/.postings.sqlite3 next to the resume index, and
+load_package() returns the earlier tailored result so it can be saved again under
+the new resume directory instead of being re-cleaned and re-tailored.
+"""
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from storage import ResumeStore, find_document, read_document
+
+DEDUP_FILENAME = ".postings.sqlite3"
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = float(os.getenv("RESUME_DEDUP_THRESHOLD", "0.85"))
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+PRIME = (1 << 31) - 1  # keeps a * h + b below 2**63 for the NumPy path
+PACKAGE_FILES = ["job_posting_ai.txt", "baseline_resume.json", "resume.json", "cover_letter.json"]
+
+_rng = random.Random(20250219)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+_permutation_arrays = None  # (numpy, a column, b column), False without NumPy; set on first use
+
+
+def _numpy():
+    """NumPy and the permutation columns for the vectorised path, or None if NumPy is missing."""
+    # Imported lazily: main imports this module at startup and NumPy costs ~70 ms to load.
+    global _permutation_arrays
+    if _permutation_arrays is None:
+        try:
+            import numpy
+        except ImportError:
+            _permutation_arrays = False
+        else:
+            _permutation_arrays = (numpy,
+                                   numpy.array([a for a, _ in PERMUTATIONS], dtype=numpy.uint64)[:, None],
+                                   numpy.array([b for _, b in PERMUTATIONS], dtype=numpy.uint64)[:, None])
+    return _permutation_arrays or None
+
+
+def normalize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9+#]+", (text or "").lower())
+
+
+def text_digest(words: List[str]) -> str:
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def shingle_hashes(words: List[str]) -> List[int]:
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return sorted({zlib.crc32(gram.encode("utf-8")) % PRIME for gram in grams})
+
+
+def minhash(hashes: List[int]) -> List[int]:
+    """NUM_PERM minimum hash values, one per permutation (a * h + b) mod PRIME."""
+    if not hashes:
+        return [PRIME] * NUM_PERM
+    arrays = _numpy()
+    if arrays is not None:
+        numpy, a, b = arrays
+        values = numpy.array(hashes, dtype=numpy.uint64)[None, :]
+        return ((a * values + b) % PRIME).min(axis=1).tolist()
+    return [min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+def band_keys(signature: List[int]) -> List[int]:
+    """One LSH bucket key per band; two postings become candidates when any key is shared."""
+    keys = []
+    for band in range(BANDS):
+        rows = struct.pack(f"<H{ROWS}I", band, *signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+@dataclass
+class PostingMatch:
+    name: str
+    similarity: float
+    exact: bool
+
+
+class PostingIndex:
+    def __init__(self, resumes_dir: str, threshold: float = DEFAULT_THRESHOLD):
+        self.resumes_dir = resumes_dir
+        self.path = os.path.join(resumes_dir, DEDUP_FILENAME)
+        self.threshold = threshold
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.resumes_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS postings")
+                self._conn.execute("DROP TABLE IF EXISTS bands")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS postings (
+                    name TEXT PRIMARY KEY,
+                    baseline TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_digest ON postings (digest, baseline)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, name TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS bands_name ON bands (name)")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _signature(words: List[str]) -> List[int]:
+        return minhash(shingle_hashes(words))
+
+    def lookup(self, text: str, baseline_hash: str) -> Optional[PostingMatch]:
+        """The most similar indexed posting for this baseline, if it reaches the threshold."""
+        words = normalize(text)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT name FROM postings WHERE digest = ? AND baseline = ? LIMIT 1",
+                               (text_digest(words), baseline_hash)).fetchone()
+            if row:
+                return PostingMatch(row[0], 1.0, True)
+            signature = self._signature(words)
+            keys = band_keys(signature)
+            candidates = conn.execute(
+                f"""SELECT p.name, p.signature FROM postings p WHERE p.baseline = ? AND p.name IN
+                    (SELECT name FROM bands WHERE key IN ({",".join("?" * len(keys))}))""",
+                [baseline_hash] + keys).fetchall()
+        best = None
+        for name, blob in candidates:
+            score = similarity(signature, struct.unpack(f"<{NUM_PERM}I", blob))
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = PostingMatch(name, score, False)
+        return best
+
+    def add(self, name: str, text: str, baseline_hash: str):
+        """Index (or re-index) the posting that resume directory `name` was tailored from."""
+        words = normalize(text)
+        signature = self._signature(words)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM bands WHERE name = ?", (name,))
+                conn.execute("INSERT OR REPLACE INTO postings (name, baseline, digest, signature) VALUES (?, ?, ?, ?)",
+                             (name, baseline_hash, text_digest(words), struct.pack(f"<{NUM_PERM}I", *signature)))
+                conn.executemany("INSERT INTO bands (key, name) VALUES (?, ?)",
+                                 [(key, name) for key in band_keys(signature)])
+
+    def remove(self, name: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM bands WHERE name = ?", (name,))
+                conn.execute("DELETE FROM postings WHERE name = ?", (name,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+def load_package(store: ResumeStore, name: str) -> Optional[Dict]:
+    """The files of a finished (status 'complete') tailored resume directory, or None."""
+    dir_path = store.path(name)
+    if find_document(dir_path, "resume.json") is None:
+        return None
+    files = {}
+    for filename in PACKAGE_FILES:
+        if filename.endswith(".json"):
+            if find_document(dir_path, filename) is not None:
+                files[filename] = read_document(dir_path, filename)
+        elif os.path.exists(os.path.join(dir_path, filename)):
+            with open(os.path.join(dir_path, filename), "r", encoding="utf-8", errors="replace") as f:
+                files[filename] = f.read()
+    if files["resume.json"].get("status") != "complete":
+        return None
+    return files
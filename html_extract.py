@@ -0,0 +1,376 @@
+"""
+HTML-to-text extraction for scraped job postings.
+
+extract() parses a page with the fastest available backend (selectolax, then
+lxml, then BeautifulSoup's html.parser), drops boilerplate such as scripts,
+navigation, footers and small forms (search boxes, sign-ups; pages wrapped in one big
+<form>, as ASP.NET WebForms and many ATS portals are, keep their text), and uses a readability-style heuristic to find
+the block that holds the posting itself, so only that text is sent to the LLM.
+"""
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside",
+    "button", "select", "input", "textarea",
+]
+# Elements whose own text counts as a paragraph of content when scoring.
+TEXT_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "td", "dd", "dt"}
+# Containers that may hold the posting.
+CANDIDATE_TAGS = {"div", "section", "article", "main", "td", "body"}
+# A div with none of these children is scored like a paragraph (common on job boards).
+BLOCK_CHILD_TAGS = {"div", "p", "ul", "ol", "table", "section", "article", "h1", "h2", "h3", "h4", "h5", "h6",
+                    "pre", "blockquote", "dl"}
+MAIN_SELECTORS = ["main", "article", "[role=main]"]
+
+POSITIVE_HINTS = re.compile(r"content|description|posting|job|article|main|body|detail|text", re.I)
+NEGATIVE_HINTS = re.compile(
+    r"comment|footer|header|nav|menu|sidebar|cookie|banner|consent|similar|related|share|social|apply|"
+    r"promo|breadcrumb|widget|modal|popup", re.I)
+MIN_MAIN_TEXT = 200
+MAX_FORM_TEXT = 200  # forms with less text than this are widgets, not page wrappers
+
+
+@dataclass
+class Extraction:
+    title: str
+    text: str           # main content only
+    full_text: str      # whole page with boilerplate removed
+    backend: str
+    seconds: float = 0.0
+    json_ld: List[str] = field(default_factory=list)  # raw application/ld+json blocks
+
+
+def _join_lines(pieces) -> str:
+    return "\n".join(piece.strip() for piece in pieces if piece and piece.strip())
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str):
+        return self._parser(html)
+
+    def meta(self, doc, prop: str) -> Optional[str]:
+        node = doc.css_first(f'meta[property="{prop}"]')
+        return node.attributes.get("content") if node else None
+
+    def title(self, doc) -> Optional[str]:
+        node = doc.css_first("title")
+        return node.text() if node else None
+
+    def json_ld(self, doc) -> List[str]:
+        return [node.text() for node in doc.css('script[type="application/ld+json"]')]
+
+    def strip(self, doc, tags: List[str]):
+        doc.strip_tags(tags)
+
+    def remove(self, node):
+        node.decompose()
+
+    def body(self, doc):
+        return doc.body or doc.root
+
+    def select(self, doc, selector: str):
+        return doc.css_first(selector)
+
+    def descendants(self, node):
+        return (child for child in node.traverse() if not child.tag.startswith("-"))
+
+    def children(self, node):
+        return list(node.iter())
+
+    def key(self, node):
+        return node.mem_id
+
+    def tag(self, node) -> str:
+        return node.tag
+
+    def attrs(self, node) -> str:
+        return " ".join(filter(None, (node.attributes.get("id"), node.attributes.get("class"))))
+
+    def parent(self, node):
+        return node.parent
+
+    def text(self, node) -> str:
+        return _join_lines(node.text(separator="\n", strip=True).split("\n"))
+
+    def link_text_length(self, node) -> int:
+        return sum(len(a.text(strip=True)) for a in node.css("a"))
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+
+    def parse(self, html: str):
+        return self._html.document_fromstring(html)
+
+    def meta(self, doc, prop: str) -> Optional[str]:
+        found = doc.xpath(f'//meta[@property="{prop}"]/@content')
+        return found[0] if found else None
+
+    def title(self, doc) -> Optional[str]:
+        node = doc.find(".//title")
+        return node.text_content() if node is not None else None
+
+    def json_ld(self, doc) -> List[str]:
+        return [str(text) for text in doc.xpath('//script[@type="application/ld+json"]/text()')]
+
+    def strip(self, doc, tags: List[str]):
+        self._etree.strip_elements(doc, self._etree.Comment, *tags, with_tail=False)
+
+    def remove(self, node):
+        node.drop_tree()  # keeps the tail text that follows the element
+
+    def body(self, doc):
+        body = doc.find("body")
+        return body if body is not None else doc
+
+    def select(self, doc, selector: str):
+        if selector.startswith("[role="):
+            found = doc.xpath(f'//*[@role="{selector[6:-1]}"]')
+        else:
+            found = doc.xpath(f"//{selector}")
+        return found[0] if found else None
+
+    def descendants(self, node):
+        return node.iter(self._etree.Element)
+
+    def children(self, node):
+        return list(node.iterchildren(self._etree.Element))
+
+    def key(self, node):
+        return node
+
+    def tag(self, node) -> str:
+        return node.tag if isinstance(node.tag, str) else ""
+
+    def attrs(self, node) -> str:
+        return " ".join(filter(None, (node.get("id"), node.get("class"))))
+
+    def parent(self, node):
+        return node.getparent()
+
+    def text(self, node) -> str:
+        return _join_lines(node.itertext())
+
+    def link_text_length(self, node) -> int:
+        return sum(len(a.text_content().strip()) for a in node.iter("a"))
+
+
+class BeautifulSoupBackend:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup, Comment
+        self._soup = BeautifulSoup
+        self._comment = Comment
+
+    def parse(self, html: str):
+        return self._soup(html, "html.parser")
+
+    def meta(self, doc, prop: str) -> Optional[str]:
+        node = doc.find("meta", property=prop)
+        return node.get("content") if node else None
+
+    def title(self, doc) -> Optional[str]:
+        return doc.title.string if doc.title and doc.title.string else None
+
+    def json_ld(self, doc) -> List[str]:
+        return [node.string for node in doc.find_all("script", type="application/ld+json") if node.string]
+
+    def strip(self, doc, tags: List[str]):
+        for node in doc.find_all(tags):
+            node.decompose()
+        for comment in doc.find_all(string=lambda text: isinstance(text, self._comment)):
+            comment.extract()
+
+    def remove(self, node):
+        node.decompose()
+
+    def body(self, doc):
+        return doc.body or doc
+
+    def select(self, doc, selector: str):
+        return doc.select_one(selector)
+
+    def descendants(self, node):
+        return node.find_all(True)
+
+    def children(self, node):
+        return node.find_all(True, recursive=False)
+
+    def key(self, node):
+        return id(node)
+
+    def tag(self, node) -> str:
+        return node.name
+
+    def attrs(self, node) -> str:
+        classes = node.get("class") or []
+        return " ".join(filter(None, [node.get("id")] + list(classes)))
+
+    def parent(self, node):
+        return node.parent
+
+    def text(self, node) -> str:
+        return node.get_text(separator="\n", strip=True)
+
+    def link_text_length(self, node) -> int:
+        return sum(len(a.get_text(strip=True)) for a in node.find_all("a"))
+
+
+BACKENDS = {
+    "selectolax": SelectolaxBackend,
+    "lxml": LxmlBackend,
+    "bs4": BeautifulSoupBackend,
+}
+_backend_instances: Dict[str, object] = {}
+
+
+def get_backend(name: str = None):
+    """Return the named backend, or the fastest one whose parser is installed."""
+    name = name or os.getenv("RESUME_HTML_BACKEND")
+    names = [name] if name else list(BACKENDS)
+    for candidate in names:
+        if candidate in _backend_instances:
+            return _backend_instances[candidate]
+        try:
+            backend = BACKENDS[candidate]()
+        except ImportError:
+            continue
+        _backend_instances[candidate] = backend
+        return backend
+    raise ImportError(f"No HTML parser available for backend(s): {', '.join(names)}")
+
+
+def _class_weight(backend, node) -> float:
+    hints = backend.attrs(node)
+    weight = 0.0
+    if hints:
+        if POSITIVE_HINTS.search(hints):
+            weight += 5
+        if NEGATIVE_HINTS.search(hints):
+            weight -= 5
+    return weight
+
+
+def _candidate_ancestors(backend, node, count=2):
+    """The nearest `count` ancestors that can be content containers (lists and inline tags are skipped)."""
+    found = []
+    node = backend.parent(node)
+    while node is not None and len(found) < count:
+        if backend.tag(node) in CANDIDATE_TAGS:
+            found.append(node)
+        node = backend.parent(node)
+    return found
+
+
+def _link_density(backend, node, text_length: int) -> float:
+    return min(backend.link_text_length(node) / (text_length or 1), 1.0)
+
+
+def find_main_content(backend, doc) -> List:
+    """
+    Return the nodes most likely to hold the posting, in document order.
+    Text blocks add points to their nearest container and half as much to the next
+    one up; containers get a bonus or penalty from their id/class, and the total is
+    discounted by link density. Siblings of the winner are kept when they score
+    well themselves or are short, link-free blocks such as a title/location header.
+    """
+    root = backend.body(doc)
+    for selector in MAIN_SELECTORS:
+        node = backend.select(doc, selector)
+        if node is not None and len(backend.text(node)) >= MIN_MAIN_TEXT:
+            root = node
+            break
+
+    scores, nodes = {}, {}
+    for node in backend.descendants(root):
+        tag = backend.tag(node)
+        if tag not in TEXT_BLOCK_TAGS and not (
+                tag == "div" and not any(backend.tag(child) in BLOCK_CHILD_TAGS for child in backend.children(node))):
+            continue
+        length = len(backend.text(node))
+        if length < 20:
+            continue
+        points = 1 + length / 100.0 + min(length // 100, 3)
+        for ancestor, share in zip(_candidate_ancestors(backend, node), (1.0, 0.5)):
+            key = backend.key(ancestor)
+            if key not in scores:
+                nodes[key] = ancestor
+                scores[key] = _class_weight(backend, ancestor)
+            scores[key] += points * share
+
+    final_scores = {}
+    best_key, best_score = None, None
+    for key, score in scores.items():
+        score *= 1 - _link_density(backend, nodes[key], len(backend.text(nodes[key])))
+        final_scores[key] = score
+        if best_score is None or score > best_score:
+            best_key, best_score = key, score
+    if best_key is None:
+        return [root]
+
+    best = nodes[best_key]
+    parent = backend.parent(best)
+    if parent is None or best is root:
+        return [best]
+    selected = []
+    for sibling in backend.children(parent):
+        key = backend.key(sibling)
+        if key == best_key:
+            selected.append(sibling)
+            continue
+        text_length = len(backend.text(sibling))
+        if not text_length:
+            continue
+        if final_scores.get(key, 0) >= best_score * 0.2:
+            selected.append(sibling)
+        elif text_length < MIN_MAIN_TEXT and _link_density(backend, sibling, text_length) == 0:
+            selected.append(sibling)
+    return selected
+
+
+def strip_boilerplate(backend, doc):
+    """Drop BOILERPLATE_TAGS and every form too small to be the page itself."""
+    backend.strip(doc, BOILERPLATE_TAGS)
+    forms = [node for node in backend.descendants(backend.body(doc)) if backend.tag(node) == "form"]
+    for form in reversed(forms):  # innermost first, so no form is removed twice
+        if len(backend.text(form)) < MAX_FORM_TEXT:
+            backend.remove(form)
+
+
+def extract(html: str, backend: str = None) -> Extraction:
+    """Extract the title, main-content text and boilerplate-free page text from html."""
+    start = time.perf_counter()
+    parser = get_backend(backend)
+    doc = parser.parse(html)
+    title = (parser.meta(doc, "og:title") or parser.title(doc) or "Job Posting").strip()
+    json_ld = parser.json_ld(doc)
+    strip_boilerplate(parser, doc)
+    full_text = parser.text(parser.body(doc))
+    main_text = "\n".join(parser.text(node) for node in find_main_content(parser, doc))
+    return Extraction(title=title, text=main_text or full_text, full_text=full_text,
+                      backend=parser.name, seconds=time.perf_counter() - start, json_ld=json_ld)
+
+
+def html_to_text(html: str, backend: str = None) -> str:
+    """Plain text of an HTML fragment, one block per line."""
+    parser = get_backend(backend)
+    doc = parser.parse(html)
+    strip_boilerplate(parser, doc)
+    return parser.text(parser.body(doc))
@@ -0,0 +1,148 @@
+"""
+HTTP layer for scraping job postings.
+
+PageFetcher keeps one pooled requests.Session (keep-alive, retry with backoff on
+429/5xx, configurable timeouts) and an on-disk cache of raw HTML. Cached pages
+younger than max_age are served without touching the network; older ones are
+revalidated with If-None-Match / If-Modified-Since so an unchanged page costs a
+304 instead of a full download.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import tracing
+from llm_cache import CACHE_DIR
+
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; atlas-resume-builder)"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: str
+    from_cache: bool = False
+    revalidated: bool = False
+    bytes_downloaded: int = 0
+
+
+class PageFetcher:
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR, connect_timeout: float = 5.0, read_timeout: float = 20.0,
+                 retries: int = 3, backoff: float = 0.5, max_age: float = 6 * 60 * 60, pool_size: int = 16,
+                 user_agent: str = DEFAULT_USER_AGENT, use_cache: bool = True):
+        self.cache_dir = cache_dir
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_age = max_age
+        self.pool_size = pool_size
+        self.user_agent = user_agent
+        self.use_cache = use_cache
+        self._session = None
+        self._lock = threading.Lock()
+        self.stats = {"network": 0, "fresh_hits": 0, "revalidated": 0, "bytes": 0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    @property
+    def session(self):
+        """The shared, lazily created requests.Session."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=self.backoff,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "HEAD"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = self.user_agent
+                self._session = session
+            return self._session
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.html", f"{base}.meta.json"
+
+    def _load_cached(self, url: str):
+        html_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(html_path, "r", encoding="utf-8") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _write_atomic(self, path: str, data: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _store(self, url: str, meta: Dict, text: Optional[str] = None):
+        html_path, meta_path = self._paths(url)
+        if text is not None:
+            self._write_atomic(html_path, text)
+        self._write_atomic(meta_path, json.dumps(meta))
+
+    def fetch(self, url: str) -> FetchResult:
+        """GET url, using the page cache and conditional requests where possible."""
+        meta, cached_text = self._load_cached(url) if self.use_cache else (None, None)
+        if meta is not None and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            self._count("fresh_hits")
+            tracing.add("page_cache_hits")
+            return FetchResult(url, meta.get("status", 200), cached_text, from_cache=True)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self._count("network")
+        if response.status_code == 304 and meta is not None:
+            self._count("revalidated")
+            tracing.add("page_cache_hits")
+            meta["fetched_at"] = time.time()
+            self._store(url, meta)
+            return FetchResult(url, meta.get("status", 200), cached_text, from_cache=True, revalidated=True)
+
+        response.raise_for_status()
+        text = response.text
+        self._count("bytes", len(response.content))
+        tracing.add("bytes_fetched", len(response.content))
+        if self.use_cache:
+            self._store(url, {
+                "url": url,
+                "final_url": response.url,
+                "status": response.status_code,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }, text)
+        return FetchResult(url, response.status_code, text, bytes_downloaded=len(response.content))
+
+
+default_fetcher = PageFetcher(use_cache=os.getenv("RESUME_PAGE_CACHE", "on").lower() not in ("0", "off", "false", "no"))
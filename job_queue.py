@@ -0,0 +1,289 @@
+"""
+Persistent background job queue for the interactive menu.
+
+Tailoring (option 2) and cover-letter (option 5) runs can be handed to a small pool
+of worker threads so the menu stays usable while the OpenAI calls are in flight.
+Every job is a row in resumes/.jobs.sqlite3 with its kind, the resume it writes,
+its parameters (JSON), status (queued, running, done or failed), timestamps, result,
+error and the console output the job produced (handlers print through job_output()
+instead of over the menu). Jobs still queued when the app exits are picked up the next
+time a queue starts. A running job records the pid and host of the process that claimed
+it and is only started over once that process is gone, so two open menus never run the
+same job twice.
+
+    python job_queue.py    # show the most recent jobs
+"""
+import io
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+JOBS_FILENAME = ".jobs.sqlite3"
+SCHEMA_VERSION = 2
+DEFAULT_WORKERS = int(os.getenv("RESUME_JOB_WORKERS", "2"))
+FINISHED = ("done", "failed")
+
+_local = threading.local()
+
+
+def job_output() -> Optional[io.StringIO]:
+    """The output buffer of the job running on this thread, or None outside a job."""
+    return getattr(_local, "output", None)
+
+
+def hostname() -> str:
+    import socket  # loaded here to keep it off the menu's startup imports
+
+    return socket.gethostname()
+
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this pid is running on this machine."""
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        # os.kill() would terminate the process on Windows, so ask for its exit code instead.
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        try:
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+class JobQueue:
+    def __init__(self, resumes_dir: str, handlers: Dict[str, Callable[[Dict], Optional[Dict]]],
+                 workers: int = DEFAULT_WORKERS):
+        """handlers maps a job kind to the function running it; it gets the job's params and may return a result dict."""
+        self.resumes_dir = resumes_dir
+        self.path = os.path.join(resumes_dir, JOBS_FILENAME)
+        self.handlers = handlers
+        self.workers = workers
+        self._conn = None
+        self._lock = threading.RLock()
+        self._pending = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._finished: List[Dict] = []
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0  # queued or running in this process
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.resumes_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS jobs")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    submitted REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    result TEXT,
+                    error TEXT,
+                    output TEXT,
+                    owner_pid INTEGER,
+                    owner_host TEXT
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _row(row: tuple) -> Dict:
+        job_id, kind, name, params, status, submitted, started, finished, result, error, output, owner_pid, owner_host = row
+        return {
+            "id": job_id,
+            "kind": kind,
+            "name": name,
+            "params": json.loads(params),
+            "status": status,
+            "submitted": submitted,
+            "started": started,
+            "finished": finished,
+            "seconds": (finished or time.time()) - started if started else None,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "output": output,
+            "owner": f"{owner_pid}@{owner_host}" if owner_pid else None,
+        }
+
+    def _update(self, job_id: int, **columns):
+        with self._lock:
+            conn = self._connect()
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+            conn.commit()
+
+    def start(self) -> int:
+        """Start the workers and queue every unfinished job again; returns how many were resumed."""
+        host = hostname()
+        with self._lock:
+            conn = self._connect()
+            # A "running" job whose process exited or crashed starts over. Jobs owned by a live
+            # process (another menu) or by another host, where the pid can't be checked, are left alone.
+            running = conn.execute("SELECT id, owner_pid, owner_host FROM jobs WHERE status = 'running'").fetchall()
+            orphaned = [job_id for job_id, pid, owner_host in running
+                        if not pid or (owner_host == host and (pid == os.getpid() or not process_alive(pid)))]
+            conn.executemany("UPDATE jobs SET status = 'queued', started = NULL, owner_pid = NULL, owner_host = NULL "
+                             "WHERE id = ? AND status = 'running'", [(job_id,) for job_id in orphaned])
+            conn.commit()
+            resumed = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id")]
+        for job_id in resumed:
+            self._enqueue(job_id)
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return len(resumed)
+
+    def submit(self, kind: str, name: str, params: Dict) -> int:
+        """Record a job and queue it; returns its id."""
+        if kind not in self.handlers:
+            raise Exception(f"Unknown job kind '{kind}'. Choose from: {', '.join(self.handlers)}")
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, name, params, status, submitted) VALUES (?, ?, ?, 'queued', ?)",
+                (kind, name, json.dumps(params, ensure_ascii=False), time.time()),
+            )
+            conn.commit()
+            job_id = cursor.lastrowid
+        self._enqueue(job_id)
+        return job_id
+
+    def _enqueue(self, job_id: int):
+        with self._lock:
+            self._outstanding += 1
+        self._pending.put(job_id)
+
+    def _done(self, job: Optional[Dict] = None):
+        with self._lock:
+            if job is not None:
+                self._finished.append(job)
+            self._outstanding -= 1
+            self._idle.notify_all()
+
+    def _work(self):
+        while True:
+            job_id = self._pending.get()
+            with self._lock:
+                conn = self._connect()
+                # Claim the job only if it is still queued (it may have been cleared meanwhile).
+                claimed = conn.execute("UPDATE jobs SET status = 'running', started = ?, owner_pid = ?, owner_host = ? "
+                                       "WHERE id = ? AND status = 'queued'",
+                                       (time.time(), os.getpid(), hostname(), job_id)).rowcount
+                conn.commit()
+            if not claimed:
+                self._done()
+                continue
+            job = self.get(job_id)
+            _local.output = output = io.StringIO()
+            try:
+                result = self.handlers[job["kind"]](job["params"])
+                columns = {"status": "done", "result": json.dumps(result, ensure_ascii=False) if result else None}
+            except Exception as e:
+                import traceback
+
+                columns = {"status": "failed", "error": str(e) or type(e).__name__}
+                output.write(traceback.format_exc())
+            finally:
+                _local.output = None
+            self._update(job_id, finished=time.time(), output=output.getvalue() or None, **columns)
+            self._done(self.get(job_id))
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, limit: int = 20) -> List[Dict]:
+        """The most recent jobs, newest first."""
+        with self._lock:
+            rows = self._connect().execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def pop_finished(self) -> List[Dict]:
+        """Jobs that finished since the last call, oldest first."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        return finished
+
+    def active(self) -> int:
+        """Jobs queued or running in this process."""
+        with self._lock:
+            return self._outstanding
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until no job is queued or running; False if the timeout ran out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self.active():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def clear_finished(self) -> int:
+        """Forget done and failed jobs; returns how many rows were removed."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))})", FINISHED)
+            conn.commit()
+        return cursor.rowcount
+
+
+def print_jobs(console, jobs: List[Dict], title: str = "Background Jobs"):
+    from rich.table import Table
+
+    table = Table(title=title)
+    for column in ("#", "Job", "Resume", "Status", "Submitted", "Took s", "Details"):
+        table.add_column(column, justify="right" if column in ("#", "Took s") else "left")
+    colors = {"queued": "yellow", "running": "cyan", "done": "green", "failed": "red"}
+    for job in jobs:
+        details = job["error"] or ""
+        if job["result"] and job["result"].get("duplicate_of"):
+            details = f"reused '{job['result']['duplicate_of']}'"
+        table.add_row(str(job["id"]), job["kind"], job["name"],
+                      f"[{colors.get(job['status'], 'white')}]{job['status']}[/]",
+                      time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job["submitted"])),
+                      f"{job['seconds']:.1f}" if job["seconds"] is not None else "-", details)
+    console.print(table)
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+
+    job_queue = JobQueue("resumes", handlers={})
+    print_jobs(Console(), job_queue.list(limit=50))
@@ -0,0 +1,176 @@
+"""
+Incremental JSON parsing for streamed model output.
+
+IncrementalJSONParser is fed chunks as they arrive and tracks just enough lexical
+state (container stack, string/escape state, last safe cut point) to turn the
+prefix received so far into a valid JSON document on demand. Feeding is linear in
+the total input; snapshot() costs one json.loads of the current prefix.
+
+extract_json() uses the same parser to pull a JSON value out of a finished model
+reply that may be wrapped in markdown fences, surrounded by prose or cut short.
+"""
+import json
+from typing import Any, List, Optional
+
+HEX_DIGITS = set("0123456789abcdefABCDEF")
+WHITESPACE = set(" \t\r\n")
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.length = 0
+        # Each stack entry is "{" or "["; expecting_key tracks the innermost object.
+        self.stack: List[str] = []
+        self.expecting_key: List[bool] = []
+        self.in_string = False
+        self.string_is_key = False
+        self.escape_start: Optional[int] = None
+        self.in_scalar = False
+        self.started = False
+        self.complete = False
+        # Largest prefix length that is valid JSON once the recorded stack is closed.
+        self.safe_end = 0
+        self.safe_stack: tuple = ()
+        self._last_snapshot: Any = None
+
+    def _mark_safe(self, end: int):
+        self.safe_end = end
+        self.safe_stack = tuple(self.stack)
+
+    def _end_scalar(self, position: int):
+        if self.in_scalar:
+            self.in_scalar = False
+            self._mark_safe(position)
+            if not self.stack:
+                self.complete = True
+
+    def feed(self, chunk: str):
+        """Consume the next piece of the stream."""
+        self.buffer.append(chunk)
+        position = self.length
+        for char in chunk:
+            if self.complete:
+                break
+            if self.in_string:
+                if self.escape_start is not None:
+                    if self._escape_done(char, position):
+                        self.escape_start = None
+                elif char == "\\":
+                    self.escape_start = position
+                elif char == '"':
+                    self.in_string = False
+                    if not self.string_is_key:
+                        self._mark_safe(position + 1)
+                        if not self.stack:
+                            self.complete = True
+                position += 1
+                continue
+
+            if char in WHITESPACE or char in ",:}]":
+                self._end_scalar(position)
+            if char == '"':
+                self.in_string = True
+                self.started = True
+                self.string_is_key = bool(self.stack) and self.stack[-1] == "{" and self.expecting_key[-1]
+            elif char in "{[":
+                self.started = True
+                self.stack.append(char)
+                self.expecting_key.append(char == "{")
+                self._mark_safe(position + 1)
+            elif char in "}]":
+                if self.stack:
+                    self.stack.pop()
+                    self.expecting_key.pop()
+                self._mark_safe(position + 1)
+                if not self.stack:
+                    self.complete = True
+            elif char == ",":
+                if self.stack and self.stack[-1] == "{":
+                    self.expecting_key[-1] = True
+            elif char == ":":
+                if self.stack and self.stack[-1] == "{":
+                    self.expecting_key[-1] = False
+            elif char not in WHITESPACE:
+                self.started = True
+                self.in_scalar = True
+            position += 1
+        self.length += len(chunk)
+
+    def _escape_done(self, char: str, position: int) -> bool:
+        """Return True once the escape sequence that started at escape_start is finished."""
+        consumed = position - self.escape_start
+        if consumed == 1:
+            return char != "u"
+        return consumed >= 5 or char not in HEX_DIGITS
+
+    @property
+    def text(self) -> str:
+        if len(self.buffer) > 1:
+            self.buffer = ["".join(self.buffer)]
+        return self.buffer[0] if self.buffer else ""
+
+    def _closers(self, stack) -> str:
+        return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+    def candidate(self) -> str:
+        """
+        The text received so far cut down to a valid JSON document: the complete value
+        if it has ended (trailing text dropped), otherwise the prefix with open strings,
+        arrays and objects closed and dangling keys dropped.
+        """
+        text = self.text
+        if self.complete:
+            return text[:self.safe_end]
+        if self.in_string and not self.string_is_key:
+            end = self.escape_start if self.escape_start is not None else len(text)
+            return text[:end] + '"' + self._closers(self.stack)
+        return text[:self.safe_end] + self._closers(self.safe_stack)
+
+    def snapshot(self) -> Any:
+        """Return the most complete value that the prefix received so far describes."""
+        if not self.started:
+            return None
+        try:
+            self._last_snapshot = json.loads(self.candidate())
+        except json.JSONDecodeError:
+            pass
+        return self._last_snapshot
+
+    def result(self) -> Any:
+        """Parse the full stream; raises json.JSONDecodeError if it is not valid JSON."""
+        return json.loads(self.text)
+
+
+def extract_json(text: str, allow_partial: bool = True, max_attempts: int = 3) -> Any:
+    """
+    Return the first JSON object or array in a model reply.
+    Leading prose and markdown fences are skipped, anything after the value ends is
+    ignored, raw control characters inside strings are accepted, and a reply that was
+    cut short is closed off (unless allow_partial is False, as it should be for a
+    final reply; partial values are for rendering a stream). Each attempt is a single
+    pass; if an opening brace in the prose turns out not to start valid JSON, the next
+    one is tried, up to max_attempts.
+    """
+    start = 0
+    last_error = None
+    for _ in range(max_attempts):
+        starts = [i for i in (text.find("{", start), text.find("[", start)) if i >= 0]
+        if not starts:
+            break
+        start = min(starts)
+        parser = IncrementalJSONParser()
+        parser.feed(text[start:])
+        if parser.complete or allow_partial:
+            try:
+                return json.loads(parser.candidate(), strict=False)
+            except json.JSONDecodeError as e:
+                last_error = e
+        else:
+            # The value ran to the end of the text: the reply was cut off. Trying the next
+            # brace would only find a nested fragment of it.
+            raise ValueError("Could not extract JSON from the response: it was cut off before the value ended")
+        start += 1
+    if last_error is not None:
+        raise ValueError(f"Could not extract JSON from the response: {last_error}")
+    raise ValueError("No JSON object found in the response")
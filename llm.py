@@ -0,0 +1,172 @@
+"""
+Shared entry point for every chat-completion call the app makes.
+
+clean_job_posting_text, create_cover_letter and ResumeTailorStructuredOutput all go
+through chat_completion() so they share the response cache, streaming support and
+the retry / rate-limit / circuit-breaker policy in resilience.py.
+"""
+import dataclasses
+import functools
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import tracing
+from llm_cache import ResponseCache, default_cache
+from resilience import ResilientCaller, default_resilience
+
+DEFAULT_MODEL = "gpt-4o"
+REQUEST_TIMEOUT = float(os.getenv("RESUME_OPENAI_TIMEOUT", "120"))
+
+
+def get_client(api_key: str = None):
+    """Shared OpenAI client for api_key (default: OPENAI_API_KEY) and the current OPENAI_BASE_URL."""
+    return _pooled_client(api_key or os.getenv("OPENAI_API_KEY"), os.getenv("OPENAI_BASE_URL"))
+
+
+@functools.lru_cache(maxsize=8)
+def _pooled_client(api_key: Optional[str], base_url: Optional[str]):
+    # openai takes most of a second to import, so it is loaded with the first client.
+    from openai import OpenAI
+
+    # Retries are handled (and counted) by resilience.py, not by the SDK.
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=REQUEST_TIMEOUT)
+
+
+def chat_completion(messages: List[Dict], model: str = DEFAULT_MODEL, response_format: Dict = None,
+                    temperature: float = None, max_tokens: int = None, client=None,
+                    cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                    stream_handler=None, budget=None, resilience: Optional[ResilientCaller] = None,
+                    validate: Callable[[str], None] = None, **extra) -> str:
+    """
+    Send a chat-completion request and return the message content.
+    Identical requests are answered from the on-disk cache unless use_cache is False.
+    Only complete replies (finish_reason "stop") are cached, and only once validate
+    (e.g. parse + schema check) accepts them; a cached reply validate rejects is dropped
+    and fetched again. A reply cut off by max_tokens (finish_reason "length") is asked
+    for once more with the model's full output limit; if that is cut off too, it raises.
+    If a stream_handler is given (see streaming.py) the response is streamed and the
+    handler sees every delta; the returned content is the same either way.
+    With a token_budget.TokenBudget, its max_tokens is used (unless one is passed)
+    and the estimated and actual usage are appended to the usage log.
+    Transient API failures are retried under `resilience` (default: default_resilience).
+    """
+    if budget is not None and max_tokens is None:
+        max_tokens = budget.max_tokens
+    request = {"model": model, "messages": messages}
+    if response_format is not None:
+        request["response_format"] = response_format
+    if temperature is not None:
+        request["temperature"] = temperature
+    if max_tokens is not None:
+        request["max_tokens"] = max_tokens
+    request.update(extra)
+
+    cache = cache or default_cache
+    key = cache.key_for(request) if use_cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None and not _accepts(validate, cached):
+            cache.delete(key)
+            cached = None
+        if cached is not None:
+            tracing.add("cache_hits")
+            if budget is not None:
+                _log_usage(budget, None, None, cached=True)
+            return cached
+
+    if client is None:
+        client = get_client()
+    resilience = resilience or default_resilience
+    while True:
+        tokens = budget.prompt_tokens + budget.max_tokens if budget is not None else 0
+        if stream_handler is not None:
+            content, stats = _stream_completion(client, request, stream_handler, resilience, tokens)
+            prompt_tokens, completion_tokens = stats.prompt_tokens, stats.completion_tokens
+            finish_reason = stats.finish_reason
+        else:
+            completion = resilience.call(lambda: client.chat.completions.create(**request), tokens=tokens)
+            content = completion.choices[0].message.content
+            finish_reason = completion.choices[0].finish_reason
+            usage = getattr(completion, "usage", None)
+            prompt_tokens = usage.prompt_tokens if usage else None
+            completion_tokens = usage.completion_tokens if usage else None
+        tracing.add("llm_calls")
+        tracing.add("prompt_tokens", prompt_tokens or 0)
+        tracing.add("completion_tokens", completion_tokens or 0)
+        if budget is not None:
+            _log_usage(budget, prompt_tokens, completion_tokens)
+        if finish_reason != "length":
+            break
+        from token_budget import model_limits
+
+        max_output = model_limits(model)[1]
+        if max_tokens is None or max_tokens >= max_output:
+            raise Exception(f"The reply was cut off at max_tokens={max_tokens} before it was complete.")
+        # The planned max_tokens is an estimate; a longer answer gets one retry with the
+        # model's full output limit, and the cut-off attempt is never cached.
+        tracing.add("length_retries")
+        max_tokens = request["max_tokens"] = max_output
+        if budget is not None:
+            budget = dataclasses.replace(budget, max_tokens=max_output)
+    if key and content is not None and finish_reason == "stop" and _accepts(validate, content):
+        cache.put(key, content, request)
+    return content
+
+
+def _accepts(validate, content: str) -> bool:
+    """Whether validate takes content without raising (always True without a validator)."""
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception:
+        return False
+    return True
+
+
+def _log_usage(budget, prompt_tokens, completion_tokens, cached=False):
+    from token_budget import log_usage
+
+    try:
+        log_usage(budget, prompt_tokens, completion_tokens, cached=cached)
+    except OSError:
+        pass  # the usage log is best-effort and never fails a request
+
+
+def _stream_completion(client, request: Dict, handler, resilience: ResilientCaller, tokens: int = 0):
+    """
+    Consume a streamed completion, forwarding deltas to handler; returns (full text, StreamStats).
+    A failed stream is retried only if nothing has been shown yet.
+    """
+    from streaming import StreamStats
+
+    stats = StreamStats(started=time.monotonic())
+    parts = []
+
+    def consume():
+        stream = client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request)
+        for chunk in stream:
+            if chunk.usage is not None:
+                stats.completion_tokens = chunk.usage.completion_tokens
+                stats.prompt_tokens = chunk.usage.prompt_tokens
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].finish_reason:
+                stats.finish_reason = chunk.choices[0].finish_reason
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if stats.first_token_at is None:
+                stats.first_token_at = time.monotonic()
+            stats.chunks += 1
+            parts.append(delta)
+            handler.delta(delta)
+
+    handler.start()
+    try:
+        resilience.call(consume, tokens=tokens, can_retry=lambda: not parts)
+    finally:
+        stats.finished = time.monotonic()
+        handler.finish(stats)
+    return "".join(parts), stats
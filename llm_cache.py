@@ -0,0 +1,158 @@
+"""
+Content-addressed on-disk cache for chat-completion responses.
+
+Entries are keyed by a SHA-256 of the request fields that determine the output
+(model, messages, response_format, temperature) and evicted least-recently-used
+first once the cache grows past its byte budget or an entry outlives max_age.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+CACHE_DIR = os.getenv("RESUME_CACHE_DIR", "cache")
+LLM_CACHE_DIR = os.path.join(CACHE_DIR, "llm")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+KEY_FIELDS = ("model", "messages", "response_format", "temperature")
+
+
+class ResponseCache:
+    def __init__(self, directory: str = LLM_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last access time); built lazily from disk.
+        self._entries: Optional[Dict[str, tuple]] = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def key_for(request: Dict) -> str:
+        """Hash the output-determining fields of a chat-completion request."""
+        material = {field: request.get(field) for field in KEY_FIELDS}
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_entries(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        self._total_bytes = 0
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-5]] = (stat.st_size, stat.st_mtime)
+                    self._total_bytes += stat.st_size
+
+    def _drop(self, key: str):
+        size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        now = time.time()
+        expired = [key for key, (_, accessed) in self._entries.items() if now - accessed > self.max_age]
+        for key in expired:
+            self._drop(key)
+            self.evictions += 1
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._drop(key)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached content for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_entries()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry[1] > self.max_age:
+                self._drop(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    content = json.load(f)["content"]
+            except Exception:
+                self._drop(key)
+                self.misses += 1
+                return None
+            now = time.time()
+            os.utime(path, (now, now))
+            self._entries[key] = (entry[0], now)
+            self.hits += 1
+            return content
+
+    def put(self, key: str, content: str, request: Dict = None):
+        if not self.enabled:
+            return
+        record = {"created": time.time(), "model": (request or {}).get("model"), "content": content}
+        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        with self._lock:
+            self._load_entries()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if key in self._entries:
+                self._total_bytes -= self._entries[key][0]
+            self._entries[key] = (len(data), time.time())
+            self._total_bytes += len(data)
+            self._evict()
+
+    def delete(self, key: str):
+        """Forget one entry (e.g. a cached reply that no longer passes validation)."""
+        with self._lock:
+            self._load_entries()
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._load_entries()
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._load_entries()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+
+default_cache = ResponseCache(enabled=os.getenv("RESUME_LLM_CACHE", "on").lower() not in ("0", "off", "false", "no"))
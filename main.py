@@ -1,600 +1,816 @@
-import os
-import json
-import openai
-import requests
-import random
-import unicodedata
-from bs4 import BeautifulSoup
-from datetime import datetime
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-import pygame  # for MIDI playback
-
-# Import the structured output class from the external module.
-from structured_output import ResumeTailorStructuredOutput
-
-# Check for API key from environment variable, then file.
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    if os.path.exists("openai-api-key.txt"):
-        with open("openai-api-key.txt", "r") as f:
-            api_key = f.read().strip()
-openai.api_key = api_key
-
-console = Console()
-
-RESUMES_DIR = "resumes"
-MIDI_DIR = "midi"
-
-def play_midi_background():
-    """Initialize pygame mixer and play a random MIDI file from MIDI_DIR."""
-    if os.path.exists(MIDI_DIR) and os.path.isdir(MIDI_DIR):
-        midi_files = [os.path.join(MIDI_DIR, f) for f in os.listdir(MIDI_DIR) if f.lower().endswith((".mid", ".midi"))]
-        if midi_files:
-            try:
-                pygame.mixer.init()
-                selected_midi = random.choice(midi_files)
-                pygame.mixer.music.load(selected_midi)
-                pygame.mixer.music.play(-1)  # Loop indefinitely
-            except Exception as e:
-                console.print(f"[red]Error playing MIDI file: {e}[/red]")
-        else:
-            console.print("[yellow]No MIDI files found in the 'midi' directory.[/yellow]")
-    else:
-        console.print("[yellow]'midi' directory not found.[/yellow]")
-
-def scrape_job_posting(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Extract title using Open Graph or <title>
-        og_title = soup.find("meta", property="og:title")
-        if og_title and og_title.get("content"):
-            title = og_title.get("content").strip()
-        elif soup.title:
-            title = soup.title.string.strip()
-        else:
-            title = "Job Posting"
-        
-        # Scrape the whole page text.
-        full_text = soup.get_text(separator="\n", strip=True)
-        
-        # Use the text as-is for both human and AI versions.
-        job_posting_data = {
-            "url": url,
-            "title": title,
-            "description": full_text,       # Human-readable version
-            "ai_description": full_text       # AI version
-        }
-        return json.dumps(job_posting_data, indent=4)
-    except Exception as e:
-        console.print(f"[red]Error scraping job posting from URL: {e}[/red]")
-        return f"Job Posting URL: {url} (failed to scrape content)"
-
-def process_job_posting_input(input_text):
-    if input_text.startswith("http://") or input_text.startswith("https://"):
-        return scrape_job_posting(input_text)
-    else:
-        return input_text
-
-def clean_job_posting_text(ai_text):
-    from openai import OpenAI
-    client = OpenAI()
-    prompt = f"Clean the following job announcement by stripping out extraneous content and return all the job details. Display the Title, Company, Location(s), and Salary Range First. Then, Outline the Role by combining what is in there with your summary as well, then Key Responsibilities in great detail if they're posted and create them if they arent, then Qualifications in great detail to the letter of the announcement and then your summary of additional skills you believe would be required, then a 'everything else' category that outlines what your AI synposis is of the job itself:':\n\n{ai_text}"
-    try:
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            store=True,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        cleaned_text = completion.choices[0].message.content
-        return cleaned_text
-    except Exception as e:
-        console.print(f"[red]Error cleaning job posting: {e}[/red]")
-        return ai_text
-
-def get_job_target():
-    console.print("[bold cyan]Job Target Information[/bold cyan]")
-    position_title = Prompt.ask("Desired Position Title")
-    company = Prompt.ask("Desired Company")
-    location = Prompt.ask("Desired Location")
-    salary_desired = Prompt.ask("Desired Salary Range")
-    return {
-        "position_title": position_title,
-        "company": company,
-        "location": location,
-        "salary_desired": salary_desired
-    }
-
-def get_personal_info():
-    console.print("[bold cyan]Personal Information[/bold cyan]")
-    name = Prompt.ask("Full Name")
-    email = Prompt.ask("Email")
-    phone = Prompt.ask("Phone Number")
-    summary = Prompt.ask("Enter your professional summary (optional)", default="")
-    return {"name": name, "email": email, "phone": phone, "summary": summary}
-
-def get_work_experience():
-    experiences = []
-    add_more = True
-    while add_more:
-        console.print("\n[bold cyan]Work Experience Entry[/bold cyan]")
-        job_title = Prompt.ask("Job Title")
-        company = Prompt.ask("Company")
-        location = Prompt.ask("Location")
-        start_date = Prompt.ask("Start Date (e.g., Jan 2020)")
-        end_date = Prompt.ask("End Date (e.g., Dec 2020 or Present)")
-        responsibilities_input = Prompt.ask("Enter responsibilities (separate each with a semicolon ';')")
-        responsibilities = [r.strip() for r in responsibilities_input.split(";") if r.strip()]
-        achievements_input = Prompt.ask("Enter achievements (separate each with a semicolon ';')")
-        achievements = [a.strip() for a in achievements_input.split(";") if a.strip()]
-        programs_input = Prompt.ask("Enter programs managed (separate each with a semicolon ';')", default="")
-        programs_managed = [p.strip() for p in programs_input.split(";") if p.strip()]
-        technologies_input = Prompt.ask("Enter technologies (separate each with a comma ',')", default="")
-        technologies = [t.strip() for t in technologies_input.split(",") if t.strip()]
-        experience = {
-            "job_title": job_title,
-            "company": company,
-            "location": location,
-            "start_date": start_date,
-            "end_date": end_date,
-            "responsibilities": responsibilities,
-            "achievements": achievements,
-            "programs_managed": programs_managed,
-            "technologies": technologies,
-        }
-        experiences.append(experience)
-        add_more = Confirm.ask("Would you like to add another job?")
-    return experiences
-
-def get_education():
-    educations = []
-    add_more = True
-    while add_more:
-        console.print("\n[bold cyan]Education Entry[/bold cyan]")
-        institution = Prompt.ask("Institution Name")
-        degree = Prompt.ask("Degree / Certification")
-        location = Prompt.ask("Location")
-        start_date = Prompt.ask("Start Date")
-        end_date = Prompt.ask("End Date (or Graduation Year)")
-        details = Prompt.ask("Enter details about your education (optional)", default="")
-        educations.append({
-            "institution": institution,
-            "degree": degree,
-            "location": location,
-            "start_date": start_date,
-            "end_date": end_date,
-            "details": details
-        })
-        add_more = Confirm.ask("Would you like to add another education entry?")
-    return educations
-
-def get_certifications():
-    certs = []
-    if Confirm.ask("Do you have any certifications?"):
-        add_more = True
-        while add_more:
-            console.print("[bold cyan]Certification Entry[/bold cyan]")
-            name = Prompt.ask("Certification Name")
-            specialization = Prompt.ask("Specialization")
-            awarded_by = Prompt.ask("Awarded By")
-            year = Prompt.ask("Year (or N/A)")
-            certs.append({
-                "name": name,
-                "specialization": specialization,
-                "awarded_by": awarded_by,
-                "year": year
-            })
-            add_more = Confirm.ask("Would you like to add another certification?")
-    return certs
-
-def get_leadership_skills():
-    skills = Prompt.ask("Enter your leadership skills separated by commas (if any)", default="")
-    return [s.strip() for s in skills.split(",") if s.strip()]
-
-def get_tools():
-    tools = Prompt.ask("Enter the tools you are proficient with, separated by commas (if any)", default="")
-    return [t.strip() for t in tools.split(",") if t.strip()]
-
-def get_online_profiles():
-    console.print("[bold cyan]Online Profiles[/bold cyan]")
-    hugging_face = Prompt.ask("Enter your Hugging Face profile (if any)", default="")
-    github = Prompt.ask("Enter your GitHub profile (if any)", default="")
-    return {"hugging_face": hugging_face, "github": github}
-
-def create_resume():
-    job_target = get_job_target()
-    personal_info = get_personal_info()
-    work_experience = get_work_experience()
-    education = get_education()
-    certifications = get_certifications()
-    leadership_skills = get_leadership_skills()
-    tools = get_tools()
-    online_profiles = get_online_profiles()
-    
-    complete = Confirm.ask("Is this resume complete?")
-    status = "complete" if complete else "in progress"
-    last_modified = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    resume = {
-        "job_target": job_target,
-        "personal_info": personal_info,
-        "work_experience": work_experience,
-        "education": education,
-        "certifications": certifications,
-        "leadership_skills": leadership_skills,
-        "tools": tools,
-        "online_profiles": online_profiles
-    }
-    
-    return {
-        "resume": resume,
-        "status": status,
-        "last_modified": last_modified
-    }
-
-def ensure_resumes_dir():
-    if not os.path.exists(RESUMES_DIR):
-        os.makedirs(RESUMES_DIR)
-        console.print(f"[green]Created '{RESUMES_DIR}' directory.[/green]")
-
-def get_resume_path(resume_name):
-    return os.path.join(RESUMES_DIR, resume_name)
-
-def save_resume(resume_data, resume_name):
-    ensure_resumes_dir()
-    dir_path = get_resume_path(resume_name)
-    if not os.path.exists(dir_path):
-        os.makedirs(dir_path)
-    file_path = os.path.join(dir_path, "resume.json")
-    try:
-        with open(file_path, "w") as f:
-            json.dump(resume_data, f, indent=4)
-        console.print(f"[green]Saved resume to {file_path}[/green]")
-    except Exception as e:
-        console.print(f"[red]Error saving resume: {e}[/red]")
-
-def list_resumes():
-    ensure_resumes_dir()
-    resumes_found = {}
-    for entry in os.listdir(RESUMES_DIR):
-        dir_path = os.path.join(RESUMES_DIR, entry)
-        if os.path.isdir(dir_path):
-            file_path = os.path.join(dir_path, "resume.json")
-            if os.path.isfile(file_path):
-                try:
-                    with open(file_path, "r") as f:
-                        data = json.load(f)
-                    resumes_found[entry] = data
-                except Exception as e:
-                    console.print(f"[red]Error loading resume from {file_path}: {e}[/red]")
-    return resumes_found
-
-def load_resume(resume_name):
-    file_path = os.path.join(get_resume_path(resume_name), "resume.json")
-    try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        console.print(f"[red]Error loading resume {resume_name}: {e}[/red]")
-        return None
-
-def clean_unicode(text):
-    """Normalize and clean up any weird Unicode characters."""
-    return unicodedata.normalize("NFKC", text)
-
-def create_cover_letter(tailored_resume, job_posting_data):
-    """
-    Generate a cover letter in JSON format using the provided resume and job posting.
-    This function sends both inputs to the OpenAI Chat Completion API and instructs the AI
-    to output a cover letter (with header, salutation, body, and closing) in JSON format.
-    """
-    # Ensure job_posting_data is a dictionary (if not, try to parse it)
-    if isinstance(job_posting_data, str):
-        try:
-            job_posting_dict = json.loads(job_posting_data)
-        except Exception:
-            job_posting_dict = {"description": job_posting_data}
-    else:
-        job_posting_dict = job_posting_data
-
-    # Convert the resume and job posting to formatted JSON strings for clarity.
-    resume_str = json.dumps(tailored_resume, indent=2, ensure_ascii=False)
-    job_posting_str = json.dumps(job_posting_dict, indent=2, ensure_ascii=False)
-
-    prompt = (
-        "Using the resume and job posting provided below, generate a captivating, award-winning cover letter in JSON format. "
-        "This cover letter must break the mold of generic templates by showcasing creativity, passion, and specificity to both the candidate's achievements and the job requirements. "
-        "Ensure the response is free from any encoded Unicode escape sequences like \\u2019 and outputs clean, natural text. "
-        "The output should be a well-structured JSON object with the following sections:\n\n"
-        "1. Header: Include the current date, the candidate's full name, and their contact information (email and phone number).\n"
-        "2. Salutation: A personalized greeting addressing the hiring manager directly.\n"
-        "3. Body:\n"
-        "   a. Introduction: Craft a strong, engaging opening that grabs attention and clearly expresses the candidate’s enthusiasm for the position.\n"
-        "   b. Reference to Job Posting: Specifically mention details from the job posting, explaining how the candidate's background and achievements uniquely align with the role.\n"
-        "   c. Summary of Relevant Experience: Provide a detailed, dynamic account of the candidate’s accomplishments and skills, highlighting what sets them apart and how they will add value to the organization.\n"
-        "   d. Conclusion: Offer a compelling closing statement that reiterates enthusiasm, includes a call to action, and leaves a memorable impression.\n"
-        "4. Closing: A professional sign-off with the candidate’s name.\n\n"
-        "Output strictly as a JSON object with no markdown formatting or explanations.\n\n"
-        f"Resume:\n{resume_str}\n\n"
-        f"Job Posting:\n{job_posting_str}"
-    )
-
-    try:
-        from openai import OpenAI
-        client = OpenAI()
-        completion = client.chat.completions.create(
-            model="gpt-4o",
-            store=True,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        cover_letter_output = completion.choices[0].message.content
-
-        # Step 1: Clean Unicode in the raw text (before parsing)
-        cover_letter_output = clean_unicode(cover_letter_output)
-
-        # Remove markdown formatting if present
-        lines = cover_letter_output.splitlines()
-        if lines and lines[0].strip().startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip().startswith("```"):
-            lines = lines[:-1]
-        cover_letter_output = "\n".join(lines).strip()
-
-        # Step 2: Try parsing the cleaned text as JSON
-        try:
-            cover_letter_json = json.loads(cover_letter_output)
-        except json.JSONDecodeError:
-            console.print("[yellow]Warning: First JSON parse failed. Retrying cleanup...[/yellow]")
-            cover_letter_output = clean_unicode(cover_letter_output)
-            cover_letter_json = json.loads(cover_letter_output)
-
-        # Step 3: Dump and load JSON with ensure_ascii=False and repeatedly clean until no escape sequences remain.
-        cleaned_json_str = json.dumps(cover_letter_json, indent=4, ensure_ascii=False)
-        # Loop until there are no Unicode escapes in the dumped string
-        while "\\u" in cleaned_json_str:
-            cleaned_json_str = clean_unicode(cleaned_json_str)
-        cover_letter_json = json.loads(cleaned_json_str)
-
-        return cover_letter_json
-
-    except Exception as e:
-        console.print(f"[red]Error generating cover letter: {e}[/red]")
-        return None
-
-def main_menu():
-    console.print(r"""    ___  ________    ___   _____    __  ___   __________________________           
-   /   |/_  __/ /   /   | / ___/   / / / / | / /  _/ ____/  _/ ____/ __ \          
-  / /| | / / / /   / /| | \__ \   / / / /  |/ // // /_   / // __/ / / / /          
- / ___ |/ / / /___/ ___ |___/ /  / /_/ / /|  // // __/ _/ // /___/ /_/ /           
-/_/ _|_/_/_/_____/_/_ |_/____/  _\____/_/ |_/___/_/_  /___/_____/_____/ __________ 
-   / __ \/ ____/ ___// / / /  |/  / ____/  / __ )/ / / /  _/ /   / __ \/ ____/ __ \
-  / /_/ / __/  \__ \/ / / / /|_/ / __/    / __  / / / // // /   / / / / __/ / /_/ /
- / _, _/ /___ ___/ / /_/ / /  / / /___   / /_/ / /_/ // // /___/ /_/ / /___/ _, _/ 
-/_/ |_/_____//____/\____/_/  /_/_____/  /_____/\____/___/_____/_____/_____/_/ |_|                             
-    """, style="bold bright_magenta")
-
-    play_midi_background()
-    
-    while True:
-        console.print("\n[bold green]Main Menu[/bold green]")
-        console.print("[bold blue]1.[/bold blue] Create/Edit Baseline Resume")
-        console.print("[bold blue]2.[/bold blue] Create a Tailored Resume for a Job Posting")
-        console.print("[bold blue]3.[/bold blue] List All Resumes")
-        console.print("[bold blue]4.[/bold blue] Load and View a Resume")
-        console.print("[bold blue]5.[/bold blue] Create Cover Letter for a Tailored Resume")
-        console.print("[bold blue]6.[/bold blue] Quit")
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6"])
-        
-        if choice == "1":
-            console.print("[bold blue]Creating/Editing Baseline Resume...[/bold blue]")
-            new_resume = create_resume()
-            save_resume(new_resume, "baseline")
-            console.print("[green]Baseline resume created/updated![/green]")
-        
-        elif choice == "2":
-            tailored_name = Prompt.ask("Enter a name for this tailored resume (no spaces)")
-            resumes_found = list_resumes()
-            if not resumes_found:
-                console.print("[red]No resumes available. Please create a baseline resume first.[/red]")
-                continue
-            console.print("[bold yellow]Available Baseline Resumes:[/bold yellow]")
-            baseline_names = list(resumes_found.keys())
-            for idx, name in enumerate(baseline_names, start=1):
-                console.print(f"{idx}. {name}")
-            baseline_choice = Prompt.ask("Enter the number or name of the resume to use as baseline")
-            if baseline_choice.isdigit():
-                idx = int(baseline_choice) - 1
-                if 0 <= idx < len(baseline_names):
-                    chosen_baseline_name = baseline_names[idx]
-                else:
-                    console.print("[red]Invalid selection.[/red]")
-                    continue
-            else:
-                if baseline_choice in resumes_found:
-                    chosen_baseline_name = baseline_choice
-                else:
-                    console.print("[red]Invalid selection.[/red]")
-                    continue
-            baseline_resume = load_resume(chosen_baseline_name)
-            if not baseline_resume:
-                console.print("[red]Failed to load the chosen baseline resume.[/red]")
-                continue
-            
-            posting_input = Prompt.ask("Enter the job posting details or URL (paste the text)")
-            job_posting = process_job_posting_input(posting_input)
-            
-            console.print("[bold cyan]Scraped Job Posting Data (Display Version):[/bold cyan]")
-            try:
-                job_posting_json = json.loads(job_posting)
-                ai_job_posting = job_posting_json.get("ai_description", job_posting)
-            except Exception:
-                console.print(job_posting)
-                ai_job_posting = job_posting
-            
-            # Automatically clean the AI version of the job posting.
-            cleaned_job_posting = clean_job_posting_text(ai_job_posting)
-            console.print("[bold cyan]Cleaned Job Posting for AI:[/bold cyan]")
-            console.print(cleaned_job_posting)
-            
-            # Create a directory for the tailored resume.
-            dir_path = get_resume_path(tailored_name)
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path)
-                console.print(f"[green]Created directory '{dir_path}' for the tailored resume.[/green]")
-            
-            # Save the cleaned AI job posting data.
-            ai_job_posting_file = os.path.join(dir_path, "job_posting_ai.txt")
-            try:
-                with open(ai_job_posting_file, "w") as f:
-                    f.write(cleaned_job_posting)
-                console.print(f"[green]Saved cleaned AI job posting data to '{ai_job_posting_file}'.[/green]")
-            except Exception as e:
-                console.print(f"[red]Error saving AI job posting data: {e}[/red]")
-            
-            # Save the baseline resume.
-            baseline_file = os.path.join(dir_path, "baseline_resume.json")
-            try:
-                with open(baseline_file, "w") as f:
-                    json.dump(baseline_resume, f, indent=4)
-                console.print(f"[green]Saved baseline resume to '{baseline_file}'.[/green]")
-            except Exception as e:
-                console.print(f"[red]Error saving baseline resume: {e}[/red]")
-            
-            # Ask if the pre-package is ready to send.
-            ready = Confirm.ask("Is this tailored pre-package (job posting + baseline) ready to send?")
-            if not ready:
-                pre_package = {
-                    "baseline": baseline_resume,
-                    "job_posting": job_posting,
-                    "status": "incomplete",
-                    "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                pre_package_file = os.path.join(dir_path, "resume.json")
-                try:
-                    with open(pre_package_file, "w") as f:
-                        json.dump(pre_package, f, indent=4)
-                    console.print(f"[green]Pre-package saved as incomplete to '{pre_package_file}'.[/green]")
-                except Exception as e:
-                    console.print(f"[red]Error saving pre-package: {e}[/red]")
-                continue
-            
-            # If ready, call the external structured output class with the cleaned job posting.
-            tailor = ResumeTailorStructuredOutput()
-            try:
-                tailored_resume = tailor.tailor_resume(baseline_resume, cleaned_job_posting)
-                if tailored_resume:
-                    tailored_resume["status"] = "complete"
-            except Exception as e:
-                console.print(f"[red]Tailoring failed: {e}[/red]")
-                continue
-            
-            if tailored_resume:
-                tailored_file = os.path.join(dir_path, "resume.json")
-                try:
-                    with open(tailored_file, "w") as f:
-                        json.dump(tailored_resume, f, indent=4)
-                    console.print(f"[green]Tailored resume saved to '{tailored_file}'.[/green]")
-                except Exception as e:
-                    console.print(f"[red]Error saving tailored resume: {e}[/red]")
-        
-        elif choice == "3":
-            console.print("[bold yellow]Listing all resumes:[/bold yellow]")
-            resumes_found = list_resumes()
-            if resumes_found:
-                for name, data in resumes_found.items():
-                    status = data.get("status", "unknown")
-                    last_modified = data.get("last_modified", "N/A")
-                    console.print(f"[blue]{name}[/blue] - Status: [bold]{status}[/bold] | Last Modified: {last_modified}")
-            else:
-                console.print("[red]No resumes found.[/red]")
-        
-        elif choice == "4":
-            resumes_found = list_resumes()
-            if not resumes_found:
-                console.print("[red]No resumes available to load.[/red]")
-                continue
-            console.print("[bold yellow]Available Resumes:[/bold yellow]")
-            resume_names = list(resumes_found.keys())
-            for idx, name in enumerate(resume_names, start=1):
-                console.print(f"{idx}. {name}")
-            selection = Prompt.ask("Enter the number or name of the resume you want to load")
-            if selection.isdigit():
-                selection_idx = int(selection) - 1
-                if 0 <= selection_idx < len(resume_names):
-                    selected_resume = resume_names[selection_idx]
-                else:
-                    console.print("[red]Invalid selection.[/red]")
-                    continue
-            else:
-                if selection in resumes_found:
-                    selected_resume = selection
-                else:
-                    console.print("[red]Invalid selection.[/red]")
-                    continue
-            loaded = load_resume(selected_resume)
-            if loaded:
-                console.print(f"[bold green]Resume: {selected_resume}[/bold green]")
-                console.print_json(data=loaded)
-            else:
-                console.print("[red]Error loading resume.[/red]")
-        
-        elif choice == "5":
-            # Create Cover Letter for a Tailored Resume
-            resumes_found = list_resumes()
-            if not resumes_found:
-                console.print("[red]No resumes available to load.[/red]")
-                continue
-            console.print("[bold yellow]Available Tailored Resumes (must have job posting data):[/bold yellow]")
-            tailored_options = []
-            for name, data in resumes_found.items():
-                # Check if this resume directory has a job posting file
-                dir_path = get_resume_path(name)
-                job_posting_path = os.path.join(dir_path, "job_posting_ai.txt")
-                if os.path.exists(job_posting_path):
-                    tailored_options.append(name)
-                    console.print(f"- {name}")
-            if not tailored_options:
-                console.print("[red]No tailored resumes with job posting data found.[/red]")
-                continue
-            selected_resume = Prompt.ask("Enter the name of the tailored resume to use")
-            if selected_resume not in tailored_options:
-                console.print("[red]Invalid selection.[/red]")
-                continue
-            # Load the tailored resume
-            tailored_resume = load_resume(selected_resume)
-            if not tailored_resume:
-                console.print("[red]Failed to load the tailored resume.[/red]")
-                continue
-            # Load job posting data from job_posting_ai.txt
-            job_posting_path = os.path.join(get_resume_path(selected_resume), "job_posting_ai.txt")
-            try:
-                with open(job_posting_path, "r") as f:
-                    job_posting_data = f.read()
-            except Exception as e:
-                console.print(f"[red]Error loading job posting data: {e}[/red]")
-                continue
-            # Generate the cover letter via OpenAI Chat Completion.
-            cover_letter = create_cover_letter(tailored_resume, job_posting_data)
-            if cover_letter is None:
-                continue
-            # Save the cover letter to cover_letter.json in the tailored resume directory
-            cover_letter_file = os.path.join(get_resume_path(selected_resume), "cover_letter.json")
-            try:
-                with open(cover_letter_file, "w") as f:
-                    json.dump(cover_letter, f, indent=4)
-                console.print(f"[green]Cover letter saved to '{cover_letter_file}'.[/green]")
-            except Exception as e:
-                console.print(f"[red]Error saving cover letter: {e}[/red]")
-            console.print("[bold cyan]Generated Cover Letter:[/bold cyan]")
-            console.print_json(data=cover_letter)
-        
-        elif choice == "6":
-            console.print("[bold magenta]Adios amigo![/bold magenta]")
-            break
-
-if __name__ == "__main__":
-    main_menu()
+import os
+import sys
+import json
+import argparse
+import importlib
+import threading
+import unicodedata
+from datetime import datetime
+
+# openai, pygame, rich and the HTML parsers are imported on first use so the menu
+# (and scripted calls that only list or view resumes) start quickly.
+from llm import chat_completion
+from tracing import annotate, run_session, traced
+from token_budget import COVER_LETTER_TOKENS, expected_clean_tokens, plan as plan_tokens
+from audio import BackgroundPlayer
+from job_queue import JobQueue, job_output, print_jobs
+from streaming import LiveStreamRenderer
+from resume_index import ResumeIndex
+from compact_storage import content_hash
+from dedup import PostingIndex, load_package
+from storage import ResumeStore
+from http_fetch import default_fetcher
+from html_extract import extract as extract_posting_html
+from resume_models import (COVER_LETTER_SCHEMA, Certification, Education, JobTarget, OnlineProfiles, PersonalInfo,
+                           Resume, ResumeDocument, WorkExperience, check_schema, validate_cover_letter)
+from json_stream import extract_json
+from posting_parser import clean_posting_locally, find_job_posting_ld
+
+class LazyObject:
+    """Stand-in that builds the real object on first attribute access."""
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    # Special methods bypass __getattr__; Rich uses the console as a context manager.
+    def __enter__(self):
+        return self._load().__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._load().__exit__(*exc_info)
+
+class JobAwareConsole:
+    """
+    The menu console, except on a background job's thread: there output goes to a plain
+    console writing into that job's buffer (stored with the job) instead of over the menu.
+    """
+    def __init__(self, console):
+        self._console = console
+        self._local = threading.local()
+
+    def _target(self):
+        buffer = job_output()
+        if buffer is None:
+            return self._console
+        if getattr(self._local, "buffer", None) is not buffer:
+            from rich.console import Console
+            self._local.buffer, self._local.console = buffer, Console(file=buffer, width=120)
+        return self._local.console
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+    def __enter__(self):
+        return self._target().__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._target().__exit__(*exc_info)
+
+def lazy_attr(module, name, call=False):
+    """LazyObject for module.name (or module.name() when call=True)."""
+    def factory():
+        obj = getattr(importlib.import_module(module), name)
+        return obj() if call else obj
+    return LazyObject(factory)
+
+def load_api_key():
+    """Check for API key from environment variable, then file; export it for the OpenAI client."""
+    key = os.getenv("OPENAI_API_KEY")
+    if not key and os.path.exists("openai-api-key.txt"):
+        with open("openai-api-key.txt", "r") as f:
+            key = f.read().strip()
+        if key:
+            os.environ["OPENAI_API_KEY"] = key
+    return key
+
+api_key = load_api_key()
+
+console = JobAwareConsole(lazy_attr("rich.console", "Console", call=True))
+Prompt = lazy_attr("rich.prompt", "Prompt")
+Confirm = lazy_attr("rich.prompt", "Confirm")
+
+RESUMES_DIR = "resumes"
+MIDI_DIR = "midi"
+
+resume_index = ResumeIndex(RESUMES_DIR)
+store = ResumeStore(RESUMES_DIR)
+posting_index = PostingIndex(RESUMES_DIR)
+
+@traced("scrape")
+def scrape_job_posting(url):
+    try:
+        page = default_fetcher.fetch(url)
+        # Title from Open Graph or <title>; boilerplate-free page text and the main posting block.
+        extraction = extract_posting_html(page.text)
+        
+        job_posting_data = {
+            "url": url,
+            "title": extraction.title,
+            "description": extraction.full_text,                        # Human-readable version
+            "ai_description": f"{extraction.title}\n{extraction.text}",  # AI version: main content only
+            "job_posting_ld": find_job_posting_ld(extraction.json_ld)     # schema.org JobPosting, if the page has one
+        }
+        return json.dumps(job_posting_data, indent=4)
+    except Exception as e:
+        console.print(f"[red]Error scraping job posting from URL: {e}[/red]")
+        return f"Job Posting URL: {url} (failed to scrape content)"
+
+def process_job_posting_input(input_text):
+    if input_text.startswith("http://") or input_text.startswith("https://"):
+        return scrape_job_posting(input_text)
+    else:
+        return input_text
+
+@traced("clean")
+def clean_job_posting_text(ai_text, stream=False, job_posting_ld=None, local_first=True, fallback=True):
+    # Well-structured postings (JSON-LD or standard headings) are cleaned locally; the rest go to the LLM.
+    # If the LLM call still fails after retries, the raw text is used (fallback=True) or the error is raised.
+    if local_first:
+        parsed = clean_posting_locally(ai_text, job_posting_ld)
+        if parsed:
+            annotate("cleaned_by", parsed.source)
+            console.print(f"[green]Cleaned job posting locally ({parsed.source}, confidence {parsed.confidence:.2f}).[/green]")
+            return parsed.to_text()
+    instructions = "Clean the following job announcement by stripping out extraneous content and return all the job details. Display the Title, Company, Location(s), and Salary Range First. Then, Outline the Role by combining what is in there with your summary as well, then Key Responsibilities in great detail if they're posted and create them if they arent, then Qualifications in great detail to the letter of the announcement and then your summary of additional skills you believe would be required, then a 'everything else' category that outlines what your AI synposis is of the job itself:':"
+    try:
+        # Trim oversized postings locally and size max_tokens to the expected answer.
+        messages, budget = plan_tokens("clean_job_posting", "gpt-4o",
+                                       lambda text: [{"role": "user", "content": f"{instructions}\n\n{text}"}],
+                                       ai_text, expected_clean_tokens(ai_text))
+        cleaned_text = chat_completion(
+            model="gpt-4o",
+            store=True,
+            messages=messages,
+            budget=budget,
+            stream_handler=LiveStreamRenderer("Cleaned Job Posting", console, json_output=False) if stream else None
+        )
+        return cleaned_text
+    except Exception as e:
+        if not fallback:
+            raise Exception(f"Error cleaning job posting: {e}")
+        console.print(f"[red]Error cleaning job posting: {e}[/red]")
+        console.print("[yellow]Using the uncleaned job posting instead.[/yellow]")
+        return ai_text
+
+def get_job_target():
+    console.print("[bold cyan]Job Target Information[/bold cyan]")
+    position_title = Prompt.ask("Desired Position Title")
+    company = Prompt.ask("Desired Company")
+    location = Prompt.ask("Desired Location")
+    salary_desired = Prompt.ask("Desired Salary Range")
+    return JobTarget(
+        position_title=position_title,
+        company=company,
+        location=location,
+        salary_desired=salary_desired
+    )
+
+def get_personal_info():
+    console.print("[bold cyan]Personal Information[/bold cyan]")
+    name = Prompt.ask("Full Name")
+    email = Prompt.ask("Email")
+    phone = Prompt.ask("Phone Number")
+    summary = Prompt.ask("Enter your professional summary (optional)", default="")
+    return PersonalInfo(name=name, email=email, phone=phone, summary=summary)
+
+def get_work_experience():
+    experiences = []
+    add_more = True
+    while add_more:
+        console.print("\n[bold cyan]Work Experience Entry[/bold cyan]")
+        job_title = Prompt.ask("Job Title")
+        company = Prompt.ask("Company")
+        location = Prompt.ask("Location")
+        start_date = Prompt.ask("Start Date (e.g., Jan 2020)")
+        end_date = Prompt.ask("End Date (e.g., Dec 2020 or Present)")
+        responsibilities_input = Prompt.ask("Enter responsibilities (separate each with a semicolon ';')")
+        responsibilities = [r.strip() for r in responsibilities_input.split(";") if r.strip()]
+        achievements_input = Prompt.ask("Enter achievements (separate each with a semicolon ';')")
+        achievements = [a.strip() for a in achievements_input.split(";") if a.strip()]
+        programs_input = Prompt.ask("Enter programs managed (separate each with a semicolon ';')", default="")
+        programs_managed = [p.strip() for p in programs_input.split(";") if p.strip()]
+        technologies_input = Prompt.ask("Enter technologies (separate each with a comma ',')", default="")
+        technologies = [t.strip() for t in technologies_input.split(",") if t.strip()]
+        experience = WorkExperience(
+            job_title=job_title,
+            company=company,
+            location=location,
+            start_date=start_date,
+            end_date=end_date,
+            responsibilities=responsibilities,
+            achievements=achievements,
+            programs_managed=programs_managed,
+            technologies=technologies,
+        )
+        experiences.append(experience)
+        add_more = Confirm.ask("Would you like to add another job?")
+    return experiences
+
+def get_education():
+    educations = []
+    add_more = True
+    while add_more:
+        console.print("\n[bold cyan]Education Entry[/bold cyan]")
+        institution = Prompt.ask("Institution Name")
+        degree = Prompt.ask("Degree / Certification")
+        location = Prompt.ask("Location")
+        start_date = Prompt.ask("Start Date")
+        end_date = Prompt.ask("End Date (or Graduation Year)")
+        details = Prompt.ask("Enter details about your education (optional)", default="")
+        educations.append(Education(
+            institution=institution,
+            degree=degree,
+            location=location,
+            start_date=start_date,
+            end_date=end_date,
+            details=details
+        ))
+        add_more = Confirm.ask("Would you like to add another education entry?")
+    return educations
+
+def get_certifications():
+    certs = []
+    if Confirm.ask("Do you have any certifications?"):
+        add_more = True
+        while add_more:
+            console.print("[bold cyan]Certification Entry[/bold cyan]")
+            name = Prompt.ask("Certification Name")
+            specialization = Prompt.ask("Specialization")
+            awarded_by = Prompt.ask("Awarded By")
+            year = Prompt.ask("Year (or N/A)")
+            certs.append(Certification(
+                name=name,
+                specialization=specialization,
+                awarded_by=awarded_by,
+                year=year
+            ))
+            add_more = Confirm.ask("Would you like to add another certification?")
+    return certs
+
+def get_leadership_skills():
+    skills = Prompt.ask("Enter your leadership skills separated by commas (if any)", default="")
+    return [s.strip() for s in skills.split(",") if s.strip()]
+
+def get_tools():
+    tools = Prompt.ask("Enter the tools you are proficient with, separated by commas (if any)", default="")
+    return [t.strip() for t in tools.split(",") if t.strip()]
+
+def get_online_profiles():
+    console.print("[bold cyan]Online Profiles[/bold cyan]")
+    hugging_face = Prompt.ask("Enter your Hugging Face profile (if any)", default="")
+    github = Prompt.ask("Enter your GitHub profile (if any)", default="")
+    return OnlineProfiles(hugging_face=hugging_face, github=github)
+
+def create_resume():
+    job_target = get_job_target()
+    personal_info = get_personal_info()
+    work_experience = get_work_experience()
+    education = get_education()
+    certifications = get_certifications()
+    leadership_skills = get_leadership_skills()
+    tools = get_tools()
+    online_profiles = get_online_profiles()
+    
+    complete = Confirm.ask("Is this resume complete?")
+    status = "complete" if complete else "in progress"
+    last_modified = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    resume = Resume(
+        job_target=job_target,
+        personal_info=personal_info,
+        work_experience=work_experience,
+        education=education,
+        certifications=certifications,
+        leadership_skills=leadership_skills,
+        tools=tools,
+        online_profiles=online_profiles
+    )
+    
+    # The same models generate the tailoring schema, so this always matches it.
+    return ResumeDocument(resume=resume, status=status, last_modified=last_modified).to_dict()
+
+def ensure_resumes_dir():
+    if not os.path.exists(RESUMES_DIR):
+        os.makedirs(RESUMES_DIR)
+        console.print(f"[green]Created '{RESUMES_DIR}' directory.[/green]")
+
+def get_resume_path(resume_name):
+    return os.path.join(RESUMES_DIR, resume_name)
+
+def save_resume(resume_data, resume_name):
+    ensure_resumes_dir()
+    file_path = os.path.join(get_resume_path(resume_name), "resume.json")
+    try:
+        store.write_json(resume_name, "resume.json", resume_data)
+        resume_index.update(resume_name)
+        console.print(f"[green]Saved resume to {file_path}[/green]")
+    except Exception as e:
+        console.print(f"[red]Error saving resume: {e}[/red]")
+
+@traced("save")
+def save_package(resume_name, files):
+    """Write {filename: text or JSON data} into a resume directory as one all-or-nothing commit."""
+    ensure_resumes_dir()
+    with store.transaction(resume_name) as txn:
+        for filename, content in files.items():
+            if isinstance(content, str):
+                txn.write_text(filename, content)
+            else:
+                txn.write_json(filename, content)
+
+def list_resumes(**filters):
+    """
+    Return {name: metadata} for every saved resume from the metadata index.
+    Metadata holds status, last_modified, has_job_posting and has_cover_letter;
+    use load_resume() to get the full document.
+    """
+    ensure_resumes_dir()
+    resumes_found = {}
+    for name, meta in resume_index.list(**filters).items():
+        if meta["error"]:
+            file_path = os.path.join(get_resume_path(name), "resume.json")
+            console.print(f"[red]Error loading resume from {file_path}: {meta['error']}[/red]")
+            continue
+        resumes_found[name] = meta
+    return resumes_found
+
+def load_resume(resume_name):
+    try:
+        return store.read_json(resume_name, "resume.json")
+    except Exception as e:
+        console.print(f"[red]Error loading resume {resume_name}: {e}[/red]")
+        return None
+
+def clean_unicode(text):
+    """Normalize and clean up any weird Unicode characters."""
+    return unicodedata.normalize("NFKC", text)
+
+def normalize_text(value):
+    """Apply clean_unicode to every string in a parsed JSON value."""
+    if isinstance(value, str):
+        return clean_unicode(value)
+    if isinstance(value, dict):
+        return {key: normalize_text(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize_text(item) for item in value]
+    return value
+
+@traced("cover_letter")
+def create_cover_letter(tailored_resume, job_posting_data, stream=False):
+    """
+    Generate a cover letter in JSON format using the provided resume and job posting.
+    This function sends both inputs to the OpenAI Chat Completion API with the cover letter
+    Structured Outputs schema (header, salutation, body, and closing) and checks the reply against it.
+    With stream=True the letter is rendered live in the console as it is generated.
+    """
+    # Ensure job_posting_data is a dictionary (if not, try to parse it)
+    if isinstance(job_posting_data, str):
+        try:
+            job_posting_dict = json.loads(job_posting_data)
+        except Exception:
+            job_posting_dict = {"description": job_posting_data}
+    else:
+        job_posting_dict = job_posting_data
+
+    # Convert the resume and job posting to formatted JSON strings for clarity.
+    # last_modified is left out so re-runs produce an identical (cacheable) prompt.
+    resume_for_prompt = {k: v for k, v in tailored_resume.items() if k != "last_modified"}
+    resume_str = json.dumps(resume_for_prompt, indent=2, ensure_ascii=False)
+    job_posting_str = json.dumps(job_posting_dict, indent=2, ensure_ascii=False)
+
+    def build_messages(job_posting_text):
+        return [{"role": "user", "content": prompt_head + f"Job Posting:\n{job_posting_text}"}]
+
+    prompt_head = (
+        "Using the resume and job posting provided below, generate a captivating, award-winning cover letter in JSON format. "
+        "This cover letter must break the mold of generic templates by showcasing creativity, passion, and specificity to both the candidate's achievements and the job requirements. "
+        "Ensure the response is free from any encoded Unicode escape sequences like \\u2019 and outputs clean, natural text. "
+        "The output should be a well-structured JSON object with the following sections:\n\n"
+        "1. Header: Include the current date, the candidate's full name, and their contact information (email and phone number).\n"
+        "2. Salutation: A personalized greeting addressing the hiring manager directly.\n"
+        "3. Body:\n"
+        "   a. Introduction: Craft a strong, engaging opening that grabs attention and clearly expresses the candidate’s enthusiasm for the position.\n"
+        "   b. Reference to Job Posting: Specifically mention details from the job posting, explaining how the candidate's background and achievements uniquely align with the role.\n"
+        "   c. Summary of Relevant Experience: Provide a detailed, dynamic account of the candidate’s accomplishments and skills, highlighting what sets them apart and how they will add value to the organization.\n"
+        "   d. Conclusion: Offer a compelling closing statement that reiterates enthusiasm, includes a call to action, and leaves a memorable impression.\n"
+        "4. Closing: A professional sign-off with the candidate’s name.\n\n"
+        "Output strictly as a JSON object with no markdown formatting or explanations.\n\n"
+        f"Resume:\n{resume_str}\n\n"
+    )
+
+    try:
+        messages, budget = plan_tokens("cover_letter", "gpt-4o", build_messages, job_posting_str, COVER_LETTER_TOKENS)
+        cover_letter_output = chat_completion(
+            model="gpt-4o",
+            store=True,
+            messages=messages,
+            response_format={"type": "json_schema", "json_schema": COVER_LETTER_SCHEMA},
+            budget=budget,
+            validate=lambda text: check_schema(extract_json(text, allow_partial=False), validate_cover_letter, "cover letter"),
+            stream_handler=LiveStreamRenderer("Cover Letter", console) if stream else None
+        )
+
+        # The schema makes the reply plain JSON; extract_json still copes with fences or
+        # trailing prose from endpoints that ignore response_format. A final reply must be
+        # complete: a letter cut off mid-"Closing" is an error, not something to close off.
+        cover_letter_json = normalize_text(extract_json(cover_letter_output, allow_partial=False))
+        check_schema(cover_letter_json, validate_cover_letter, "cover letter")
+        return cover_letter_json
+
+    except Exception as e:
+        console.print(f"[red]Error generating cover letter: {e}[/red]")
+        return None
+
+def run_tailor_job(params):
+    """
+    Background job for option 2: scrape, clean, tailor and save through api.tailor().
+    The duplicate check already ran in the menu (reuse is a question for the user), so it is off here.
+    """
+    import api
+    result = api.tailor(params["posting"], baseline=params["baseline"], name=params["name"],
+                        cover_letter=params["fused"], tailor_mode=params["tailor_mode"], top_k=params["top_k"],
+                        llm_clean=params["llm_clean"], fused=params["fused"], dedup=False)
+    return {"duplicate_of": result["duplicate_of"]}
+
+def run_cover_letter_job(params):
+    """Background job for option 5."""
+    import api
+    api.cover_letter(params["name"])
+
+def report_finished_jobs(jobs):
+    for job in jobs.pop_finished():
+        label = f"Background job #{job['id']} ({job['kind']} '{job['name']}')"
+        if job["status"] == "done":
+            console.print(f"[green]{label} finished in {job['seconds']:.1f}s.[/green]")
+        else:
+            console.print(f"[red]{label} failed: {job['error']}[/red]")
+
+def main_menu(stream=False, tailor_mode="full", llm_clean=False, music=True, top_k=None, fused=False):
+    console.print(r"""    ___  ________    ___   _____    __  ___   __________________________           
+   /   |/_  __/ /   /   | / ___/   / / / / | / /  _/ ____/  _/ ____/ __ \          
+  / /| | / / / /   / /| | \__ \   / / / /  |/ // // /_   / // __/ / / / /          
+ / ___ |/ / / /___/ ___ |___/ /  / /_/ / /|  // // __/ _/ // /___/ /_/ /           
+/_/ _|_/_/_/_____/_/_ |_/____/  _\____/_/ |_/___/_/_  /___/_____/_____/ __________ 
+   / __ \/ ____/ ___// / / /  |/  / ____/  / __ )/ / / /  _/ /   / __ \/ ____/ __ \
+  / /_/ / __/  \__ \/ / / / /|_/ / __/    / __  / / / // // /   / / / / __/ / /_/ /
+ / _, _/ /___ ___/ / /_/ / /  / / /___   / /_/ / /_/ // // /___/ /_/ / /___/ _, _/ 
+/_/ |_/_____//____/\____/_/  /_/_____/  /_____/\____/___/_____/_____/_____/_/ |_|                             
+    """, style="bold bright_magenta")
+
+    recovered = store.recover()
+    if recovered:
+        console.print(f"[yellow]Finished interrupted saves for: {', '.join(recovered)}[/yellow]")
+
+    # Music starts on a background thread; the menu never waits for it.
+    player = BackgroundPlayer(MIDI_DIR).start() if music else None
+    tailor = None  # built on first use and reused for every tailoring run
+    # Tailoring and cover letters can run on background workers; unfinished jobs carry over restarts.
+    jobs = JobQueue(RESUMES_DIR, {"tailor": run_tailor_job, "cover_letter": run_cover_letter_job})
+    resumed = jobs.start()
+    if resumed:
+        console.print(f"[yellow]Resuming {resumed} unfinished background job(s).[/yellow]")
+    
+    while True:
+        report_finished_jobs(jobs)
+        console.print("\n[bold green]Main Menu[/bold green]")
+        console.print("[bold blue]1.[/bold blue] Create/Edit Baseline Resume")
+        console.print("[bold blue]2.[/bold blue] Create a Tailored Resume for a Job Posting")
+        console.print("[bold blue]3.[/bold blue] List All Resumes")
+        console.print("[bold blue]4.[/bold blue] Load and View a Resume")
+        console.print("[bold blue]5.[/bold blue] Create Cover Letter for a Tailored Resume")
+        active = jobs.active()
+        console.print("[bold blue]6.[/bold blue] Background Jobs" + (f" ({active} in progress)" if active else ""))
+        console.print("[bold blue]7.[/bold blue] Quit")
+        choices = ["1", "2", "3", "4", "5", "6", "7"]
+        if player:
+            console.print("[bold blue]m.[/bold blue] Skip to the Next Track")
+            choices.append("m")
+        choice = Prompt.ask("Enter your choice", choices=choices)
+        
+        if choice == "1":
+            console.print("[bold blue]Creating/Editing Baseline Resume...[/bold blue]")
+            new_resume = create_resume()
+            save_resume(new_resume, "baseline")
+            console.print("[green]Baseline resume created/updated![/green]")
+        
+        elif choice == "2":
+            tailored_name = Prompt.ask("Enter a name for this tailored resume (no spaces)")
+            resumes_found = list_resumes()
+            if not resumes_found:
+                console.print("[red]No resumes available. Please create a baseline resume first.[/red]")
+                continue
+            console.print("[bold yellow]Available Baseline Resumes:[/bold yellow]")
+            baseline_names = list(resumes_found.keys())
+            for idx, name in enumerate(baseline_names, start=1):
+                console.print(f"{idx}. {name}")
+            baseline_choice = Prompt.ask("Enter the number or name of the resume to use as baseline")
+            if baseline_choice.isdigit():
+                idx = int(baseline_choice) - 1
+                if 0 <= idx < len(baseline_names):
+                    chosen_baseline_name = baseline_names[idx]
+                else:
+                    console.print("[red]Invalid selection.[/red]")
+                    continue
+            else:
+                if baseline_choice in resumes_found:
+                    chosen_baseline_name = baseline_choice
+                else:
+                    console.print("[red]Invalid selection.[/red]")
+                    continue
+            baseline_resume = load_resume(chosen_baseline_name)
+            if not baseline_resume:
+                console.print("[red]Failed to load the chosen baseline resume.[/red]")
+                continue
+            
+            posting_input = Prompt.ask("Enter the job posting details or URL (paste the text)")
+            job_posting = process_job_posting_input(posting_input)
+            
+            console.print("[bold cyan]Scraped Job Posting Data (Display Version):[/bold cyan]")
+            try:
+                job_posting_json = json.loads(job_posting)
+                ai_job_posting = job_posting_json.get("ai_description", job_posting)
+                job_posting_ld = job_posting_json.get("job_posting_ld")
+            except Exception:
+                console.print(job_posting)
+                ai_job_posting = job_posting
+                job_posting_ld = None
+            
+            # Same (or nearly the same) posting already tailored from this baseline? Offer to reuse it.
+            baseline_hash = content_hash(baseline_resume)
+            match = posting_index.lookup(ai_job_posting, baseline_hash)
+            reused = load_package(store, match.name) if match and match.name != tailored_name else None
+            if reused is not None:
+                kind = "an exact duplicate" if match.exact else f"{match.similarity:.0%} similar"
+                console.print(f"[yellow]This posting is {kind} of the one '{match.name}' was tailored for.[/yellow]")
+                if Confirm.ask(f"Reuse the tailored resume from '{match.name}' instead of tailoring again?"):
+                    try:
+                        save_package(tailored_name, reused)
+                        console.print(f"[green]Copied '{match.name}' to '{get_resume_path(tailored_name)}'.[/green]")
+                    except Exception as e:
+                        console.print(f"[red]Error saving tailored resume: {e}[/red]")
+                    resume_index.update(tailored_name)
+                    continue
+            
+            # The background job scrapes the posting again (served from the page cache) and skips the duplicate check.
+            if Confirm.ask("Run it in the background while you keep using the menu?", default=True):
+                job_id = jobs.submit("tailor", tailored_name, {
+                    "posting": posting_input, "baseline": chosen_baseline_name, "name": tailored_name,
+                    "tailor_mode": tailor_mode, "top_k": top_k, "llm_clean": llm_clean, "fused": fused,
+                })
+                console.print(f"[green]Queued background job #{job_id} for '{tailored_name}'; option 6 shows how it's going.[/green]")
+                continue
+            
+            if fused:
+                # Cleaning, tailoring and the cover letter all come back from one request below.
+                cleaned_job_posting = ai_job_posting
+            else:
+                # Automatically clean the AI version of the job posting.
+                cleaned_job_posting = clean_job_posting_text(ai_job_posting, stream=stream, job_posting_ld=job_posting_ld,
+                                                             local_first=not llm_clean)
+                console.print("[bold cyan]Cleaned Job Posting for AI:[/bold cyan]")
+                console.print(cleaned_job_posting)
+            
+            # The cleaned posting, the baseline and resume.json are committed together
+            # once we know what resume.json holds, so a crash never leaves half a package.
+            dir_path = get_resume_path(tailored_name)
+            package_files = {
+                "job_posting_ai.txt": cleaned_job_posting,
+                "baseline_resume.json": baseline_resume,
+            }
+            
+            # Ask if the pre-package is ready to send.
+            ready = Confirm.ask("Is this tailored pre-package (job posting + baseline) ready to send?")
+            if not ready:
+                pre_package = {
+                    "baseline": baseline_resume,
+                    "job_posting": job_posting,
+                    "status": "incomplete",
+                    "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+                package_files["resume.json"] = pre_package
+                try:
+                    save_package(tailored_name, package_files)
+                    console.print(f"[green]Pre-package saved as incomplete to '{dir_path}'.[/green]")
+                except Exception as e:
+                    console.print(f"[red]Error saving pre-package: {e}[/red]")
+                resume_index.update(tailored_name)
+                continue
+            
+            # If ready, call the external structured output class with the cleaned job posting.
+            if tailor is None:
+                from structured_output import ResumeTailorStructuredOutput
+                tailor = ResumeTailorStructuredOutput()
+            try:
+                if fused:
+                    package = tailor.tailor_package(baseline_resume, ai_job_posting, stream=stream, top_k=top_k)
+                    tailored_resume = package["resume"]
+                    package_files["job_posting_ai.txt"] = package["job_posting"]
+                    package_files["cover_letter.json"] = normalize_text(package["cover_letter"])
+                    console.print("[bold cyan]Cleaned Job Posting for AI:[/bold cyan]")
+                    console.print(package["job_posting"])
+                else:
+                    tailored_resume = tailor.tailor_resume(baseline_resume, cleaned_job_posting, stream=stream,
+                                                           mode=tailor_mode, top_k=top_k)
+                if tailored_resume:
+                    tailored_resume["status"] = "complete"
+            except Exception as e:
+                console.print(f"[red]Tailoring failed: {e}[/red]")
+                # Keep the cleaned posting and baseline so the run can be picked up again.
+                try:
+                    save_package(tailored_name, package_files)
+                    console.print(f"[yellow]Cleaned job posting and baseline kept in '{dir_path}'.[/yellow]")
+                except Exception as e:
+                    console.print(f"[red]Error saving job posting and baseline: {e}[/red]")
+                resume_index.update(tailored_name)
+                continue
+            
+            if tailored_resume:
+                package_files["resume.json"] = tailored_resume
+                try:
+                    save_package(tailored_name, package_files)
+                    saved = "Tailored resume, cover letter" if fused else "Tailored resume"
+                    console.print(f"[green]{saved}, baseline and cleaned job posting saved to '{dir_path}'.[/green]")
+                    posting_index.add(tailored_name, ai_job_posting, baseline_hash)
+                except Exception as e:
+                    console.print(f"[red]Error saving tailored resume: {e}[/red]")
+                resume_index.update(tailored_name)
+        
+        elif choice == "3":
+            console.print("[bold yellow]Listing all resumes:[/bold yellow]")
+            resumes_found = list_resumes()
+            if resumes_found:
+                for name, data in resumes_found.items():
+                    status = data.get("status", "unknown")
+                    last_modified = data.get("last_modified", "N/A")
+                    console.print(f"[blue]{name}[/blue] - Status: [bold]{status}[/bold] | Last Modified: {last_modified}")
+            else:
+                console.print("[red]No resumes found.[/red]")
+        
+        elif choice == "4":
+            resumes_found = list_resumes()
+            if not resumes_found:
+                console.print("[red]No resumes available to load.[/red]")
+                continue
+            console.print("[bold yellow]Available Resumes:[/bold yellow]")
+            resume_names = list(resumes_found.keys())
+            for idx, name in enumerate(resume_names, start=1):
+                console.print(f"{idx}. {name}")
+            selection = Prompt.ask("Enter the number or name of the resume you want to load")
+            if selection.isdigit():
+                selection_idx = int(selection) - 1
+                if 0 <= selection_idx < len(resume_names):
+                    selected_resume = resume_names[selection_idx]
+                else:
+                    console.print("[red]Invalid selection.[/red]")
+                    continue
+            else:
+                if selection in resumes_found:
+                    selected_resume = selection
+                else:
+                    console.print("[red]Invalid selection.[/red]")
+                    continue
+            loaded = load_resume(selected_resume)
+            if loaded:
+                console.print(f"[bold green]Resume: {selected_resume}[/bold green]")
+                console.print_json(data=loaded)
+                if Confirm.ask("Render it (and its cover letter) to HTML, Markdown, DOCX and PDF?", default=False):
+                    from render import RENDERED_DIRNAME, render_resume
+                    result = render_resume(RESUMES_DIR, selected_resume)
+                    if result["error"]:
+                        console.print(f"[red]Error rendering resume: {result['error']}[/red]")
+                    else:
+                        console.print(f"[green]Rendered {len(result['rendered'])} file(s), {len(result['skipped'])} "
+                                      f"already up to date, in '{get_resume_path(selected_resume)}/{RENDERED_DIRNAME}'.[/green]")
+            else:
+                console.print("[red]Error loading resume.[/red]")
+        
+        elif choice == "5":
+            # Create Cover Letter for a Tailored Resume
+            resumes_found = list_resumes()
+            if not resumes_found:
+                console.print("[red]No resumes available to load.[/red]")
+                continue
+            console.print("[bold yellow]Available Tailored Resumes (must have job posting data):[/bold yellow]")
+            tailored_options = []
+            for name, meta in resumes_found.items():
+                # Only resumes whose directory has a job posting file qualify
+                if meta["has_job_posting"]:
+                    tailored_options.append(name)
+                    console.print(f"- {name}")
+            if not tailored_options:
+                console.print("[red]No tailored resumes with job posting data found.[/red]")
+                continue
+            selected_resume = Prompt.ask("Enter the name of the tailored resume to use")
+            if selected_resume not in tailored_options:
+                console.print("[red]Invalid selection.[/red]")
+                continue
+            if Confirm.ask("Run it in the background while you keep using the menu?", default=True):
+                job_id = jobs.submit("cover_letter", selected_resume, {"name": selected_resume})
+                console.print(f"[green]Queued background job #{job_id} for '{selected_resume}'; option 6 shows how it's going.[/green]")
+                continue
+            # Load the tailored resume
+            tailored_resume = load_resume(selected_resume)
+            if not tailored_resume:
+                console.print("[red]Failed to load the tailored resume.[/red]")
+                continue
+            # Load job posting data from job_posting_ai.txt
+            job_posting_path = os.path.join(get_resume_path(selected_resume), "job_posting_ai.txt")
+            try:
+                with open(job_posting_path, "r") as f:
+                    job_posting_data = f.read()
+            except Exception as e:
+                console.print(f"[red]Error loading job posting data: {e}[/red]")
+                continue
+            # Generate the cover letter via OpenAI Chat Completion.
+            cover_letter = create_cover_letter(tailored_resume, job_posting_data, stream=stream)
+            if cover_letter is None:
+                continue
+            # Save the cover letter to cover_letter.json in the tailored resume directory
+            cover_letter_file = os.path.join(get_resume_path(selected_resume), "cover_letter.json")
+            try:
+                store.write_json(selected_resume, "cover_letter.json", cover_letter)
+                console.print(f"[green]Cover letter saved to '{cover_letter_file}'.[/green]")
+            except Exception as e:
+                console.print(f"[red]Error saving cover letter: {e}[/red]")
+            resume_index.update(selected_resume)
+            console.print("[bold cyan]Generated Cover Letter:[/bold cyan]")
+            console.print_json(data=cover_letter)
+        
+        elif choice == "m":
+            if player.playing:
+                player.next_track()
+                console.print("[green]Skipping to the next track.[/green]")
+            else:
+                console.print(f"[yellow]{player.error or 'No track is playing.'}[/yellow]")
+        
+        elif choice == "6":
+            recent = jobs.list()
+            if not recent:
+                console.print("[yellow]No background jobs yet.[/yellow]")
+                continue
+            print_jobs(console, recent)
+            with_output = {str(job["id"]): job for job in recent if job["output"]}
+            if with_output:
+                job_choice = Prompt.ask("Show the output of job # (Enter to skip)", choices=[""] + list(with_output),
+                                        show_choices=False)
+                if job_choice:
+                    console.print(with_output[job_choice]["output"], markup=False, highlight=False)
+            if any(job["status"] in ("done", "failed") for job in recent) and \
+                    Confirm.ask("Clear finished jobs from the list?", default=False):
+                console.print(f"[green]Cleared {jobs.clear_finished()} finished job(s).[/green]")
+        
+        elif choice == "7":
+            active = jobs.active()
+            if active and Confirm.ask(f"{active} background job(s) still in progress. Wait for them? "
+                                      "(Otherwise they pick up again next time.)", default=True):
+                console.print("[cyan]Waiting for background jobs...[/cyan]")
+                jobs.wait()
+                report_finished_jobs(jobs)
+            console.print("[bold magenta]Adios amigo![/bold magenta]")
+            if player:
+                player.stop()
+            break
+
+if __name__ == "__main__":
+    # api.py (and the background jobs using it) import "main"; make that this running module.
+    sys.modules.setdefault("main", sys.modules[__name__])
+    parser = argparse.ArgumentParser(description="Resume tailoring and cover letter generator.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream OpenAI output live to the console instead of waiting for the full response.")
+    parser.add_argument("--tailor-mode", choices=["full", "patch", "fanout"], default="full",
+                        help="'patch' sends only the editable resume fields and merges the result locally; "
+                             "'fanout' tailors them in parallel requests, one per work_experience entry.")
+    parser.add_argument("--llm-clean", action="store_true",
+                        help="Always clean job postings with gpt-4o instead of trying the local parser first.")
+    parser.add_argument("--top-k", type=int, metavar="K",
+                        help="Only send the K most relevant responsibilities/achievements/technologies per job.")
+    parser.add_argument("--fused", action="store_true",
+                        help="Clean the posting, tailor the resume and write the cover letter in a single gpt-4o call.")
+    parser.add_argument("--no-music", action="store_true", help="Skip background MIDI music (pygame is never imported).")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record per-stage spans to cache/traces/ and print a timing/token summary at the end.")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="Run under cProfile and write the stats to PATH (default cache/profiles/).")
+    from api import add_subcommands, run_command
+    add_subcommands(parser)
+    args = parser.parse_args()
+    if args.command:
+        # Summaries go to stderr so stdout stays a single JSON document.
+        from rich.console import Console
+        with run_session(Console(stderr=True), trace=args.trace, profile=args.profile):
+            code = run_command(args)
+        raise SystemExit(code)
+    with run_session(console, trace=args.trace, profile=args.profile):
+        main_menu(stream=args.stream, tailor_mode=args.tailor_mode, llm_clean=args.llm_clean,
+                  music=not args.no_music, top_k=args.top_k, fused=args.fused)
@@ -0,0 +1,270 @@
+"""
+Local, rule-based job-posting cleaner.
+
+Builds the same Title / Company / Location(s) / Salary Range / Role Overview /
+Key Responsibilities / Qualifications layout that clean_job_posting_text asks
+gpt-4o for, using schema.org JobPosting JSON-LD when the page has it and common
+section headings otherwise. Each result carries a confidence score so callers
+only fall back to the LLM when the posting could not be parsed well. A posting
+without a title or company always goes to the LLM, whatever its score: both end
+up in the job target and the cover letter.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+DEFAULT_MIN_CONFIDENCE = 0.7
+
+SECTION_PATTERNS = [
+    ("responsibilities", re.compile(
+        r"responsibilit|what you('|’)?ll (do|be doing)|what you will (do|be doing)|duties|your impact|"
+        r"day[- ]to[- ]day|in this role|your role|the work", re.I)),
+    ("qualifications", re.compile(
+        r"qualifications|requirements|what we('|’)?re looking for|what you bring|who you are|you have|"
+        r"must[- ]haves?|nice[- ]to[- ]haves?|preferred|skills|about you|bonus points", re.I)),
+    ("compensation", re.compile(r"compensation|salary|pay range|pay transparency|benefits|perks", re.I)),
+    ("overview", re.compile(
+        r"about the (role|job|position|team|opportunity)|role overview|job summary|overview|summary|"
+        r"the opportunity|position summary|job description|description", re.I)),
+]
+SALARY_PATTERN = re.compile(
+    r"[$€£]\s?\d[\d,]*(?:\.\d+)?\s?[kK]?\s*(?:-|–|—|to)\s*[$€£]?\s?\d[\d,]*(?:\.\d+)?\s?[kK]?"
+    r"(?:\s*(?:USD|EUR|GBP|CAD))?(?:\s*(?:per|/|an?)\s*(?:year|yr|hour|hr|annum)|\s*annually)?")
+LOCATION_PATTERN = re.compile(r"^((?i:remote)\b.*|.*\b[A-Z][a-zA-Z .]+,\s*[A-Z]{2}\b.*)$")
+COMPANY_PATTERN = re.compile(r"^at\s+(.+)$", re.I)
+BULLET_PREFIX = re.compile(r"^\s*(?:[-*•●▪◦‣]|\d+[.)])\s+")
+MAX_HEADING_WORDS = 8
+MAX_TITLE_CASE_WORDS = 5
+MINOR_WORDS = {"a", "an", "and", "as", "at", "for", "in", "of", "on", "or", "the", "to", "with", "&", "/", "-"}
+
+# Without these the local result is never used (see clean_posting_locally).
+REQUIRED_FIELDS = ("title", "company")
+# Each found field contributes its weight to the confidence score.
+CONFIDENCE_WEIGHTS = {
+    "title": 0.15,
+    "company": 0.15,
+    "location": 0.1,
+    "responsibilities": 0.3,
+    "qualifications": 0.3,
+}
+
+
+@dataclass
+class ParsedPosting:
+    title: str = ""
+    company: str = ""
+    locations: List[str] = field(default_factory=list)
+    salary: str = ""
+    overview: List[str] = field(default_factory=list)
+    responsibilities: List[str] = field(default_factory=list)
+    qualifications: List[str] = field(default_factory=list)
+    compensation: List[str] = field(default_factory=list)
+    additional_skills: List[str] = field(default_factory=list)   # only the LLM adds these two
+    everything_else: List[str] = field(default_factory=list)
+    source: str = "headings"
+
+    @property
+    def confidence(self) -> float:
+        found = {
+            "title": bool(self.title),
+            "company": bool(self.company),
+            "location": bool(self.locations),
+            "responsibilities": bool(self.responsibilities),
+            "qualifications": bool(self.qualifications),
+        }
+        return round(sum(weight for key, weight in CONFIDENCE_WEIGHTS.items() if found[key]), 2)
+
+    def to_text(self) -> str:
+        """Render in the same section layout clean_job_posting_text produces."""
+        lines = [
+            f"**Title:** {self.title or 'Not specified'}  ",
+            f"**Company:** {self.company or 'Not specified'}  ",
+            f"**Location(s):** {' | '.join(self.locations) or 'Not specified'}  ",
+            f"**Salary Range:** {self.salary or 'Not specified'}  ",
+        ]
+        sections = [
+            ("Role Overview", self.overview, False),
+            ("Key Responsibilities", self.responsibilities, True),
+            ("Qualifications", self.qualifications, True),
+            ("Compensation & Benefits", self.compensation, False),
+            ("Additional Skills", self.additional_skills, True),
+            ("Everything Else", self.everything_else, False),
+        ]
+        for heading, items, bulleted in sections:
+            if not items:
+                continue
+            lines += ["", f"### {heading}"]
+            lines += [f"- {item}" if bulleted else item for item in items]
+        return "\n".join(lines) + "\n"
+
+
+def find_job_posting_ld(json_ld_blocks: List[str]) -> Optional[Dict]:
+    """Return the first schema.org JobPosting object in a list of raw JSON-LD blocks."""
+    for block in json_ld_blocks or []:
+        try:
+            data = json.loads(block)
+        except (TypeError, ValueError):
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                types = item.get("@type")
+                types = types if isinstance(types, list) else [types]
+                if "JobPosting" in types:
+                    return item
+                if "@graph" in item:
+                    stack.append(item["@graph"])
+    return None
+
+
+def _ld_locations(posting: Dict) -> List[str]:
+    locations = []
+    places = posting.get("jobLocation") or []
+    for place in places if isinstance(places, list) else [places]:
+        address = place.get("address", {}) if isinstance(place, dict) else {}
+        if isinstance(address, str):
+            locations.append(address)
+            continue
+        parts = [address.get("addressLocality"), address.get("addressRegion")]
+        country = address.get("addressCountry")
+        if isinstance(country, dict):
+            country = country.get("name")
+        if country and not any(parts):
+            parts.append(country)
+        label = ", ".join(part for part in parts if part)
+        if label:
+            locations.append(label)
+    if str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        locations.append("Remote")
+    return locations
+
+
+def _ld_salary(posting: Dict) -> str:
+    salary = posting.get("baseSalary")
+    if not isinstance(salary, dict):
+        return ""
+    currency = salary.get("currency", "")
+    value = salary.get("value", {})
+    if not isinstance(value, dict):
+        return f"{value} {currency}".strip()
+
+    def money(amount):
+        return f"${amount:,.0f}" if currency in ("USD", "") and isinstance(amount, (int, float)) else f"{amount}"
+
+    unit = value.get("unitText", "")
+    period = {"YEAR": " per year", "HOUR": " per hour", "MONTH": " per month"}.get(str(unit).upper(), "")
+    if value.get("minValue") is not None and value.get("maxValue") is not None:
+        text = f"{money(value['minValue'])} - {money(value['maxValue'])}"
+    elif value.get("value") is not None:
+        text = money(value["value"])
+    else:
+        return ""
+    return f"{text} {currency}{period}".replace("  ", " ").strip()
+
+
+def _title_case(text: str) -> bool:
+    words = [word for word in text.split() if word.lower() not in MINOR_WORDS]
+    return bool(words) and all(word[0].isupper() or not word[0].isalpha() for word in words)
+
+
+def _heading_section(line: str) -> Optional[str]:
+    """
+    The section a heading line starts, or None for content. A heading has to look like
+    one: marked up (#, **bold**), ending in ':', mostly the keyword itself, or a short
+    Title Case line, so "Strong SQL skills" or "Preferred: Kubernetes" stay content.
+    """
+    line = line.strip()
+    stripped = line.strip("*#:").strip()
+    if not stripped or len(stripped) > 60 or stripped.endswith((".", ",", ";")) or ":" in stripped:
+        return None
+    words = stripped.split()
+    if len(words) > MAX_HEADING_WORDS:
+        return None
+    marked = line.startswith("#") or (line.startswith("**") and line.rstrip(":").endswith("**")) or line.endswith(":")
+    for name, pattern in SECTION_PATTERNS:
+        matches = list(pattern.finditer(stripped))
+        if not matches:
+            continue
+        keyword_chars = sum(match.end() - match.start() for match in matches)
+        if (marked or keyword_chars * 2 >= len(stripped)
+                or (len(words) <= MAX_TITLE_CASE_WORDS and _title_case(stripped))):
+            return name
+        return None
+    return None
+
+
+def parse_sections(text: str, posting: ParsedPosting):
+    """Split plain posting text into sections by recognising common headings."""
+    current = None
+    header_lines = []
+    for raw_line in text.splitlines():
+        line = BULLET_PREFIX.sub("", raw_line).strip()
+        if not line:
+            continue
+        # Bulleted lines are always content, whatever keywords they contain.
+        section = None if BULLET_PREFIX.match(raw_line) else _heading_section(line)
+        if section:
+            current = section
+            continue
+        if current is None:
+            header_lines.append(line)
+        else:
+            getattr(posting, current).append(line)
+
+    # Lines before the first heading: title, "at Company", locations; everything else opens the overview.
+    overview = []
+    for line in header_lines:
+        company = COMPANY_PATTERN.match(line)
+        if company and not posting.company:
+            posting.company = company.group(1).strip()
+        elif not posting.title and len(line) < 80:
+            posting.title = line
+        elif line == posting.title:
+            continue
+        elif len(line) < 80 and LOCATION_PATTERN.match(line):
+            if line not in posting.locations:
+                posting.locations.append(line)
+        else:
+            overview.append(line)
+    posting.overview[:0] = overview
+
+
+def parse_posting(text: str, job_posting_ld: Dict = None) -> ParsedPosting:
+    """Parse a posting from its text and, when available, its JSON-LD JobPosting object."""
+    posting = ParsedPosting()
+    body_text = text or ""
+    if job_posting_ld:
+        from html_extract import html_to_text
+
+        posting.source = "json-ld"
+        posting.title = str(job_posting_ld.get("title", "")).strip()
+        organization = job_posting_ld.get("hiringOrganization")
+        if isinstance(organization, dict):
+            posting.company = str(organization.get("name", "")).strip()
+        elif isinstance(organization, str):
+            posting.company = organization.strip()
+        posting.locations = _ld_locations(job_posting_ld)
+        posting.salary = _ld_salary(job_posting_ld)
+        description = job_posting_ld.get("description")
+        if description:
+            body_text = html_to_text(description)
+
+    parse_sections(body_text, posting)
+    if not posting.salary:
+        match = SALARY_PATTERN.search(text or "")
+        if match:
+            posting.salary = match.group(0).strip()
+    return posting
+
+
+def clean_posting_locally(text: str, job_posting_ld: Dict = None,
+                          min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> Optional[ParsedPosting]:
+    """Return the parsed posting if it has the REQUIRED_FIELDS and meets min_confidence, else None (use the LLM)."""
+    posting = parse_posting(text, job_posting_ld)
+    if not all(getattr(posting, name) for name in REQUIRED_FIELDS):
+        return None
+    return posting if posting.confidence >= min_confidence else None
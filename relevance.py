@@ -0,0 +1,218 @@
+"""
+Local BM25 relevance scoring of baseline resume bullets against job postings.
+
+Every responsibilities / achievements / technologies entry of the baseline is a
+"document"; a cleaned job posting is the query. BaselineIndex builds the BM25
+term-weight matrix for a baseline once (NumPy, CPU only) and keeps it in memory and
+under cache/relevance/, keyed by the baseline's content hash, so a batch run of
+any size vectorises the baseline a single time. Scoring is one sparse-ish matrix
+product: rank_many() scores every posting against every bullet at once.
+
+focus_resume() keeps the top-k entries of each of those fields per job (in their
+original order), so tailoring only sees the bullets that matter for the posting.
+
+    python relevance.py resumes/baseline posting.txt --top-k 3
+"""
+import functools
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from compact_storage import clone, content_hash
+from llm_cache import CACHE_DIR
+
+RANKED_FIELDS = ["responsibilities", "achievements", "technologies"]
+RELEVANCE_CACHE_DIR = os.path.join(CACHE_DIR, "relevance")
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do for from has have in into is it its of on or our that the their
+them they this to was we were will with within without you your who what when where which while also
+all any each more most other such than then there these those through up via etc
+""".split())
+
+Unit = Tuple[int, str, int]  # (work_experience index, field, item index)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words, keeping tech names like c++, c# and node.js intact; stopwords dropped."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Relevance scoring needs NumPy; install it with 'pip install numpy'.")
+    return numpy
+
+
+def baseline_units(baseline: Dict) -> Tuple[List[Unit], List[str]]:
+    """Every rankable entry in the baseline, with its text."""
+    units, texts = [], []
+    resume = baseline.get("resume", baseline)
+    for job_index, job in enumerate(resume.get("work_experience", [])):
+        for field in RANKED_FIELDS:
+            for item_index, item in enumerate(job.get(field) or []):
+                units.append((job_index, field, item_index))
+                texts.append(str(item))
+    return units, texts
+
+
+class BaselineIndex:
+    """BM25 weights of one baseline's bullets: weights[i, j] is bullet i's weight for vocabulary term j."""
+
+    def __init__(self, units: List[Unit], vocabulary: Dict[str, int], weights):
+        self.units = units
+        self.vocabulary = vocabulary
+        self.weights = weights
+
+    @classmethod
+    def build(cls, baseline: Dict) -> "BaselineIndex":
+        np = _numpy()
+        units, texts = baseline_units(baseline)
+        tokenized = [tokenize(text) for text in texts]
+        vocabulary = {}
+        for tokens in tokenized:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+        tf = np.zeros((len(units), len(vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(tokenized):
+            for token, count in Counter(tokens).items():
+                tf[row, vocabulary[token]] = count
+        lengths = tf.sum(axis=1, keepdims=True)
+        average = float(lengths.mean()) if len(units) else 1.0
+        df = (tf > 0).sum(axis=0)
+        idf = np.log(1.0 + (len(units) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / max(average, 1e-9))
+        weights = idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        return cls(units, vocabulary, weights.astype(np.float32))
+
+    def query_matrix(self, postings: List[str]):
+        """One row per posting; each term the baseline knows is weighted by 1 + log(count)."""
+        np = _numpy()
+        matrix = np.zeros((len(postings), len(self.vocabulary)), dtype=np.float32)
+        for row, posting in enumerate(postings):
+            for token, count in Counter(tokenize(posting or "")).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    matrix[row, column] = 1.0 + math.log(count)
+        return matrix
+
+    def rank_many(self, postings: List[str]):
+        """Scores of every bullet for every posting, shape (postings, bullets)."""
+        if not self.units or not postings:
+            np = _numpy()
+            return np.zeros((len(postings), len(self.units)), dtype=np.float32)
+        return self.query_matrix(postings) @ self.weights.T
+
+    def save(self, path: str):
+        np = _numpy()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp.npz"
+        np.savez(temp_path, weights=self.weights,
+                 meta=np.array(json.dumps({"units": self.units, "vocabulary": self.vocabulary})))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BaselineIndex":
+        np = _numpy()
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls([tuple(unit) for unit in meta["units"]], meta["vocabulary"], data["weights"])
+
+
+@functools.lru_cache(maxsize=16)
+def _index_for_hash(baseline_hash: str, baseline_json: str) -> BaselineIndex:
+    path = os.path.join(RELEVANCE_CACHE_DIR, f"{baseline_hash}.npz")
+    try:
+        return BaselineIndex.load(path)
+    except (OSError, ValueError, KeyError):
+        pass
+    index = BaselineIndex.build(json.loads(baseline_json))
+    try:
+        index.save(path)
+    except OSError:
+        pass  # the disk copy only saves rebuilding in the next process
+    return index
+
+
+def index_for(baseline: Dict) -> BaselineIndex:
+    """The BaselineIndex for this baseline, built at most once per process (and reused across runs)."""
+    return _index_for_hash(content_hash(baseline), json.dumps(baseline, sort_keys=True))
+
+
+def _focus(baseline: Dict, index: BaselineIndex, scores, top_k: int) -> Dict:
+    keep = {}
+    for (job_index, field, item_index), score in zip(index.units, scores.tolist()):
+        keep.setdefault((job_index, field), []).append((score, item_index))
+    focused = clone(baseline)
+    resume = focused.get("resume", focused)
+    for (job_index, field), ranked in keep.items():
+        if len(ranked) <= top_k:
+            continue
+        best = sorted(ranked, key=lambda pair: (-pair[0], pair[1]))[:top_k]
+        kept = sorted(item_index for _, item_index in best)
+        items = resume["work_experience"][job_index][field]
+        resume["work_experience"][job_index][field] = [items[i] for i in kept]
+    return focused
+
+
+def focus_many(baseline: Dict, postings: List[str], top_k: int) -> List[Dict]:
+    """focus_resume() for many postings, scored in a single matrix product."""
+    index = index_for(baseline)
+    scores = index.rank_many(postings)
+    return [_focus(baseline, index, row, top_k) for row in scores]
+
+
+def focus_resume(baseline: Dict, posting: str, top_k: int) -> Dict:
+    """
+    A copy of the baseline keeping only the top_k most relevant responsibilities,
+    achievements and technologies of each job for this posting.
+    """
+    return focus_many(baseline, [posting], top_k)[0]
+
+
+def ranked_bullets(baseline: Dict, posting: str) -> List[Tuple[float, Unit, str]]:
+    """Every rankable entry with its score, best first."""
+    index = index_for(baseline)
+    _, texts = baseline_units(baseline)
+    scores = index.rank_many([posting])[0].tolist()
+    return sorted(zip(scores, index.units, texts), key=lambda entry: -entry[0])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from rich.console import Console
+    from rich.table import Table
+
+    from storage import read_document
+
+    parser = argparse.ArgumentParser(description="Rank baseline resume bullets against a job posting.")
+    parser.add_argument("baseline_dir", help="Resume directory holding resume.json, e.g. resumes/baseline.")
+    parser.add_argument("posting", help="Text file with the (cleaned) job posting.")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    baseline = read_document(args.baseline_dir, "resume.json")
+    with open(args.posting, "r", encoding="utf-8", errors="replace") as f:
+        posting = f.read()
+    table = Table(title=f"Bullet relevance (top {args.top_k} per field are kept)")
+    for column in ("Score", "Job", "Field", "Entry"):
+        table.add_column(column)
+    kept = set()
+    by_field = {}
+    for score, unit, text in ranked_bullets(baseline, posting):
+        bucket = by_field.setdefault(unit[:2], [])
+        if len(bucket) < args.top_k:
+            bucket.append(unit)
+            kept.add(unit)
+    for score, unit, text in ranked_bullets(baseline, posting):
+        style = "green" if unit in kept else "dim"
+        table.add_row(f"{score:.2f}", str(unit[0]), unit[1], text, style=style)
+    Console().print(table)
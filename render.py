@@ -0,0 +1,335 @@
+"""
+Render tailored resumes and cover letters to HTML, Markdown, DOCX and PDF.
+
+HTML and Markdown come from the Jinja2 templates in templates/. The Environment is
+built once per process with auto_reload off, so each template is compiled once,
+and compiled bytecode is kept under cache/templates/ for the next process. DOCX and
+PDF are built from the same resume/cover-letter dicts with python-docx and fpdf2.
+
+Output goes to resumes/<name>/rendered/ next to a manifest recording the hash of
+the source document and templates each file was rendered from; unchanged
+documents are skipped. render_tree() fans a whole resumes/ tree out over a
+process pool.
+
+    python render.py                              # every resume, every format
+    python render.py anthropic --formats pdf,docx
+    python render.py --workers 8 --force
+
+Optional dependencies: pip install jinja2 python-docx fpdf2
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from compact_storage import content_hash
+from llm_cache import CACHE_DIR
+from storage import FSYNC, ResumeStore, atomic_write_bytes, find_document, read_document
+
+FORMATS = ["html", "md", "docx", "pdf"]
+RENDER_VERSION = 1  # bump when the DOCX/PDF layout code changes
+RENDERED_DIRNAME = "rendered"
+MANIFEST_FILENAME = "manifest.json"
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_CACHE_DIR = os.path.join(CACHE_DIR, "templates")
+DOCUMENTS = {"resume": "resume.json", "cover_letter": "cover_letter.json"}
+WORK_SECTIONS = [
+    ("Responsibilities", "responsibilities"),
+    ("Achievements", "achievements"),
+    ("Programs Managed", "programs_managed"),
+    ("Technologies", "technologies"),
+]
+
+Block = Tuple[str, object]
+
+
+@functools.lru_cache(maxsize=1)
+def template_environment():
+    try:
+        import jinja2
+    except ImportError:
+        raise ImportError("HTML and Markdown rendering need Jinja2; install it with 'pip install jinja2'.")
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        autoescape=jinja2.select_autoescape(["html.j2"]),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+        auto_reload=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def templates_fingerprint() -> str:
+    """Hash of the templates and renderer version; a change re-renders everything."""
+    digest = hashlib.sha256(str(RENDER_VERSION).encode())
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def render_template(kind: str, data: Dict, fmt: str) -> str:
+    template = template_environment().get_template(f"{kind}.{fmt}.j2")
+    if kind == "resume":
+        return template.render(doc=data, sections=WORK_SECTIONS)
+    return template.render(letter=data)
+
+
+def _dates(entry: Dict) -> str:
+    dates = " - ".join(part for part in (entry.get("start_date"), entry.get("end_date")) if part)
+    return " | ".join(part for part in (entry.get("location"), dates) if part)
+
+
+def resume_blocks(doc: Dict) -> List[Block]:
+    """Flatten a resume document into (kind, content) blocks for the DOCX and PDF writers."""
+    resume = doc.get("resume", doc)
+    personal = resume.get("personal_info", {})
+    profiles = resume.get("online_profiles", {})
+    target = resume.get("job_target", {})
+    blocks = [("title", personal.get("name", "")),
+              ("muted", " · ".join(part for part in (personal.get("email"), personal.get("phone"),
+                                                      profiles.get("github"), profiles.get("hugging_face")) if part))]
+    if target.get("position_title"):
+        line = target["position_title"] + (f" at {target['company']}" if target.get("company") else "")
+        blocks.append(("muted", f"Target: {line}"))
+    if personal.get("summary"):
+        blocks += [("heading", "Summary"), ("paragraph", personal["summary"])]
+    if resume.get("work_experience"):
+        blocks.append(("heading", "Experience"))
+        for job in resume["work_experience"]:
+            blocks.append(("subheading", ", ".join(part for part in (job.get("job_title"), job.get("company")) if part)))
+            blocks.append(("muted", _dates(job)))
+            for label, key in WORK_SECTIONS:
+                if job.get(key):
+                    blocks += [("label", label), ("bullets", job[key])]
+    if resume.get("education"):
+        blocks.append(("heading", "Education"))
+        for school in resume["education"]:
+            blocks.append(("subheading", ", ".join(part for part in (school.get("degree"), school.get("institution"))
+                                                   if part)))
+            blocks.append(("muted", _dates(school)))
+            if school.get("details"):
+                blocks.append(("paragraph", school["details"]))
+    if resume.get("certifications"):
+        blocks.append(("heading", "Certifications"))
+        blocks.append(("bullets", [
+            ": ".join(part for part in (cert.get("name"), cert.get("specialization")) if part)
+            + (f", {cert['awarded_by']}" if cert.get("awarded_by") else "")
+            + (f" ({cert['year']})" if cert.get("year") else "")
+            for cert in resume["certifications"]]))
+    if resume.get("leadership_skills"):
+        blocks += [("heading", "Leadership"), ("bullets", resume["leadership_skills"])]
+    if resume.get("tools"):
+        blocks += [("heading", "Tools"), ("paragraph", ", ".join(resume["tools"]))]
+    return [block for block in blocks if block[1]]
+
+
+def cover_letter_blocks(letter: Dict) -> List[Block]:
+    header = letter.get("Header", {})
+    blocks = [("plain", header.get(key, "")) for key in ("Name", "Email", "Phone", "Date")]
+    blocks += [("spacer", " "), ("paragraph", letter.get("Salutation", ""))]
+    blocks += [("letter", text) for text in letter.get("Body", {}).values()]
+    blocks += [("spacer", " ")] + [("plain", line) for line in letter.get("Closing", "").splitlines()]
+    return [block for block in blocks if block[1]]
+
+
+def blocks_to_docx(blocks: List[Block]) -> bytes:
+    try:
+        import docx
+    except ImportError:
+        raise ImportError("DOCX rendering needs python-docx; install it with 'pip install python-docx'.")
+    document = docx.Document()
+    # Paragraph.style= looks the style up (and the default style) on every call, which dominates
+    # render time on long resumes; resolve the id once and set it on the paragraph XML directly.
+    bullet_style_id = document.styles["List Bullet"].style_id
+    for kind, content in blocks:
+        if kind == "title":
+            document.add_heading(content, level=0)
+        elif kind == "heading":
+            document.add_heading(content, level=1)
+        elif kind == "subheading":
+            document.add_heading(content, level=2)
+        elif kind == "bullets":
+            for item in content:
+                document.add_paragraph(item)._p.style = bullet_style_id
+        elif kind == "label":
+            document.add_paragraph().add_run(content).italic = True
+        elif kind == "plain":
+            document.add_paragraph(content).paragraph_format.space_after = 0
+        else:
+            document.add_paragraph(content)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+PDF_REPLACEMENTS = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-",
+                                  "—": "--", "•": "-", "·": "|", "…": "..."})
+
+
+def _pdf_text(text: str) -> str:
+    """The built-in PDF fonts only cover Latin-1."""
+    text = unicodedata.normalize("NFKC", str(text)).translate(PDF_REPLACEMENTS)
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def blocks_to_pdf(blocks: List[Block]) -> bytes:
+    try:
+        from fpdf import FPDF
+    except ImportError:
+        raise ImportError("PDF rendering needs fpdf2; install it with 'pip install fpdf2'.")
+    styles = {  # kind: (font style, size, line height, space before)
+        "title": ("B", 20, 9, 0), "heading": ("B", 12, 6, 4), "subheading": ("B", 11, 5.5, 2),
+        "label": ("I", 10, 5, 1), "muted": ("", 9, 4.5, 0), "paragraph": ("", 10, 5, 1),
+        "plain": ("", 10, 5, 0), "spacer": ("", 10, 5, 0), "bullets": ("", 10, 5, 0), "letter": ("", 10.5, 5.5, 3),
+    }
+    pdf = FPDF(format="Letter")
+    pdf.set_margins(18, 16, 18)
+    pdf.set_auto_page_break(True, margin=16)
+    pdf.add_page()
+    for kind, content in blocks:
+        style, size, height, before = styles.get(kind, styles["paragraph"])
+        pdf.set_font("Helvetica", style, size)
+        pdf.set_text_color(100, 100, 100) if kind == "muted" else pdf.set_text_color(0, 0, 0)
+        if before:
+            pdf.ln(before)
+        if kind == "bullets":
+            for item in content:
+                pdf.set_x(pdf.l_margin + 4)
+                pdf.multi_cell(pdf.epw - 4, height, _pdf_text(f"- {item}"), new_x="LMARGIN", new_y="NEXT")
+            continue
+        pdf.multi_cell(0, height, _pdf_text(content), new_x="LMARGIN", new_y="NEXT")
+        if kind == "heading":
+            pdf.set_draw_color(150, 150, 150)
+            pdf.line(pdf.l_margin, pdf.get_y(), pdf.w - pdf.r_margin, pdf.get_y())
+            pdf.ln(1)
+    return bytes(pdf.output())
+
+
+def render_document(kind: str, data: Dict, fmt: str) -> bytes:
+    """Render one resume or cover letter dict to the bytes of a file in the given format."""
+    if fmt in ("html", "md"):
+        return render_template(kind, data, fmt).encode("utf-8")
+    blocks = resume_blocks(data) if kind == "resume" else cover_letter_blocks(data)
+    if fmt == "docx":
+        return blocks_to_docx(blocks)
+    if fmt == "pdf":
+        return blocks_to_pdf(blocks)
+    raise ValueError(f"Unknown format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+
+
+def _read_manifest(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_resume(resumes_dir: str, name: str, formats: List[str] = None, force: bool = False) -> Dict:
+    """
+    Render resumes/<name>/resume.json (and cover_letter.json if present) in every
+    format whose output is missing or out of date. Returns a summary dict.
+    """
+    formats = formats or FORMATS
+    summary = {"name": name, "rendered": [], "skipped": [], "error": None}
+    store = ResumeStore(resumes_dir)
+    try:
+        with store.lock(name) as dir_path:
+            out_dir = os.path.join(dir_path, RENDERED_DIRNAME)
+            manifest_path = os.path.join(out_dir, MANIFEST_FILENAME)
+            manifest = _read_manifest(manifest_path)
+            templates = templates_fingerprint()
+            changed = False
+            for kind, filename in DOCUMENTS.items():
+                if find_document(dir_path, filename) is None:
+                    continue
+                data = read_document(dir_path, filename)
+                source = content_hash(data)
+                for fmt in formats:
+                    output = f"{kind}.{fmt}"
+                    entry = {"source": source, "templates": templates}
+                    if (not force and manifest.get(output) == entry
+                            and os.path.exists(os.path.join(out_dir, output))):
+                        summary["skipped"].append(output)
+                        continue
+                    content = render_document(kind, data, fmt)
+                    os.makedirs(out_dir, exist_ok=True)
+                    atomic_write_bytes(os.path.join(out_dir, output), content, sync=FSYNC)
+                    manifest[output] = entry
+                    summary["rendered"].append(output)
+                    changed = True
+            if changed:
+                atomic_write_bytes(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"), sync=FSYNC)
+    except Exception as e:
+        summary["error"] = str(e)
+    return summary
+
+
+def resume_names(resumes_dir: str) -> List[str]:
+    """Resume directories that have a resume.json (or its packed form)."""
+    if not os.path.isdir(resumes_dir):
+        return []
+    return sorted(name for name in os.listdir(resumes_dir)
+                  if not name.startswith(".") and find_document(os.path.join(resumes_dir, name), "resume.json"))
+
+
+def _warm_worker():
+    """Compile the templates once per worker process instead of once per resume."""
+    try:
+        for name in os.listdir(TEMPLATE_DIR):
+            template_environment().get_template(name)
+    except ImportError:
+        pass  # reported per resume if an HTML/Markdown format was requested
+
+
+def render_tree(resumes_dir: str, names: Optional[List[str]] = None, formats: List[str] = None,
+                workers: int = None, force: bool = False) -> List[Dict]:
+    """Render many resume directories, in parallel worker processes when there is more than one."""
+    names = resume_names(resumes_dir) if names is None else names
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    if workers <= 1 or len(names) <= 1:
+        return [render_resume(resumes_dir, name, formats, force) for name in names]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        futures = [pool.submit(render_resume, resumes_dir, name, formats, force) for name in names]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render resumes and cover letters to documents.")
+    parser.add_argument("names", nargs="*", help="Resume names under resumes/ (default: all of them).")
+    parser.add_argument("--resumes-dir", default="resumes")
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"Comma-separated subset of {','.join(FORMATS)}.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--force", action="store_true", help="Re-render even if the source is unchanged.")
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise SystemExit(f"Unknown format(s): {', '.join(unknown)}. Choose from: {', '.join(FORMATS)}")
+
+    from rich.console import Console
+
+    console = Console()
+    results = render_tree(args.resumes_dir, args.names or None, formats, args.workers, args.force)
+    for result in results:
+        if result["error"]:
+            console.print(f"[red]{result['name']}: {result['error']}[/red]")
+        else:
+            console.print(f"[green]{result['name']}[/green]: rendered {len(result['rendered'])}, "
+                          f"up to date {len(result['skipped'])}")
+    console.print(f"[bold]{sum(len(r['rendered']) for r in results)} files rendered, "
+                  f"{sum(len(r['skipped']) for r in results)} unchanged, "
+                  f"{sum(1 for r in results if r['error'])} errors.[/bold]")
+
+
+if __name__ == "__main__":
+    main()
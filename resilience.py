@@ -0,0 +1,272 @@
+"""
+Retries, rate limiting and a circuit breaker for OpenAI calls.
+
+llm.chat_completion sends every request through default_resilience.call(), so the
+menu, batch.py and anything else built on it share one set of limits:
+
+  - rate limits: token buckets for requests/min (RESUME_OPENAI_RPM) and
+    tokens/min (RESUME_OPENAI_TPM); unset means unlimited
+  - retries: 429, 408, 409, 5xx, timeouts and dropped connections are retried up to
+    RESUME_OPENAI_MAX_RETRIES times (default 5) with full-jitter exponential backoff,
+    waiting at least as long as the server's Retry-After header asks
+  - circuit breaker: after RESUME_OPENAI_BREAKER_THRESHOLD (default 5) server errors
+    or timeouts in a row, calls fail fast for RESUME_OPENAI_BREAKER_RESET seconds
+    (default 30) and then a single trial call decides whether to close it again
+
+The OpenAI client is created with max_retries=0 so these are the only retries and
+every one of them shows up in the metrics.
+"""
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+import tracing
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `per_minute` units per minute, up to `burst` at once."""
+
+    def __init__(self, per_minute: float, burst: float = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """Block until `amount` units are available (capped at the burst size); returns seconds waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `reset_seconds`."""
+
+    def __init__(self, threshold: int = 5, reset_seconds: float = 30.0):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+            if remaining > 0 or self.trial_running:
+                raise CircuitOpenError(f"OpenAI circuit breaker is open after {self.failures} consecutive "
+                                       f"failures; retrying in {max(remaining, 0):.0f}s.")
+            self.trial_running = True  # half-open: let exactly one call through
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this one opened the breaker."""
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.trial_running = False
+                return True
+            return False
+
+    def release_trial(self):
+        """The trial call ended without telling us anything about the server (e.g. a 400)."""
+        with self.lock:
+            self.trial_running = False
+
+
+@dataclass
+class ResilienceMetrics:
+    calls: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    rate_limited: int = 0       # 429 responses
+    server_errors: int = 0      # 5xx responses
+    timeouts: int = 0           # timeouts and dropped connections
+    circuit_opens: int = 0
+    circuit_rejections: int = 0
+    backoff_seconds: float = 0.0
+    throttle_seconds: float = 0.0  # time spent waiting on the local rate limits
+
+
+def status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_timeout(error: Exception) -> bool:
+    """Timeouts and connection failures, from openai, httpx or the standard library."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & {"APITimeoutError", "APIConnectionError", "TimeoutException", "ConnectError",
+                         "ReadError", "RemoteProtocolError"})
+
+
+def is_retryable(error: Exception) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS or code >= 500
+    return is_timeout(error)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (retry-after-ms or Retry-After, seconds or HTTP date)."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    import email.utils  # HTTP-date form only; rare enough to keep off the import path
+
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientCaller:
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 requests_per_minute: float = None, tokens_per_minute: float = None,
+                 breaker: CircuitBreaker = None, sleep: Callable[[float], None] = time.sleep):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.metrics = ResilienceMetrics()
+        self.lock = threading.Lock()
+        self.set_limits(requests_per_minute, tokens_per_minute)
+
+    def set_limits(self, requests_per_minute: float = None, tokens_per_minute: float = None):
+        """(Re)configure the shared limits; the token bucket allows a full minute's budget as a burst."""
+        self.request_limiter = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_limiter = TokenBucket(tokens_per_minute, burst=tokens_per_minute) if tokens_per_minute else None
+
+    def _count(self, **increments):
+        with self.lock:
+            for name, amount in increments.items():
+                setattr(self.metrics, name, getattr(self.metrics, name) + amount)
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential delay, but never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        requested = retry_after(error)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay * 2))
+        return delay
+
+    def call(self, func: Callable[[], object], tokens: int = 0, can_retry: Callable[[], bool] = None):
+        """
+        Run func() under the rate limits, retrying transient failures.
+        tokens is the request's expected size for the tokens/min bucket. can_retry, if
+        given, is asked before each retry (streaming calls refuse once output was shown).
+        """
+        self._count(calls=1)
+        attempt = 0
+        while True:
+            if self.request_limiter:
+                self._count(throttle_seconds=self.request_limiter.acquire())
+            if self.token_limiter and tokens:
+                self._count(throttle_seconds=self.token_limiter.acquire(tokens))
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count(circuit_rejections=1, failed=1)
+                raise
+            try:
+                result = func()
+            except Exception as e:
+                code = status_code(e)
+                if code == 429:
+                    self._count(rate_limited=1)
+                elif code is not None and code >= 500:
+                    self._count(server_errors=1)
+                elif code is None and is_timeout(e):
+                    self._count(timeouts=1)
+                # 429s are back-pressure, not an outage, so only 5xx and timeouts trip the breaker.
+                if code != 429 and is_retryable(e):
+                    if self.breaker.record_failure():
+                        self._count(circuit_opens=1)
+                else:
+                    self.breaker.release_trial()
+                if (not is_retryable(e) or attempt >= self.max_retries
+                        or (can_retry is not None and not can_retry())):
+                    self._count(failed=1)
+                    raise
+                delay = self.backoff(attempt, e)
+                self._count(retries=1, backoff_seconds=delay)
+                tracing.add("retries")
+                attempt += 1
+                self.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._count(succeeded=1)
+            return result
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return dict(asdict(self.metrics), circuit=self.breaker.state)
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+default_resilience = ResilientCaller(
+    max_retries=int(os.getenv("RESUME_OPENAI_MAX_RETRIES", "5")),
+    requests_per_minute=_env_float("RESUME_OPENAI_RPM"),
+    tokens_per_minute=_env_float("RESUME_OPENAI_TPM"),
+    breaker=CircuitBreaker(threshold=int(os.getenv("RESUME_OPENAI_BREAKER_THRESHOLD", "5")),
+                           reset_seconds=float(os.getenv("RESUME_OPENAI_BREAKER_RESET", "30"))),
+)
@@ -0,0 +1,150 @@
+"""
+Persistent metadata index over the resumes/ directory.
+
+Listing resumes only needs each entry's name, status and last_modified, so those
+are kept in a small SQLite table instead of re-reading every resume.json. The index
+is reconciled against the directory once per process (re-parsing only entries
+whose resume.json changed on disk) and then kept current by the code that writes
+resumes, so full documents are only loaded when one is actually selected.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from storage import find_document, read_document
+
+INDEX_FILENAME = ".index.sqlite3"
+SCHEMA_VERSION = 1
+
+TRACKED_FILES = {
+    "resume": "resume.json",
+    "job_posting": "job_posting_ai.txt",
+    "cover_letter": "cover_letter.json",
+}
+
+
+class ResumeIndex:
+    def __init__(self, resumes_dir: str):
+        self.resumes_dir = resumes_dir
+        self.path = os.path.join(resumes_dir, INDEX_FILENAME)
+        self._conn = None
+        self._lock = threading.RLock()
+        self._reconciled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.resumes_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS resumes")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS resumes (
+                    name TEXT PRIMARY KEY,
+                    status TEXT,
+                    last_modified TEXT,
+                    has_job_posting INTEGER NOT NULL DEFAULT 0,
+                    has_cover_letter INTEGER NOT NULL DEFAULT 0,
+                    resume_mtime_ns INTEGER,
+                    resume_size INTEGER,
+                    error TEXT
+                )"""
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _stat(path: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    def _scan_entry(self, name: str, previous: Optional[tuple] = None) -> Optional[tuple]:
+        """Build an index row for resumes/<name>, re-parsing resume.json only if it changed."""
+        dir_path = os.path.join(self.resumes_dir, name)
+        resume_path = find_document(dir_path, TRACKED_FILES["resume"])
+        resume_stat = self._stat(resume_path) if resume_path else None
+        if resume_stat is None:
+            return None
+        has_job_posting = int(find_document(dir_path, TRACKED_FILES["job_posting"]) is not None)
+        has_cover_letter = int(find_document(dir_path, TRACKED_FILES["cover_letter"]) is not None)
+
+        if previous and previous[5] == resume_stat.st_mtime_ns and previous[6] == resume_stat.st_size:
+            status, last_modified, error = previous[1], previous[2], previous[7]
+        else:
+            try:
+                data = read_document(dir_path, TRACKED_FILES["resume"])
+                status = data.get("status", "unknown")
+                last_modified = data.get("last_modified", "N/A")
+                error = None
+            except Exception as e:
+                status, last_modified, error = None, None, str(e)
+        return (name, status, last_modified, has_job_posting, has_cover_letter,
+                resume_stat.st_mtime_ns, resume_stat.st_size, error)
+
+    def _store(self, conn: sqlite3.Connection, row: tuple):
+        conn.execute("INSERT OR REPLACE INTO resumes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def reconcile(self):
+        """Bring the index in line with the directory: add, refresh and drop entries."""
+        with self._lock:
+            conn = self._connect()
+            existing = {row[0]: row for row in conn.execute("SELECT * FROM resumes")}
+            seen = set()
+            if os.path.isdir(self.resumes_dir):
+                for entry in os.scandir(self.resumes_dir):
+                    if entry.name.startswith(".") or not entry.is_dir():
+                        continue
+                    row = self._scan_entry(entry.name, existing.get(entry.name))
+                    if row is None:
+                        continue
+                    seen.add(entry.name)
+                    if row != existing.get(entry.name):
+                        self._store(conn, row)
+            for name in existing.keys() - seen:
+                conn.execute("DELETE FROM resumes WHERE name = ?", (name,))
+            conn.commit()
+            self._reconciled = True
+
+    def update(self, name: str):
+        """Re-index a single resume directory after it was written."""
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute("SELECT * FROM resumes WHERE name = ?", (name,)).fetchone()
+            row = self._scan_entry(name, previous)
+            if row is None:
+                conn.execute("DELETE FROM resumes WHERE name = ?", (name,))
+            else:
+                self._store(conn, row)
+            conn.commit()
+
+    def list(self, status: str = None, has_job_posting: bool = None) -> Dict[str, Dict]:
+        """Return {name: metadata} for indexed resumes, optionally filtered."""
+        with self._lock:
+            if not self._reconciled:
+                self.reconcile()
+            query = "SELECT name, status, last_modified, has_job_posting, has_cover_letter, error FROM resumes"
+            clauses, params = [], []
+            if status is not None:
+                clauses.append("status = ?")
+                params.append(status)
+            if has_job_posting is not None:
+                clauses.append("has_job_posting = ?")
+                params.append(int(has_job_posting))
+            if clauses:
+                query += " WHERE " + " AND ".join(clauses)
+            query += " ORDER BY name"
+            rows = self._connect().execute(query, params).fetchall()
+        return {
+            row[0]: {
+                "status": row[1],
+                "last_modified": row[2],
+                "has_job_posting": bool(row[3]),
+                "has_cover_letter": bool(row[4]),
+                "error": row[5],
+            }
+            for row in rows
+        }
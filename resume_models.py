@@ -0,0 +1,268 @@
+"""
+Typed models of the resume document and the JSON schemas generated from them.
+
+create_resume() in main.py builds these dataclasses, and structured_output.py
+sends the schemas derived from them to the API, so the interactive form and the
+Structured Outputs contract cannot drift apart. The cover letter schema lives here
+too; its keys contain spaces, so it is written out rather than generated. PACKAGE_SCHEMA
+combines the cleaned posting, the resume patch and the cover letter for the fused
+single-call mode, and UNIT_SCHEMAS split the patch into the pieces fan-out tailoring
+requests in parallel. The schemas are built once at
+import time, and compile_validator() turns a schema into a tree of plain Python
+checks so model output can be validated locally without re-walking the schema
+for every document.
+"""
+import dataclasses
+import typing
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List
+
+EDITABLE_WORK_FIELDS = ["responsibilities", "achievements", "programs_managed", "technologies"]
+
+
+@dataclass
+class JobTarget:
+    position_title: str = ""
+    company: str = ""
+    location: str = ""
+    salary_desired: str = ""
+
+
+@dataclass
+class PersonalInfo:
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    summary: str = ""
+
+
+@dataclass
+class WorkExperience:
+    job_title: str = ""
+    company: str = ""
+    location: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    responsibilities: List[str] = field(default_factory=list)
+    achievements: List[str] = field(default_factory=list)
+    programs_managed: List[str] = field(default_factory=list)
+    technologies: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Education:
+    institution: str = ""
+    degree: str = ""
+    location: str = ""
+    start_date: str = ""
+    end_date: str = ""
+    details: str = ""
+
+
+@dataclass
+class Certification:
+    name: str = ""
+    specialization: str = ""
+    awarded_by: str = ""
+    year: str = ""
+
+
+@dataclass
+class OnlineProfiles:
+    hugging_face: str = ""
+    github: str = ""
+
+
+@dataclass
+class Resume:
+    job_target: JobTarget = field(default_factory=JobTarget)
+    personal_info: PersonalInfo = field(default_factory=PersonalInfo)
+    work_experience: List[WorkExperience] = field(default_factory=list)
+    education: List[Education] = field(default_factory=list)
+    certifications: List[Certification] = field(default_factory=list)
+    leadership_skills: List[str] = field(default_factory=list)
+    tools: List[str] = field(default_factory=list)
+    online_profiles: OnlineProfiles = field(default_factory=OnlineProfiles)
+
+
+@dataclass
+class ResumeDocument:
+    resume: Resume = field(default_factory=Resume)
+    status: str = ""
+    last_modified: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def schema_for(tp) -> Dict:
+    """Strict JSON schema for a str, List[...] or dataclass type."""
+    if tp is str:
+        return {"type": "string"}
+    if typing.get_origin(tp) in (list, List):
+        return {"type": "array", "items": schema_for(typing.get_args(tp)[0])}
+    if dataclasses.is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        names = [f.name for f in dataclasses.fields(tp)]
+        return {
+            "type": "object",
+            "additionalProperties": False,
+            "required": names,
+            "properties": {name: schema_for(hints[name]) for name in names},
+        }
+    raise TypeError(f"No JSON schema mapping for {tp!r}")
+
+
+def _patch_schema() -> Dict:
+    string_list = schema_for(List[str])
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["job_target", "summary", "work_experience", "leadership_skills", "tools"],
+        "properties": {
+            "job_target": schema_for(JobTarget),
+            "summary": {"type": "string"},
+            "work_experience": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": EDITABLE_WORK_FIELDS,
+                    "properties": {name: string_list for name in EDITABLE_WORK_FIELDS},
+                },
+            },
+            "leadership_skills": string_list,
+            "tools": string_list,
+        },
+    }
+
+
+def _closed_object(properties: Dict) -> Dict:
+    return {"type": "object", "additionalProperties": False, "required": list(properties), "properties": properties}
+
+
+def _cover_letter_schema() -> Dict:
+    text = {"type": "string"}
+    return _closed_object({
+        "Header": _closed_object({"Date": text, "Name": text, "Email": text, "Phone": text}),
+        "Salutation": text,
+        "Body": _closed_object({
+            "Introduction": text,
+            "Reference to Job Posting": text,
+            "Summary of Relevant Experience": text,
+            "Conclusion": text,
+        }),
+        "Closing": text,
+    })
+
+
+def _posting_sections_schema() -> Dict:
+    """The cleaned posting as the fields of posting_parser.ParsedPosting."""
+    text = {"type": "string"}
+    string_list = schema_for(List[str])
+    return _closed_object({
+        "title": text,
+        "company": text,
+        "locations": string_list,
+        "salary": text,
+        "overview": string_list,
+        "responsibilities": string_list,
+        "qualifications": string_list,
+        "compensation": string_list,
+        "additional_skills": string_list,
+        "everything_else": string_list,
+    })
+
+
+def _unit_schemas() -> Dict[str, Dict]:
+    """Slices of the patch schema for fan-out tailoring, one per kind of unit."""
+    patch = _patch_schema()["properties"]
+    return {
+        "profile": _closed_object({"job_target": patch["job_target"], "summary": patch["summary"]}),
+        "work": patch["work_experience"]["items"],
+        "skills": _closed_object({"leadership_skills": patch["leadership_skills"], "tools": patch["tools"]}),
+    }
+
+
+# response_format json_schema payloads, built once per process.
+RESUME_SCHEMA = {"name": "tailored_resume", "strict": True, "schema": schema_for(ResumeDocument)}
+PATCH_SCHEMA = {"name": "tailored_resume_patch", "strict": True, "schema": _patch_schema()}
+COVER_LETTER_SCHEMA = {"name": "cover_letter", "strict": True, "schema": _cover_letter_schema()}
+UNIT_SCHEMAS = {kind: {"name": f"tailored_resume_{kind}", "strict": True, "schema": schema}
+                for kind, schema in _unit_schemas().items()}
+# Fused mode: cleaned posting, resume patch and cover letter from a single request.
+PACKAGE_SCHEMA = {"name": "tailored_package", "strict": True, "schema": _closed_object({
+    "job_posting": _posting_sections_schema(),
+    "resume_patch": _patch_schema(),
+    "cover_letter": _cover_letter_schema(),
+})}
+
+_JSON_TYPES = {"string": str, "array": list, "object": dict, "boolean": bool, "number": (int, float),
+               "integer": int, "null": type(None)}
+
+
+def compile_validator(schema: Dict) -> Callable[[object], List[str]]:
+    """
+    Compile a schema (the subset used here: type, properties, required,
+    additionalProperties, items) into a function returning a list of error strings.
+    """
+    def build(node: Dict):
+        expected = _JSON_TYPES[node["type"]]
+        if node["type"] == "object":
+            properties = {name: build(child) for name, child in node.get("properties", {}).items()}
+            required = node.get("required", [])
+            closed = node.get("additionalProperties", True) is False
+
+            def check_object(value, path, errors):
+                if not isinstance(value, dict):
+                    errors.append(f"{path}: expected object")
+                    return
+                for name in required:
+                    if name not in value:
+                        errors.append(f"{path}: missing '{name}'")
+                for name, item in value.items():
+                    check = properties.get(name)
+                    if check is not None:
+                        check(item, f"{path}.{name}", errors)
+                    elif closed:
+                        errors.append(f"{path}: unexpected '{name}'")
+            return check_object
+        if node["type"] == "array":
+            check_item = build(node["items"]) if "items" in node else None
+
+            def check_array(value, path, errors):
+                if not isinstance(value, list):
+                    errors.append(f"{path}: expected array")
+                    return
+                if check_item is not None:
+                    for index, item in enumerate(value):
+                        check_item(item, f"{path}[{index}]", errors)
+            return check_array
+
+        def check_scalar(value, path, errors):
+            if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+                errors.append(f"{path}: expected {node['type']}")
+        return check_scalar
+
+    root = build(schema)
+
+    def validate(value) -> List[str]:
+        errors = []
+        root(value, "$", errors)
+        return errors
+    return validate
+
+
+def check_schema(document, validator, label: str = "resume", source: str = "API response"):
+    """Raise if the model's output (or another document) does not match the schema it should follow."""
+    errors = validator(document)
+    if errors:
+        shown = "; ".join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else "")
+        raise Exception(f"{source} does not match the {label} schema: {shown}")
+
+
+validate_resume = compile_validator(RESUME_SCHEMA["schema"])
+validate_patch = compile_validator(PATCH_SCHEMA["schema"])
+validate_cover_letter = compile_validator(COVER_LETTER_SCHEMA["schema"])
+validate_package = compile_validator(PACKAGE_SCHEMA["schema"])
+UNIT_VALIDATORS = {kind: compile_validator(schema["schema"]) for kind, schema in UNIT_SCHEMAS.items()}
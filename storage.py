@@ -0,0 +1,338 @@
+"""
+Crash-safe writes for resume directories.
+
+Every file is written to a temporary file in the same directory and renamed over
+the target, so readers see either the old or the new contents, never a truncated
+file. Writes to one resume directory are serialised with a lock file (fcntl on
+POSIX, msvcrt on Windows), which also keeps concurrent batch runs apart.
+
+Multi-file updates go through a Transaction: the new contents of every file are
+first written to resumes/<name>/.journal.json and synced, then the files are
+swapped in with one batched round of fsyncs and the journal is removed. If the
+process dies part-way, the journal is replayed the next time the directory is
+locked (or by ResumeStore.recover()), so the group lands all-or-nothing.
+
+With RESUME_STORAGE_FORMAT=compact, JSON documents are written as compressed
+<stem>.pack files (see compact_storage.py). A baseline_resume.json becomes a
+reference to a single content-addressed copy under resumes/.objects/, and the
+tailored resume.json next to it is stored as a delta against that baseline.
+read_document() reads either layout, so existing JSON directories keep working.
+
+Set RESUME_FSYNC=off to skip fsync calls (faster, but not durable across power loss).
+"""
+import base64
+import glob
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+LOCK_FILENAME = ".lock"
+JOURNAL_FILENAME = ".journal.json"
+JOURNAL_VERSION = 2
+FSYNC = os.getenv("RESUME_FSYNC", "on").lower() not in ("0", "off", "false", "no")
+STORAGE_FORMAT = os.getenv("RESUME_STORAGE_FORMAT", "json").lower()
+PACK_SUFFIX = ".pack"
+OBJECTS_DIRNAME = ".objects"
+BASELINE_FILENAME = "baseline_resume.json"
+DELTA_FILENAMES = ("resume.json",)  # stored as deltas against the directory's baseline
+OBJECT_CACHE_SIZE = 32
+
+# Objects never change once written, so decoded baselines are kept in memory.
+_object_cache: Dict[str, object] = {}
+_object_cache_lock = threading.Lock()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _fsync_file(f):
+    if FSYNC:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(dir_path: str):
+    # Directory fsync makes renames durable on POSIX; Windows cannot open directories.
+    if FSYNC and fcntl is not None:
+        fd = os.open(dir_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _temp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def atomic_write_text(path: str, text: str, sync: bool = True):
+    """Replace path with text via a temporary file and rename."""
+    atomic_write_bytes(path, text.encode("utf-8"), sync)
+
+
+def atomic_write_bytes(path: str, data: bytes, sync: bool = True):
+    tmp_path = _temp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        if sync:
+            _fsync_file(f)
+    os.replace(tmp_path, path)
+    if sync:
+        _fsync_dir(os.path.dirname(path) or ".")
+
+
+def dump_json(data) -> str:
+    return json.dumps(data, indent=4)
+
+
+def packed_name(filename: str) -> str:
+    return os.path.splitext(filename)[0] + PACK_SUFFIX
+
+
+def find_document(dir_path: str, filename: str) -> Optional[str]:
+    """Path of filename in dir_path in whichever layout exists (packed or plain), or None."""
+    for candidate in (packed_name(filename), filename):
+        path = os.path.join(dir_path, candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _objects_dir(dir_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(dir_path)), OBJECTS_DIRNAME)
+
+
+def _object_path(objects_dir: str, key: str) -> str:
+    return os.path.join(objects_dir, key[:2], key + PACK_SUFFIX)
+
+
+def put_object(objects_dir: str, data) -> str:
+    """Store data once under its content hash and return the hash."""
+    from compact_storage import content_hash, encode
+
+    key = content_hash(data)
+    path = _object_path(objects_dir, key)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_bytes(path, encode(data))
+    return key
+
+
+def get_object(objects_dir: str, key: str):
+    """The decoded object for key. Shared with other callers: copy before modifying."""
+    from compact_storage import decode
+
+    path = _object_path(objects_dir, key)
+    with _object_cache_lock:
+        if path in _object_cache:
+            return _object_cache[path]
+    with open(path, "rb") as f:
+        data = decode(f.read())
+    with _object_cache_lock:
+        if len(_object_cache) >= OBJECT_CACHE_SIZE:
+            _object_cache.pop(next(iter(_object_cache)))
+        _object_cache[path] = data
+    return data
+
+
+def read_document(dir_path: str, filename: str):
+    """Load a JSON document from a resume directory, resolving packed references and deltas."""
+    path = find_document(dir_path, filename)
+    if path is None:
+        raise FileNotFoundError(os.path.join(dir_path, filename))
+    if not path.endswith(PACK_SUFFIX):
+        with open(path, "r") as f:
+            return json.load(f)
+    from compact_storage import apply_delta, decode
+
+    with open(path, "rb") as f:
+        packed = decode(f.read())
+    if isinstance(packed, dict) and "$ref" in packed:
+        from compact_storage import clone
+
+        return clone(get_object(_objects_dir(dir_path), packed["$ref"]))
+    if isinstance(packed, dict) and "$base" in packed:
+        return apply_delta(get_object(_objects_dir(dir_path), packed["$base"]), packed["$delta"])
+    return packed
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on path (created if needed) for the duration of the block."""
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 seconds; keep waiting
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _apply(dir_path: str, files: List[Tuple[str, Optional[bytes]]]):
+    """Swap every file in (None deletes it) with a single batched round of fsyncs."""
+    staged = []
+    for filename, data in files:
+        path = os.path.join(dir_path, filename)
+        if data is None:
+            staged.append((None, None, path))
+            continue
+        tmp_path = _temp_path(path)
+        f = open(tmp_path, "wb")
+        f.write(data)
+        staged.append((f, tmp_path, path))
+    for f, _, _ in staged:
+        if f is not None:
+            _fsync_file(f)
+            f.close()
+    for _, tmp_path, path in staged:
+        if tmp_path is not None:
+            os.replace(tmp_path, path)
+        elif os.path.exists(path):
+            os.remove(path)
+    _fsync_dir(dir_path)
+
+
+def replay_journal(dir_path: str) -> bool:
+    """Finish a transaction interrupted after its journal was written. Caller holds the lock."""
+    journal_path = os.path.join(dir_path, JOURNAL_FILENAME)
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            journal = json.load(f)
+    except FileNotFoundError:
+        return False
+    except ValueError:
+        # The journal is renamed into place only once complete, so this is a stray
+        # partial copy from a crash before the commit point: nothing was applied.
+        os.remove(journal_path)
+        return False
+    if journal.get("version") == 1:  # plain-text journals from before the compact format
+        files = [(name, text.encode("utf-8")) for name, text in journal["files"]]
+    else:
+        files = [(name, None if data is None else base64.b64decode(data)) for name, data in journal["files"]]
+    _apply(dir_path, files)
+    os.remove(journal_path)
+    return True
+
+
+class Transaction:
+    """Files staged for one resume directory, committed together by ResumeStore.transaction()."""
+
+    def __init__(self, dir_path: str, storage_format: str = STORAGE_FORMAT):
+        self.dir_path = dir_path
+        self.storage_format = storage_format
+        self.files: Dict[str, Optional[bytes]] = {}
+        self._baseline = None  # (content hash, document) of the baseline staged or on disk
+
+    def write_text(self, filename: str, text: str):
+        self.files[filename] = text.encode("utf-8")
+
+    def write_json(self, filename: str, data):
+        if self.storage_format != "compact":
+            self.files[filename] = dump_json(data).encode("utf-8")
+            self.files[packed_name(filename)] = None
+            return
+        from compact_storage import encode, json_delta
+
+        if filename == BASELINE_FILENAME:
+            key = put_object(_objects_dir(self.dir_path), data)
+            self._baseline = (key, data)
+            packed = {"$ref": key}
+        elif filename in DELTA_FILENAMES and self._load_baseline() is not None:
+            key, baseline = self._baseline
+            packed = {"$base": key, "$delta": json_delta(baseline, data)}
+        else:
+            packed = data
+        self.files[packed_name(filename)] = encode(packed)
+        self.files[filename] = None
+
+    def _load_baseline(self):
+        if self._baseline is None and find_document(self.dir_path, BASELINE_FILENAME):
+            baseline = read_document(self.dir_path, BASELINE_FILENAME)
+            self._baseline = (put_object(_objects_dir(self.dir_path), baseline), baseline)
+        return self._baseline
+
+    def commit(self):
+        if not self.files:
+            return
+        # Only record deletions for files that exist, so plain JSON directories stay untouched.
+        files = [(name, data) for name, data in self.files.items()
+                 if data is not None or os.path.exists(os.path.join(self.dir_path, name))]
+        journal = {"version": JOURNAL_VERSION,
+                   "files": [(name, None if data is None else base64.b64encode(data).decode("ascii"))
+                             for name, data in files]}
+        atomic_write_text(os.path.join(self.dir_path, JOURNAL_FILENAME), json.dumps(journal))
+        replay_journal(self.dir_path)
+
+
+class ResumeStore:
+    def __init__(self, resumes_dir: str, storage_format: str = STORAGE_FORMAT):
+        self.resumes_dir = resumes_dir
+        self.storage_format = storage_format
+
+    def path(self, name: str, filename: str = None) -> str:
+        dir_path = os.path.join(self.resumes_dir, name)
+        return os.path.join(dir_path, filename) if filename else dir_path
+
+    @contextmanager
+    def lock(self, name: str):
+        """Hold the per-resume lock, finishing any interrupted transaction first."""
+        dir_path = self.path(name)
+        os.makedirs(dir_path, exist_ok=True)
+        with file_lock(os.path.join(dir_path, LOCK_FILENAME)):
+            replay_journal(dir_path)
+            yield dir_path
+
+    @contextmanager
+    def transaction(self, name: str):
+        """
+        Stage writes on the yielded Transaction; they are committed together when
+        the block exits normally and discarded if it raises.
+        """
+        with self.lock(name) as dir_path:
+            txn = Transaction(dir_path, self.storage_format)
+            yield txn
+            txn.commit()
+
+    def write_text(self, name: str, filename: str, text: str):
+        with self.lock(name) as dir_path:
+            atomic_write_text(os.path.join(dir_path, filename), text)
+
+    def write_json(self, name: str, filename: str, data):
+        if self.storage_format != "compact" and not os.path.exists(self.path(name, packed_name(filename))):
+            self.write_text(name, filename, dump_json(data))
+            return
+        # Packed documents may reference the baseline or replace the other layout: use a transaction.
+        with self.transaction(name) as txn:
+            txn.write_json(filename, data)
+
+    def read_json(self, name: str, filename: str):
+        return read_document(self.path(name), filename)
+
+    def exists(self, name: str, filename: str) -> bool:
+        return find_document(self.path(name), filename) is not None
+
+    def recover(self) -> List[str]:
+        """Replay journals left by interrupted transactions; returns the affected resume names."""
+        recovered = []
+        for journal_path in glob.glob(os.path.join(glob.escape(self.resumes_dir), "*", JOURNAL_FILENAME)):
+            name = os.path.basename(os.path.dirname(journal_path))
+            with self.lock(name):
+                recovered.append(name)
+        return recovered
@@ -0,0 +1,107 @@
+"""
+Live console rendering for streamed completions.
+
+A stream handler is any object with start(), delta(text) and finish(stats); pass
+one to llm.chat_completion(stream_handler=...) to stream instead of waiting for
+the whole response.
+"""
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from json_stream import IncrementalJSONParser
+
+
+@dataclass
+class StreamStats:
+    started: float
+    first_token_at: Optional[float] = None
+    finished: Optional[float] = None
+    chunks: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    finish_reason: Optional[str] = None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens(self) -> int:
+        # Without a usage chunk each content delta is roughly one token.
+        return self.completion_tokens if self.completion_tokens is not None else self.chunks
+
+    @property
+    def tokens_per_second(self) -> float:
+        if self.first_token_at is None or self.finished is None:
+            return 0.0
+        elapsed = self.finished - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        ttft = self.time_to_first_token
+        ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+        total = (self.finished or time.monotonic()) - self.started
+        return (f"time to first token {ttft_text} | {self.tokens} tokens in {total:.1f}s "
+                f"| {self.tokens_per_second:.1f} tokens/sec")
+
+
+class LiveStreamRenderer:
+    """
+    Render a streamed response in a Rich Live region.
+    JSON output is parsed incrementally and shown pretty-printed; anything else is
+    shown as raw text. Only the last max_lines lines are kept on screen.
+    """
+
+    def __init__(self, title: str, console=None, json_output: bool = True, max_lines: int = 20,
+                 refresh_per_second: int = 8):
+        self.title = title
+        self.console = console
+        self.json_output = json_output
+        self.max_lines = max_lines
+        self.refresh_interval = 1.0 / refresh_per_second
+        self.parser = IncrementalJSONParser() if json_output else None
+        self.parts = []
+        self.live = None
+        self.last_refresh = 0.0
+        self.tokens = 0
+
+    def _renderable(self):
+        from rich.panel import Panel
+        from rich.text import Text
+
+        if self.parser is not None:
+            snapshot = self.parser.snapshot()
+            body = json.dumps(snapshot, indent=2, ensure_ascii=False) if snapshot is not None else ""
+        else:
+            body = "".join(self.parts)
+        lines = body.splitlines()[-self.max_lines:]
+        return Panel(Text("\n".join(lines)), title=self.title,
+                     subtitle=f"streaming... {self.tokens} tokens", border_style="cyan")
+
+    def start(self):
+        from rich.live import Live
+
+        self.live = Live(console=self.console, auto_refresh=False, transient=True)
+        self.live.start()
+
+    def delta(self, text: str):
+        self.tokens += 1
+        if self.parser is not None:
+            self.parser.feed(text)
+        else:
+            self.parts.append(text)
+        now = time.monotonic()
+        if now - self.last_refresh >= self.refresh_interval:
+            self.last_refresh = now
+            self.live.update(self._renderable(), refresh=True)
+
+    def finish(self, stats: StreamStats):
+        if self.live is not None:
+            self.live.stop()
+        console = self.console or (self.live.console if self.live else None)
+        if console is not None:
+            console.print(f"[dim]{self.title}: {stats.summary()}[/dim]")
@@ -1,262 +1,462 @@
-import json
-import os
-from datetime import datetime
-from typing import Dict
-import openai
-from openai import OpenAI
-
-class ResumeTailorStructuredOutput:
-    def __init__(self, api_key: str = None, model: str = "gpt-4o"):
-        """
-        Initialize with an API key and the desired model.
-        If no API key is provided, attempt to retrieve it from the environment
-        variable or from a file named 'openai-api-key.txt'.
-        """
-        if api_key is None:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key and os.path.exists("openai-api-key.txt"):
-                with open("openai-api-key.txt", "r") as f:
-                    api_key = f.read().strip()
-        if not api_key:
-            raise ValueError("No OpenAI API key provided.")
-        
-        openai.api_key = api_key
-        self.model = model
-        # Instantiate a client instance.
-        self.client = OpenAI(api_key=api_key)
-        
-        # Define a JSON schema that mirrors the desired resume structure.
-        # Every object enforces additionalProperties: false.
-        self.schema = {
-            "name": "tailored_resume",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "additionalProperties": False,
-                "required": ["resume", "status", "last_modified"],
-                "properties": {
-                    "resume": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "required": [
-                            "job_target",
-                            "personal_info",
-                            "work_experience",
-                            "education",
-                            "certifications",
-                            "leadership_skills",
-                            "tools",
-                            "online_profiles"
-                        ],
-                        "properties": {
-                            "job_target": {
-                                "type": "object",
-                                "additionalProperties": False,
-                                "required": ["position_title", "company", "location", "salary_desired"],
-                                "properties": {
-                                    "position_title": {"type": "string"},
-                                    "company": {"type": "string"},
-                                    "location": {"type": "string"},
-                                    "salary_desired": {"type": "string"}
-                                }
-                            },
-                            "personal_info": {
-                                "type": "object",
-                                "additionalProperties": False,
-                                "required": ["name", "email", "phone", "summary"],
-                                "properties": {
-                                    "name": {"type": "string"},
-                                    "email": {"type": "string"},
-                                    "phone": {"type": "string"},
-                                    "summary": {"type": "string"}
-                                }
-                            },
-                            "work_experience": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "additionalProperties": False,
-                                    "required": [
-                                        "job_title",
-                                        "company",
-                                        "location",
-                                        "start_date",
-                                        "end_date",
-                                        "responsibilities",
-                                        "achievements",
-                                        "programs_managed",
-                                        "technologies"
-                                    ],
-                                    "properties": {
-                                        "job_title": {"type": "string"},
-                                        "company": {"type": "string"},
-                                        "location": {"type": "string"},
-                                        "start_date": {"type": "string"},
-                                        "end_date": {"type": "string"},
-                                        "responsibilities": {
-                                            "type": "array",
-                                            "items": {"type": "string"}
-                                        },
-                                        "achievements": {
-                                            "type": "array",
-                                            "items": {"type": "string"}
-                                        },
-                                        "programs_managed": {
-                                            "type": "array",
-                                            "items": {"type": "string"}
-                                        },
-                                        "technologies": {
-                                            "type": "array",
-                                            "items": {"type": "string"}
-                                        }
-                                    }
-                                }
-                            },
-                            "education": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "additionalProperties": False,
-                                    "required": ["institution", "degree", "location", "start_date", "end_date", "details"],
-                                    "properties": {
-                                        "institution": {"type": "string"},
-                                        "degree": {"type": "string"},
-                                        "location": {"type": "string"},
-                                        "start_date": {"type": "string"},
-                                        "end_date": {"type": "string"},
-                                        "details": {"type": "string"}
-                                    }
-                                }
-                            },
-                            "certifications": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "additionalProperties": False,
-                                    "required": ["name", "specialization", "awarded_by", "year"],
-                                    "properties": {
-                                        "name": {"type": "string"},
-                                        "specialization": {"type": "string"},
-                                        "awarded_by": {"type": "string"},
-                                        "year": {"type": "string"}
-                                    }
-                                }
-                            },
-                            "leadership_skills": {
-                                "type": "array",
-                                "items": {"type": "string"}
-                            },
-                            "tools": {
-                                "type": "array",
-                                "items": {"type": "string"}
-                            },
-                            "online_profiles": {
-                                "type": "object",
-                                "additionalProperties": False,
-                                "required": ["hugging_face", "github"],
-                                "properties": {
-                                    "hugging_face": {"type": "string"},
-                                    "github": {"type": "string"}
-                                }
-                            }
-                        }
-                    },
-                    "status": {"type": "string"},
-                    "last_modified": {"type": "string"}
-                }
-            }
-        }
-    
-    def tailor_resume(self, baseline_resume: Dict, job_posting: str) -> Dict:
-        """
-        Given a baseline resume (as a dict) and a job posting text,
-        calls the OpenAI API using Structured Outputs to update only the allowed fields.
-        Specifically, update:
-         - job_target (all fields)
-         - personal_info: update only 'summary'
-         - work_experience: update only 'responsibilities', 'achievements', 'programs_managed', and 'technologies'
-         - leadership_skills (all fields)
-         - tools (all fields)
-        Return the updated resume as a dict, with 'status' set to 'complete' and 'last_modified' updated.
-        """
-        system_message = (
-            "You are a professional resume tailoring assistant with expertise in technical resumes. You will be provided with two inputs: a baseline resume and a job posting. "
-            "Your task is to update the baseline resume by selectively tailoring it with the job posting details while preserving the original language of the baseline resume as much as possible. "
-            "Only modify the specific fields required by the job posting and avoid altering the original phrasing of any work experience or other content that is not explicitly targeted for update. "
-            "Make only minimal adjustments to align the content with the job posting. Specifically, update the following fields based on the job posting:\n"
-            "1. 'job_target': Revise all fields (position_title, company, location, salary_desired) to reflect the job's requirements, using concise language.\n"
-            "2. 'personal_info': Update only the 'summary' field to incorporate key technical qualifications, responsibilities, and outcomes from the job posting, while preserving the original style.\n"
-            "3. 'work_experience': For each entry, update only the 'responsibilities', 'achievements', 'programs_managed', and 'technologies' fields if necessary. "
-            "Use technical terminology and quantifiable outcomes only where directly relevant to the job posting. Do not add excessive or repetitive language; preserve the original wording as much as possible.\n"
-            "4. 'leadership_skills': Update all entries to include any specific technical leadership aspects mentioned in the job posting, without altering the baseline language unnecessarily.\n"
-            "5. 'tools': Update all entries to include relevant modern technical tools and platforms mentioned in the job posting, making minimal modifications.\n\n"
-            "Do not modify other fields (e.g., education, certifications, online_profiles). "
-            "Return the complete updated resume in valid JSON format according to the provided schema, setting 'status' to 'complete' and updating 'last_modified' to the current time."
-        )
-
-        user_message = (
-            f"Baseline Resume (original):\n{json.dumps(baseline_resume, indent=4)}\n\n"
-            f"Job Posting Details:\n{job_posting}\n\n"
-            "Using the job posting details above, update the baseline resume accordingly. "
-            "Ensure that only the specified fields are updated and all other data remains unchanged."
-        )
-
-
-        try:
-            # Use the beta parsing method for Structured Outputs with an increased max_tokens limit
-            completion = self.client.beta.chat.completions.parse(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": self.schema
-                },
-                temperature=1,
-                max_tokens=15000
-            )
-        except Exception as e:
-            print("[ERROR] API call failed. Below is the JSON schema used:")
-            print(json.dumps(self.schema, indent=2))
-            raise Exception(f"Error calling OpenAI API: {e}")
-
-        try:
-            # Attempt to access the parsed structured output
-            tailored_resume = completion.choices[0].message.parsed
-            # If parsed output is None, fallback to parsing the raw content manually.
-            if tailored_resume is None:
-                content = completion.choices[0].message.content
-                tailored_resume = json.loads(content)
-            # Override/ensure fields according to the instructions.
-            tailored_resume["status"] = "complete"
-            tailored_resume["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return tailored_resume
-        except Exception as e:
-            print("[ERROR] Failed to parse API response into structured JSON. Raw output:")
-            print(str(completion))
-            raise Exception(f"Failed to parse API response into structured JSON: {e}.")
-
-    def tailor_resume_from_directory(self, directory: str) -> Dict:
-        """
-        Reads baseline_resume.json and job_posting.txt from the specified directory,
-        then calls tailor_resume() with the read data.
-        Returns the updated resume as a dict.
-        """
-        baseline_file = os.path.join(directory, "baseline_resume.json")
-        job_posting_file = os.path.join(directory, "job_posting.txt")
-
-        try:
-            with open(baseline_file, "r") as bf:
-                baseline_resume = json.load(bf)
-        except Exception as e:
-            raise Exception(f"Error reading baseline resume from {baseline_file}: {e}")
-
-        try:
-            with open(job_posting_file, "r") as jf:
-                job_posting = jf.read()
-        except Exception as e:
-            raise Exception(f"Error reading job posting from {job_posting_file}: {e}")
-
-        return self.tailor_resume(baseline_resume, job_posting)
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import tracing
+
+from json_stream import extract_json
+from llm import chat_completion, get_client
+from posting_parser import ParsedPosting
+from tracing import traced
+from resume_models import (EDITABLE_WORK_FIELDS, PACKAGE_SCHEMA, PATCH_SCHEMA, RESUME_SCHEMA, UNIT_SCHEMAS,
+                           UNIT_VALIDATORS, check_schema, validate_package, validate_patch, validate_resume)
+from storage import read_document
+from streaming import LiveStreamRenderer
+from token_budget import COVER_LETTER_TOKENS, expected_clean_tokens, expected_json_tokens, plan as plan_tokens
+
+FANOUT_WORKERS = int(os.getenv("RESUME_FANOUT_WORKERS", "8"))
+UNIT_INSTRUCTIONS = {
+    "profile": (
+        "Tailor the 'job_target' and 'summary' below. Revise all job_target fields (position_title, company, location, salary_desired) "
+        "to reflect the job's requirements, using concise language. Incorporate key technical qualifications, responsibilities, and outcomes "
+        "from the job posting into the summary, while preserving its original style. The candidate's roles are listed for context only."
+    ),
+    "work": (
+        "Tailor this one work_experience entry. Update 'responsibilities', 'achievements', 'programs_managed', and 'technologies' only where necessary; "
+        "'job_title' and 'company' are given for context only. Use technical terminology and quantifiable outcomes only where directly relevant, "
+        "and do not add excessive or repetitive language."
+    ),
+    "skills": (
+        "Tailor the 'leadership_skills' and 'tools' below. Include any specific technical leadership aspects mentioned in the job posting, "
+        "and relevant modern technical tools and platforms it mentions, making minimal modifications to the baseline language."
+    ),
+}
+
+
+def _schema_check(validator, label: str = "resume"):
+    """validate= callback for chat_completion: only replies that parse and match the schema are cached."""
+    def validate(content: str):
+        check_schema(extract_json(content, allow_partial=False), validator, label)
+    return validate
+
+
+def editable_fields(baseline_resume: Dict) -> Dict:
+    """Extract the fields tailoring is allowed to change, plus job_title/company for context."""
+    resume = baseline_resume["resume"]
+    return {
+        "job_target": resume["job_target"],
+        "summary": resume["personal_info"]["summary"],
+        "work_experience": [
+            dict({"job_title": job["job_title"], "company": job["company"]},
+                 **{field: job[field] for field in EDITABLE_WORK_FIELDS})
+            for job in resume["work_experience"]
+        ],
+        "leadership_skills": resume["leadership_skills"],
+        "tools": resume["tools"],
+    }
+
+
+def resume_units(baseline_resume: Dict) -> List[Tuple[str, Dict, List[str]]]:
+    """
+    Split the editable fields into independently tailorable units, as (kind, fields, context):
+    job_target + summary, one unit per work_experience entry, and leadership_skills + tools.
+    """
+    fields = editable_fields(baseline_resume)
+    roles = [f"{job['job_title']} at {job['company']}" for job in fields["work_experience"]]
+    units = [("profile", {"job_target": fields["job_target"], "summary": fields["summary"]}, roles)]
+    units += [("work", job, []) for job in fields["work_experience"]]
+    units.append(("skills", {"leadership_skills": fields["leadership_skills"], "tools": fields["tools"]}, []))
+    return units
+
+
+def apply_resume_patch(baseline_resume: Dict, patch: Dict) -> Dict:
+    """Merge a tailoring patch into a copy of the baseline and mark it complete."""
+    tailored = copy.deepcopy(baseline_resume)
+    resume = tailored["resume"]
+    if len(patch["work_experience"]) != len(resume["work_experience"]):
+        raise Exception(
+            f"Patch has {len(patch['work_experience'])} work_experience entries, "
+            f"baseline has {len(resume['work_experience'])}."
+        )
+    resume["job_target"] = patch["job_target"]
+    resume["personal_info"]["summary"] = patch["summary"]
+    for job, job_patch in zip(resume["work_experience"], patch["work_experience"]):
+        for field in EDITABLE_WORK_FIELDS:
+            job[field] = job_patch[field]
+    resume["leadership_skills"] = patch["leadership_skills"]
+    resume["tools"] = patch["tools"]
+    tailored["status"] = "complete"
+    tailored["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return tailored
+
+
+class ResumeTailorStructuredOutput:
+    def __init__(self, api_key: str = None, model: str = "gpt-4o", use_cache: bool = True):
+        """
+        Initialize with an API key and the desired model.
+        If no API key is provided, attempt to retrieve it from the environment
+        variable or from a file named 'openai-api-key.txt'.
+        Set use_cache=False to bypass the shared response cache.
+        """
+        if api_key is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key and os.path.exists("openai-api-key.txt"):
+                with open("openai-api-key.txt", "r") as f:
+                    api_key = f.read().strip()
+        if not api_key:
+            raise ValueError("No OpenAI API key provided.")
+        
+        self.model = model
+        self.use_cache = use_cache
+        # Clients are pooled per API key, so every tailor shares one connection pool.
+        self.client = get_client(api_key)
+        
+        # Schemas are generated once from resume_models; instances just reference them.
+        self.schema = RESUME_SCHEMA
+        self.patch_schema = PATCH_SCHEMA
+        self.package_schema = PACKAGE_SCHEMA
+    
+    @traced("tailor")
+    def tailor_resume(self, baseline_resume: Dict, job_posting: str, stream: bool = False,
+                      mode: str = "full", top_k: int = None) -> Dict:
+        """
+        Given a baseline resume (as a dict) and a job posting text,
+        calls the OpenAI API using Structured Outputs to update only the allowed fields.
+        Specifically, update:
+         - job_target (all fields)
+         - personal_info: update only 'summary'
+         - work_experience: update only 'responsibilities', 'achievements', 'programs_managed', and 'technologies'
+         - leadership_skills (all fields)
+         - tools (all fields)
+        Return the updated resume as a dict, with 'status' set to 'complete' and 'last_modified' updated.
+        With stream=True the response is rendered live in the console as it arrives.
+        mode="patch" delegates to tailor_resume_patch(), which only round-trips the editable fields,
+        and mode="fanout" to tailor_resume_fanout(), which tailors them in parallel requests.
+        With top_k, each job's responsibilities, achievements and technologies are first cut down
+        locally to the top_k entries most relevant to the posting (see relevance.py).
+        """
+        if top_k:
+            from relevance import focus_resume
+            baseline_resume = focus_resume(baseline_resume, job_posting, top_k)
+        if mode == "patch":
+            return self.tailor_resume_patch(baseline_resume, job_posting, stream=stream)
+        if mode == "fanout":
+            return self.tailor_resume_fanout(baseline_resume, job_posting)
+        if mode != "full":
+            raise ValueError(f"Unknown tailoring mode '{mode}'. Use 'full', 'patch' or 'fanout'.")
+
+        # The posting is trimmed to fit and max_tokens follows the size of the resume being echoed.
+        messages, budget = plan_tokens("tailor_resume", self.model,
+                                       lambda posting: self.full_messages(baseline_resume, posting),
+                                       job_posting, expected_json_tokens(baseline_resume))
+        try:
+            # Structured Outputs request; identical requests are served from the shared response cache.
+            content = chat_completion(
+                client=self.client,
+                model=self.model,
+                messages=messages,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": self.schema
+                },
+                temperature=1,
+                budget=budget,
+                use_cache=self.use_cache,
+                validate=_schema_check(validate_resume),
+                stream_handler=LiveStreamRenderer("Tailored Resume") if stream else None
+            )
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {e}")
+
+        try:
+            tailored_resume = extract_json(content, allow_partial=False)
+        except Exception as e:
+            print("[ERROR] Failed to parse API response into structured JSON. Raw output:")
+            print(str(content))
+            raise Exception(f"Failed to parse API response into structured JSON: {e}.")
+        check_schema(tailored_resume, validate_resume)
+        # Override/ensure fields according to the instructions.
+        tailored_resume["status"] = "complete"
+        tailored_resume["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return tailored_resume
+
+    def full_messages(self, baseline_resume: Dict, job_posting: str) -> List[Dict]:
+        """Build the chat messages for full-echo tailoring of the whole resume."""
+        system_message = (
+            "You are a professional resume tailoring assistant with expertise in technical resumes. You will be provided with two inputs: a baseline resume and a job posting. "
+            "Your task is to update the baseline resume by selectively tailoring it with the job posting details while preserving the original language of the baseline resume as much as possible. "
+            "Only modify the specific fields required by the job posting and avoid altering the original phrasing of any work experience or other content that is not explicitly targeted for update. "
+            "Make only minimal adjustments to align the content with the job posting. Specifically, update the following fields based on the job posting:\n"
+            "1. 'job_target': Revise all fields (position_title, company, location, salary_desired) to reflect the job's requirements, using concise language.\n"
+            "2. 'personal_info': Update only the 'summary' field to incorporate key technical qualifications, responsibilities, and outcomes from the job posting, while preserving the original style.\n"
+            "3. 'work_experience': For each entry, update only the 'responsibilities', 'achievements', 'programs_managed', and 'technologies' fields if necessary. "
+            "Use technical terminology and quantifiable outcomes only where directly relevant to the job posting. Do not add excessive or repetitive language; preserve the original wording as much as possible.\n"
+            "4. 'leadership_skills': Update all entries to include any specific technical leadership aspects mentioned in the job posting, without altering the baseline language unnecessarily.\n"
+            "5. 'tools': Update all entries to include relevant modern technical tools and platforms mentioned in the job posting, making minimal modifications.\n\n"
+            "Do not modify other fields (e.g., education, certifications, online_profiles). "
+            "Return the complete updated resume in valid JSON format according to the provided schema, setting 'status' to 'complete' and updating 'last_modified' to the current time."
+        )
+
+        user_message = (
+            f"Baseline Resume (original):\n{json.dumps(baseline_resume, indent=4)}\n\n"
+            f"Job Posting Details:\n{job_posting}\n\n"
+            "Using the job posting details above, update the baseline resume accordingly. "
+            "Ensure that only the specified fields are updated and all other data remains unchanged."
+        )
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+
+    def patch_messages(self, baseline_resume: Dict, job_posting: str) -> List[Dict]:
+        """Build the chat messages for patch tailoring from only the editable fields."""
+        system_message = (
+            "You are a professional resume tailoring assistant with expertise in technical resumes. You will be provided with the editable fields of a baseline resume and a job posting. "
+            "Tailor those fields to the job posting while preserving the original language of the baseline as much as possible, making only minimal adjustments:\n"
+            "1. 'job_target': Revise all fields (position_title, company, location, salary_desired) to reflect the job's requirements, using concise language.\n"
+            "2. 'summary': Incorporate key technical qualifications, responsibilities, and outcomes from the job posting, while preserving the original style.\n"
+            "3. 'work_experience': Return exactly one entry per input entry, in the same order. Update 'responsibilities', 'achievements', 'programs_managed', and 'technologies' only where necessary; "
+            "'job_title' and 'company' are given for context only. Use technical terminology and quantifiable outcomes only where directly relevant, and do not add excessive or repetitive language.\n"
+            "4. 'leadership_skills': Include any specific technical leadership aspects mentioned in the job posting, without altering the baseline language unnecessarily.\n"
+            "5. 'tools': Include relevant modern technical tools and platforms mentioned in the job posting, making minimal modifications.\n\n"
+            "Return the tailored fields in valid JSON according to the provided schema."
+        )
+        user_message = (
+            f"Editable Resume Fields:\n{json.dumps(editable_fields(baseline_resume), ensure_ascii=False, separators=(',', ':'))}\n\n"
+            f"Job Posting Details:\n{job_posting}"
+        )
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+
+    def tailor_resume_patch(self, baseline_resume: Dict, job_posting: str, stream: bool = False) -> Dict:
+        """
+        Tailor only the editable fields and merge them into the baseline locally.
+        The model receives a compact copy of job_target, the summary, the four editable
+        work_experience lists, leadership_skills and tools, and returns the same shape
+        under self.patch_schema, so none of the fixed fields are sent or echoed back.
+        """
+        patch_fields = editable_fields(baseline_resume)
+        for job in patch_fields["work_experience"]:
+            del job["job_title"], job["company"]  # context only; not part of the answer
+        messages, budget = plan_tokens("tailor_resume_patch", self.model,
+                                       lambda posting: self.patch_messages(baseline_resume, posting),
+                                       job_posting, expected_json_tokens(patch_fields))
+        try:
+            content = chat_completion(
+                client=self.client,
+                model=self.model,
+                messages=messages,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": self.patch_schema
+                },
+                temperature=1,
+                budget=budget,
+                use_cache=self.use_cache,
+                validate=_schema_check(validate_patch, "patch"),
+                stream_handler=LiveStreamRenderer("Tailored Resume Patch") if stream else None
+            )
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {e}")
+
+        try:
+            patch = extract_json(content, allow_partial=False)
+        except Exception as e:
+            print("[ERROR] Failed to parse API response into structured JSON. Raw output:")
+            print(str(content))
+            raise Exception(f"Failed to parse API response into structured JSON: {e}.")
+        check_schema(patch, validate_patch)
+        return apply_resume_patch(baseline_resume, patch)
+
+    def unit_messages(self, kind: str, fields: Dict, context: List[str], job_posting: str) -> List[Dict]:
+        """
+        Build the chat messages for one fan-out unit. The system message and the posting
+        come first and are the same for every unit, so the API's prompt caching can reuse
+        that prefix across the parallel requests.
+        """
+        system_message = (
+            "You are a professional resume tailoring assistant with expertise in technical resumes. You will be provided with a job posting and one part of a baseline resume. "
+            "Tailor that part to the job posting while preserving the original language of the baseline as much as possible, making only minimal adjustments, "
+            "and return it in valid JSON according to the provided schema."
+        )
+        user_message = f"Job Posting Details:\n{job_posting}\n\n{UNIT_INSTRUCTIONS[kind]}\n\n"
+        if context:
+            user_message += f"Roles (context only):\n{json.dumps(context, ensure_ascii=False)}\n\n"
+        user_message += f"Resume Fields:\n{json.dumps(fields, ensure_ascii=False, separators=(',', ':'))}"
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+
+    def tailor_unit(self, kind: str, fields: Dict, context: List[str], job_posting: str) -> Dict:
+        """Tailor one unit from resume_units() under its slice of the patch schema."""
+        answer_fields = {key: fields[key] for key in UNIT_SCHEMAS[kind]["schema"]["properties"]}
+        messages, budget = plan_tokens(f"tailor_{kind}", self.model,
+                                       lambda posting: self.unit_messages(kind, fields, context, posting),
+                                       job_posting, expected_json_tokens(answer_fields))
+        try:
+            content = chat_completion(
+                client=self.client,
+                model=self.model,
+                messages=messages,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": UNIT_SCHEMAS[kind]
+                },
+                temperature=1,
+                budget=budget,
+                use_cache=self.use_cache,
+                validate=_schema_check(UNIT_VALIDATORS[kind], f"{kind} unit")
+            )
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API ({kind} unit): {e}")
+
+        try:
+            unit = extract_json(content, allow_partial=False)
+        except Exception as e:
+            raise Exception(f"Failed to parse the {kind} unit response into structured JSON: {e}.")
+        check_schema(unit, UNIT_VALIDATORS[kind], f"{kind} unit")
+        return unit
+
+    def tailor_resume_fanout(self, baseline_resume: Dict, job_posting: str, workers: int = None) -> Dict:
+        """
+        Tailor the editable fields as independent units in concurrent requests and merge them locally.
+        Each work_experience entry, the job_target + summary and the leadership_skills + tools
+        are separate requests, so wall time follows the longest unit instead of the whole resume.
+        The units are reassembled into a patch, which is checked against the patch schema and
+        merged like tailor_resume_patch() does; the result is checked against the resume schema.
+        """
+        units = resume_units(baseline_resume)
+        parent = tracing.default_tracer.current()  # counters from the worker threads land on the caller's span
+
+        def run(unit):
+            kind, fields, context = unit
+            with tracing.default_tracer.activate(parent):
+                return self.tailor_unit(kind, fields, context, job_posting)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(units), workers or FANOUT_WORKERS)),
+                                thread_name_prefix="tailor-unit") as pool:
+            profile, *jobs, skills = pool.map(run, units)
+        patch = {
+            "job_target": profile["job_target"],
+            "summary": profile["summary"],
+            "work_experience": jobs,
+            "leadership_skills": skills["leadership_skills"],
+            "tools": skills["tools"],
+        }
+        check_schema(patch, validate_patch, "patch", source="Reassembled patch")
+        tailored_resume = apply_resume_patch(baseline_resume, patch)
+        check_schema(tailored_resume, validate_resume, source="Reassembled resume")
+        return tailored_resume
+
+    def package_messages(self, baseline_resume: Dict, job_posting: str) -> List[Dict]:
+        """Build the chat messages for fused cleaning, patch tailoring and cover letter writing."""
+        resume = baseline_resume["resume"]
+        system_message = (
+            "You are a professional resume tailoring assistant with expertise in technical resumes. You will be provided with a raw job announcement, "
+            "the editable fields of a candidate's baseline resume, and the candidate's contact details and background. Produce three things in one JSON object:\n"
+            "1. 'job_posting': Clean the announcement by stripping out extraneous content and return all the job details: the title, company, location(s) and salary range; "
+            "an overview of the role combining what is in the posting with your own summary; the key responsibilities in great detail if they're posted, and create them if they aren't; "
+            "the qualifications in great detail to the letter of the announcement; compensation and benefits; your summary of additional skills you believe would be required; "
+            "and an 'everything else' synopsis of the job itself. Use 'Not specified' for details the posting does not give.\n"
+            "2. 'resume_patch': Tailor the editable fields to the job while preserving the original language of the baseline as much as possible, making only minimal adjustments. "
+            "Revise all 'job_target' fields to reflect the job; incorporate key qualifications into the 'summary' in its original style; return exactly one 'work_experience' entry per input entry, "
+            "in the same order, updating 'responsibilities', 'achievements', 'programs_managed' and 'technologies' only where necessary ('job_title' and 'company' are context only); "
+            "include specific technical leadership aspects in 'leadership_skills' and relevant modern tools in 'tools'. Do not add excessive or repetitive language.\n"
+            "3. 'cover_letter': A captivating cover letter that breaks the mold of generic templates, specific to both the candidate's achievements (as tailored above) and the job requirements, "
+            "in clean, natural text. Header with the current date and the candidate's name, email and phone; a personalized Salutation to the hiring manager; a Body with an engaging Introduction, "
+            "a Reference to Job Posting explaining how the candidate's background aligns with the role, a dynamic Summary of Relevant Experience and a Conclusion with a call to action; "
+            "and a professional Closing with the candidate's name.\n\n"
+            "Return all three in valid JSON according to the provided schema."
+        )
+        candidate = {
+            "personal_info": {key: value for key, value in resume["personal_info"].items() if key != "summary"},
+            "education": resume["education"],
+            "certifications": resume["certifications"],
+        }
+        user_message = (
+            f"Candidate (context only):\n{json.dumps(candidate, ensure_ascii=False, separators=(',', ':'))}\n\n"
+            f"Editable Resume Fields:\n{json.dumps(editable_fields(baseline_resume), ensure_ascii=False, separators=(',', ':'))}\n\n"
+            f"Job Announcement:\n{job_posting}"
+        )
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+
+    @traced("fused")
+    def tailor_package(self, baseline_resume: Dict, job_posting: str, stream: bool = False, top_k: int = None) -> Dict:
+        """
+        Clean the raw posting, tailor the resume and write the cover letter in one request.
+        The reply follows self.package_schema: the posting as ParsedPosting fields, a patch
+        like tailor_resume_patch() gets, and a cover letter like main.create_cover_letter()
+        writes. Returns {"job_posting": cleaned text, "resume": tailored resume, "cover_letter": dict}.
+        """
+        if top_k:
+            from relevance import focus_resume
+            baseline_resume = focus_resume(baseline_resume, job_posting, top_k)
+        patch_fields = editable_fields(baseline_resume)
+        for job in patch_fields["work_experience"]:
+            del job["job_title"], job["company"]
+        expected = expected_clean_tokens(job_posting) + expected_json_tokens(patch_fields) + COVER_LETTER_TOKENS
+        messages, budget = plan_tokens("tailor_package", self.model,
+                                       lambda posting: self.package_messages(baseline_resume, posting),
+                                       job_posting, expected)
+        try:
+            content = chat_completion(
+                client=self.client,
+                model=self.model,
+                messages=messages,
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": self.package_schema
+                },
+                temperature=1,
+                budget=budget,
+                use_cache=self.use_cache,
+                validate=_schema_check(validate_package, "tailored package"),
+                stream_handler=LiveStreamRenderer("Tailored Package") if stream else None
+            )
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {e}")
+
+        try:
+            package = extract_json(content, allow_partial=False)
+        except Exception as e:
+            print("[ERROR] Failed to parse API response into structured JSON. Raw output:")
+            print(str(content))
+            raise Exception(f"Failed to parse API response into structured JSON: {e}.")
+        check_schema(package, validate_package, "tailored package")
+        posting = ParsedPosting(source="llm", **package["job_posting"])
+        return {
+            "job_posting": posting.to_text(),
+            "resume": apply_resume_patch(baseline_resume, package["resume_patch"]),
+            "cover_letter": package["cover_letter"],
+        }
+
+    def tailor_resume_from_directory(self, directory: str) -> Dict:
+        """
+        Reads baseline_resume.json and job_posting.txt from the specified directory,
+        then calls tailor_resume() with the read data.
+        Returns the updated resume as a dict.
+        """
+        baseline_file = os.path.join(directory, "baseline_resume.json")
+        job_posting_file = os.path.join(directory, "job_posting.txt")
+
+        try:
+            baseline_resume = read_document(directory, "baseline_resume.json")
+        except Exception as e:
+            raise Exception(f"Error reading baseline resume from {baseline_file}: {e}")
+
+        try:
+            with open(job_posting_file, "r") as jf:
+                job_posting = jf.read()
+        except Exception as e:
+            raise Exception(f"Error reading job posting from {job_posting_file}: {e}")
+
+        return self.tailor_resume(baseline_resume, job_posting)
@@ -0,0 +1,215 @@
+"""
+Token budgeting for the three chat-completion call sites.
+
+Before a request goes out, plan() counts the prompt tokens locally (tiktoken when
+it and its encoding files are available, a characters-per-token estimate
+otherwise), trims the job posting so the prompt fits the model's context window
+and the posting cap, and picks max_tokens from the size of the output that call
+is expected to produce instead of a fixed 15000. A reply that still runs into that
+cap (finish_reason "length") is requested once more by llm.chat_completion with the
+model's full output limit, and the cut-off attempt is not cached. After the call it
+appends the estimate and the actual usage the API reported to cache/usage.jsonl.
+
+    python token_budget.py    # estimated vs actual tokens per call site
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_cache import CACHE_DIR
+
+USAGE_LOG_PATH = os.path.join(CACHE_DIR, "usage.jsonl")
+CHARS_PER_TOKEN = 4.0
+MESSAGE_OVERHEAD_TOKENS = 3  # per message, plus 3 to prime the reply
+SAFETY_MARGIN_TOKENS = 256
+MIN_MAX_TOKENS = 512
+OUTPUT_HEADROOM = 1.6  # max_tokens = expected output x headroom
+MAX_POSTING_TOKENS = int(os.getenv("RESUME_MAX_POSTING_TOKENS", "8000"))
+CLEAN_SUMMARY_TOKENS = 800        # role overview, extra skills and "everything else" sections
+COVER_LETTER_TOKENS = 1200        # header, salutation, four body parts and closing
+JSON_GROWTH = 1.3                 # tailored fields tend to grow a little
+TRUNCATION_NOTE = "\n[... job posting trimmed to fit the token budget ...]"
+
+MODEL_LIMITS = {  # (context window, max output tokens)
+    "gpt-4o": (128000, 16384),
+    "gpt-4o-mini": (128000, 16384),
+    "gpt-4.1": (1047576, 32768),
+    "gpt-4.1-mini": (1047576, 32768),
+}
+DEFAULT_LIMITS = (128000, 16384)
+
+# Lines that rarely help tailoring; dropped first when a posting has to shrink.
+LOW_VALUE_LINES = re.compile(
+    r"equal opportunity|\beeo\b|affirmative action|reasonable accommodation|privacy (policy|notice)|cookie|"
+    r"e-verify|background check|apply (now|for this job)|share this job|all rights reserved|"
+    r"veteran status|sexual orientation|gender identity|national origin", re.I)
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def _get_encoding():
+    """The o200k tokenizer used by gpt-4o models, or None if tiktoken or its data is unavailable."""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """The first max_tokens tokens of text (by the character estimate without tiktoken)."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:int(max_tokens * CHARS_PER_TOKEN)]
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    return sum(count_tokens(str(m.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS for m in messages) + 3
+
+
+def model_limits(model: str) -> Tuple[int, int]:
+    return MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+
+
+def trim_text(text: str, max_tokens: int) -> Tuple[str, int]:
+    """
+    Shrink text to at most max_tokens: drop low-value lines (EEO boilerplate, apply
+    buttons) first, then cut from the end on a line boundary. A first line that is too long
+    on its own is cut by tokens instead. Returns (text, tokens removed).
+    """
+    original = count_tokens(text)
+    if original <= max_tokens:
+        return text, 0
+    lines = [line for line in text.splitlines() if not LOW_VALUE_LINES.search(line)]
+    kept, used = [], count_tokens(TRUNCATION_NOTE)
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            if not kept:  # one long line (e.g. a posting without line breaks)
+                kept.append(truncate_tokens(line, max_tokens - used))
+            break
+        kept.append(line)
+        used += cost
+    trimmed = "\n".join(kept) + TRUNCATION_NOTE
+    return trimmed, original - count_tokens(trimmed)
+
+
+@dataclass
+class TokenBudget:
+    call_site: str
+    model: str
+    prompt_tokens: int          # estimated locally
+    expected_completion: int    # estimated locally
+    max_tokens: int             # sent with the request
+    trimmed_tokens: int = 0     # removed from the job posting to fit
+
+
+def plan(call_site: str, model: str, build_messages: Callable[[str], List[Dict]], posting: str,
+         expected_completion: int, max_posting_tokens: int = None) -> Tuple[List[Dict], TokenBudget]:
+    """
+    Build the messages for a call with the job posting trimmed to fit, and choose max_tokens.
+    build_messages(posting_text) must return the full message list for that posting.
+    """
+    context_window, max_output = model_limits(model)
+    max_tokens = max(MIN_MAX_TOKENS, min(max_output, int(expected_completion * OUTPUT_HEADROOM)))
+    fixed_tokens = count_message_tokens(build_messages(""))
+    available = context_window - fixed_tokens - max_tokens - SAFETY_MARGIN_TOKENS
+    limit = min(available, MAX_POSTING_TOKENS if max_posting_tokens is None else max_posting_tokens)
+    if limit <= 0:
+        raise Exception(f"{call_site}: the prompt alone ({fixed_tokens} tokens) does not fit {model}'s context window.")
+    posting, trimmed = trim_text(posting or "", limit)
+    messages = build_messages(posting)
+    budget = TokenBudget(call_site=call_site, model=model, prompt_tokens=count_message_tokens(messages),
+                         expected_completion=expected_completion, max_tokens=max_tokens, trimmed_tokens=trimmed)
+    return messages, budget
+
+
+def expected_clean_tokens(posting: str) -> int:
+    """The cleaned posting restates the posting and adds summaries of its own."""
+    return min(count_tokens(posting), MAX_POSTING_TOKENS) + CLEAN_SUMMARY_TOKENS
+
+
+def expected_json_tokens(document) -> int:
+    """Structured output echoing a document of this shape, with some room for longer wording."""
+    return int(count_tokens(json.dumps(document, ensure_ascii=False, separators=(",", ":"))) * JSON_GROWTH) + 200
+
+
+def log_usage(budget: TokenBudget, prompt_tokens: Optional[int], completion_tokens: Optional[int],
+              cached: bool = False, path: str = None):
+    """Append the estimate and the actual usage (None for cache hits) to the usage log."""
+    path = path or USAGE_LOG_PATH
+    record = dict(asdict(budget), time=time.strftime("%Y-%m-%d %H:%M:%S"), cached=cached,
+                  actual_prompt_tokens=prompt_tokens, actual_completion_tokens=completion_tokens)
+    line = json.dumps(record) + "\n"
+    with _log_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def usage_report(path: str = None) -> Dict[str, Dict]:
+    """Per call site: calls, cache hits, trimmed tokens and actual/estimated ratios."""
+    report = {}
+    try:
+        with open(path or USAGE_LOG_PATH, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return report
+    for record in records:
+        site = report.setdefault(record["call_site"], {
+            "calls": 0, "cached": 0, "trimmed_tokens": 0, "est_prompt": 0, "actual_prompt": 0,
+            "est_completion": 0, "actual_completion": 0, "max_tokens": 0})
+        site["calls"] += 1
+        site["trimmed_tokens"] += record["trimmed_tokens"]
+        if record["cached"] or record["actual_prompt_tokens"] is None:
+            site["cached"] += 1
+            continue
+        site["est_prompt"] += record["prompt_tokens"]
+        site["actual_prompt"] += record["actual_prompt_tokens"]
+        site["est_completion"] += record["expected_completion"]
+        site["actual_completion"] += record["actual_completion_tokens"] or 0
+        site["max_tokens"] += record["max_tokens"]
+    return report
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title=f"Token usage ({USAGE_LOG_PATH})")
+    for column in ("Call site", "Calls", "Cached", "Trimmed", "Prompt act/est", "Completion act/est",
+                   "Completion / max_tokens"):
+        table.add_column(column, justify="left" if column == "Call site" else "right")
+    for name, site in sorted(usage_report().items()):
+        def ratio(actual, estimate):
+            return f"{actual / estimate:.2f}" if estimate else "-"
+        table.add_row(name, str(site["calls"]), str(site["cached"]), str(site["trimmed_tokens"]),
+                      ratio(site["actual_prompt"], site["est_prompt"]),
+                      ratio(site["actual_completion"], site["est_completion"]),
+                      ratio(site["actual_completion"], site["max_tokens"]))
+    Console().print(table)
@@ -0,0 +1,357 @@
+"""
+Per-stage tracing, token accounting and profiling for pipeline runs.
+
+Tracing is off unless a run asks for it (--trace on main.py / batch.py, or
+RESUME_TRACE=1). When on, every scrape, clean, tailor, cover_letter and save step
+records a span with its wall time, and the layers below add counters to whichever
+span is active on their thread:
+
+  - http_fetch: bytes_fetched, page_cache_hits
+  - llm.chat_completion: llm_calls, cache_hits, prompt_tokens, completion_tokens
+    (from completion.usage)
+  - resilience: retries
+
+Finished spans are appended to cache/traces/<run>.jsonl, one span per line in the
+OTLP/JSON span encoding (traceId, spanId, parentSpanId, start/endTimeUnixNano,
+attributes as key/value pairs), so they can be replayed into an OpenTelemetry
+collector; print_summary() renders the per-stage table shown at the end of a run.
+
+profiled() wraps a run in cProfile (including worker threads) and dumps a pstats
+file for snakeviz or `flameprof run.prof > run.svg`.
+
+    python tracing.py                        # summary of the latest trace
+    python tracing.py cache/traces/run.jsonl
+"""
+import contextlib
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from llm_cache import CACHE_DIR
+
+TRACE_DIR = os.path.join(CACHE_DIR, "traces")
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+COUNTERS = ["bytes_fetched", "page_cache_hits", "llm_calls", "cache_hits", "prompt_tokens", "completion_tokens",
+            "retries"]
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def add(self, key: str, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_otlp(self) -> Dict:
+        status = {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK}
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": status,
+        }
+
+    @classmethod
+    def from_otlp(cls, data: Dict) -> "Span":
+        attributes = {}
+        for item in data.get("attributes", []):
+            (kind, value), = item["value"].items()
+            attributes[item["key"]] = int(value) if kind == "intValue" else value
+        status = data.get("status", {})
+        return cls(data["name"], data["traceId"], data["spanId"], data.get("parentSpanId") or None,
+                   int(data["startTimeUnixNano"]), int(data["endTimeUnixNano"]), attributes,
+                   status.get("message") if status.get("code") == STATUS_ERROR else None)
+
+
+def _attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}  # OTLP/JSON encodes int64 as a string
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.path = None
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def start(self, path: str = None) -> str:
+        """Start recording spans (kept in memory and appended to path); returns the trace file path."""
+        with self._lock:
+            self.path = path or os.path.join(TRACE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self.spans = []
+            self.enabled = True
+        return self.path
+
+    def stop(self):
+        with self._lock:
+            self.enabled = False
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def open(self, name: str, parent: Span = None, **attributes) -> Optional[Span]:
+        """Create a span without making it current (for work that hops between threads); see finish()."""
+        if not self.enabled:
+            return None
+        parent = parent or self.current()
+        return Span(name, parent.trace_id if parent else os.urandom(16).hex(), os.urandom(8).hex(),
+                    parent.span_id if parent else None, time.time_ns(), attributes=dict(attributes))
+
+    def finish(self, span: Optional[Span], error: str = None):
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        span.error = span.error or error
+        with self._lock:
+            if not self.enabled:
+                return
+            self.spans.append(span)
+            if self._file is not None:
+                self._file.write(json.dumps(span.to_otlp()) + "\n")
+                self._file.flush()
+
+    @contextlib.contextmanager
+    def activate(self, span: Optional[Span]):
+        """Make an open span the current one on this thread, so spans started inside become its children."""
+        if span is None:
+            yield None
+            return
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        span = self.open(name, **attributes)
+        if span is None:
+            yield None
+            return
+        error = None
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            self.finish(span, error)
+
+    def add(self, key: str, amount=1):
+        """Add to a counter on the current span (a no-op when tracing is off or no span is active)."""
+        if self.enabled:
+            span = self.current()
+            if span is not None:
+                span.add(key, amount)
+
+    def annotate(self, key: str, value):
+        if self.enabled:
+            span = self.current()
+            if span is not None:
+                span.attributes[key] = value
+
+
+default_tracer = Tracer()
+
+
+def traced(name: str):
+    """Decorator running the function inside a default_tracer span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not default_tracer.enabled:
+                return func(*args, **kwargs)
+            with default_tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def span(name: str, **attributes):
+    return default_tracer.span(name, **attributes)
+
+
+def add(key: str, amount=1):
+    default_tracer.add(key, amount)
+
+
+def annotate(key: str, value):
+    default_tracer.annotate(key, value)
+
+
+def summarize(spans: List[Span]) -> Dict[str, Dict]:
+    """Per span name: count, errors, total/mean/p95 seconds and the summed counters."""
+    by_name = {}
+    for item in spans:
+        by_name.setdefault(item.name, []).append(item)
+    summary = {}
+    for name, items in by_name.items():
+        seconds = sorted(item.seconds for item in items)
+        row = {
+            "count": len(items),
+            "errors": sum(1 for item in items if item.error),
+            "total_seconds": sum(seconds),
+            "mean_seconds": sum(seconds) / len(seconds),
+            "p95_seconds": seconds[min(len(seconds) - 1, int(round(0.95 * (len(seconds) - 1))))],
+        }
+        for counter in COUNTERS:
+            row[counter] = sum(item.attributes.get(counter, 0) for item in items)
+        summary[name] = row
+    return summary
+
+
+def load_spans(path: str) -> List[Span]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [Span.from_otlp(json.loads(line)) for line in f if line.strip()]
+
+
+def print_summary(console, spans: List[Span] = None, title: str = "Run Trace"):
+    from rich.table import Table
+
+    spans = default_tracer.spans if spans is None else spans
+    if not spans:
+        return
+    table = Table(title=title)
+    for column in ("Span", "Calls", "Total s", "Mean s", "p95 s", "KB in", "LLM/cached", "Tokens in/out", "Retries"):
+        table.add_column(column, justify="left" if column == "Span" else "right")
+    for name, row in sorted(summarize(spans).items(), key=lambda entry: -entry[1]["total_seconds"]):
+        calls = str(row["count"]) + (f" ({row['errors']} failed)" if row["errors"] else "")
+        table.add_row(name, calls, f"{row['total_seconds']:.2f}", f"{row['mean_seconds']:.3f}",
+                      f"{row['p95_seconds']:.3f}", f"{row['bytes_fetched'] / 1024:.1f}",
+                      f"{row['llm_calls']}/{row['cache_hits']}", f"{row['prompt_tokens']}/{row['completion_tokens']}",
+                      str(row["retries"]))
+    console.print(table)
+
+
+@contextlib.contextmanager
+def profiled(path: str = None):
+    """
+    Run the body under cProfile and write the merged stats to path (default
+    cache/profiles/<time>.prof). Before Python 3.12 cProfile only sees the thread that
+    enabled it, so threads started inside get a profiler of their own and are merged in.
+    """
+    import cProfile
+    import pstats
+
+    path = path or os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+    profiles = [cProfile.Profile()]
+    lock = threading.Lock()
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(frame, event, arg):
+        profile = cProfile.Profile()
+        with lock:
+            profiles.append(profile)
+        profile.enable()  # replaces this hook for the rest of the thread
+
+    if per_thread:
+        threading.setprofile(profile_thread)
+    profiles[0].enable()
+    try:
+        yield path
+    finally:
+        profiles[0].disable()
+        if per_thread:
+            threading.setprofile(None)
+        with lock:
+            stats = pstats.Stats(*profiles)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        stats.dump_stats(path)
+
+
+def print_profile(console, path: str, limit: int = 15):
+    """The functions with the most cumulative time in a dumped profile."""
+    import pstats
+    from rich.table import Table
+
+    stats = pstats.Stats(path)
+    table = Table(title=f"Profile ({path})")
+    for column in ("Function", "Calls", "Own s", "Cumulative s"):
+        table.add_column(column, justify="left" if column == "Function" else "right")
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+    for (filename, line, function), (_, calls, own, cumulative, _) in rows:
+        location = f"{os.path.basename(filename)}:{line}" if line else filename
+        table.add_row(f"{function} ({location})", str(calls), f"{own:.3f}", f"{cumulative:.3f}")
+    console.print(table)
+    console.print(f"[dim]Full profile: {path} (open with snakeviz, or `flameprof {path} > profile.svg`).[/dim]")
+
+
+@contextlib.contextmanager
+def run_session(console, trace: bool = False, profile: Optional[str] = None):
+    """
+    Trace and/or profile everything inside, then print the summary tables.
+    profile is None for no profiling, "" for the default path, or a .prof path.
+    """
+    trace = trace or os.getenv("RESUME_TRACE", "").lower() in ("1", "on", "true", "yes")
+    trace_path = default_tracer.start() if trace else None
+    profiler = profiled(profile or None) if profile is not None else contextlib.nullcontext()
+    try:
+        with profiler as profile_path:
+            yield
+    finally:
+        if trace_path:
+            default_tracer.stop()
+            print_summary(console)
+            console.print(f"[dim]Trace written to {trace_path}[/dim]")
+        if profile is not None:
+            print_profile(console, profile_path)
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+
+    if len(sys.argv) > 1:
+        trace_file = sys.argv[1]
+    else:
+        traces = sorted(glob.glob(os.path.join(TRACE_DIR, "*.jsonl")), key=os.path.getmtime)
+        if not traces:
+            raise SystemExit(f"No traces in {TRACE_DIR}; run main.py or batch.py with --trace first.")
+        trace_file = traces[-1]
+    print_summary(Console(), load_spans(trace_file), title=f"Trace {trace_file}")